@@ -0,0 +1,103 @@
+import json
+from typing import AsyncIterable, AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import crud
+from app.agent.schemas import AgentBulkResponse, AgentBulkResult, AgentCreate
+from app.exceptions import BadRequest
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Non-blank lines of a streamed NDJSON body, without buffering all of it."""
+    tail = b""
+    async for chunk in chunks:
+        *lines, tail = (tail + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if tail.strip():
+        yield tail
+
+
+async def json_array_items(body: bytes) -> AsyncIterator[object]:
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise BadRequest("Body must be a JSON array of agents")
+    if not isinstance(items, list):
+        raise BadRequest("Body must be a JSON array of agents")
+
+    for item in items:
+        yield item
+
+
+def _validate(raw: object) -> AgentCreate:
+    if isinstance(raw, bytes):  # an NDJSON line: parse and validate in one pass
+        return AgentCreate.model_validate_json(raw)
+    return AgentCreate.model_validate(raw)
+
+
+def _messages(exc: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(map(str, err['loc'])) or 'body'}: {err['msg']}"
+        for err in exc.errors(include_url=False)
+    ]
+
+
+async def _flush(
+    db: AsyncSession,
+    pending: list[tuple[int, AgentCreate]],
+    results: list[AgentBulkResult],
+) -> None:
+    ids = await crud.insert_agents(db, [agent for _, agent in pending])
+    results.extend(
+        AgentBulkResult(index=i, id=id_) for (i, _), id_ in zip(pending, ids)
+    )
+    pending.clear()
+
+
+async def load_agents(
+    db: AsyncSession,
+    records: AsyncIterable[object],
+    *,
+    chunk_size: int,
+    max_rows: int,
+) -> AgentBulkResponse:
+    """
+    Validate and insert *records*, `chunk_size` rows per statement.
+
+    Invalid rows are reported and skipped; valid ones are committed in a
+    single transaction at the end, so exceeding *max_rows* (400) or a
+    database error leaves nothing behind.
+    """
+    results: list[AgentBulkResult] = []
+    pending: list[tuple[int, AgentCreate]] = []
+    index = failed = 0
+
+    try:
+        async for raw in records:
+            if index >= max_rows:
+                raise BadRequest(f"At most {max_rows} agents per request")
+
+            try:
+                pending.append((index, _validate(raw)))
+            except ValidationError as exc:
+                results.append(AgentBulkResult(index=index, errors=_messages(exc)))
+                failed += 1
+
+            if len(pending) >= chunk_size:
+                await _flush(db, pending, results)
+            index += 1
+
+        await _flush(db, pending, results)
+        await db.commit()
+    except BaseException:  # incl. cancellation: drop the half-inserted chunks
+        await db.rollback()
+        raise
+
+    results.sort(key=lambda r: r.index)
+    return AgentBulkResponse(created=index - failed, failed=failed, results=results)
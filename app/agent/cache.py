@@ -0,0 +1,88 @@
+from uuid import UUID
+
+from app.agent.schemas import AgentRead
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class AgentCache:
+    """
+    Read-through cache of immutable `AgentRead` snapshots.
+
+    Unknown ids are remembered too (for a shorter TTL) so a flood of
+    requests for missing agents doesn't reach the database. Writers must
+    call `put()` / `invalidate()` after committing.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_items: int,
+        ttl: float,
+        negative_max_items: int,
+        negative_ttl: float
+    ) -> None:
+        self._found: LRUCache[UUID, AgentRead] = LRUCache(max_items=max_items, ttl=ttl)
+        self._missing: LRUCache[UUID, bool] = LRUCache(
+            max_items=negative_max_items, ttl=negative_ttl
+        )
+        # bumped on every write so a load racing with it is not cached
+        self._epoch = 0
+
+    def get(self, agent_id: UUID) -> AgentRead | None:
+        return self._found.get(agent_id)
+
+    def is_missing(self, agent_id: UUID) -> bool:
+        return self._missing.get(agent_id, False)
+
+    def epoch(self) -> int:
+        return self._epoch
+
+    def store(self, agent_id: UUID, agent: AgentRead | None, epoch: int) -> None:
+        """Cache a database read taken at *epoch*, unless a write happened since."""
+        if epoch != self._epoch:
+            return
+        if agent is None:
+            self._missing.set(agent_id, True)
+        else:
+            self._found.set(agent_id, agent)
+
+    def put(self, agent: AgentRead) -> None:
+        self._epoch += 1
+        self._missing.pop(agent.id)
+        self._found.set(agent.id, agent)
+
+    def invalidate(self, agent_id: UUID) -> None:
+        self._epoch += 1
+        self._missing.pop(agent_id)
+        self._found.pop(agent_id)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._found.clear()
+        self._missing.clear()
+
+    def reset_stats(self) -> None:
+        self._found.reset_stats()
+        self._missing.reset_stats()
+
+    def stats(self) -> dict[str, int]:
+        found, missing = self._found.stats(), self._missing.stats()
+        return {
+            "size": found["size"],
+            "hits": found["hits"],
+            "misses": found["misses"] - missing["hits"],
+            "negative_size": missing["size"],
+            "negative_hits": missing["hits"],
+            "evictions": found["evictions"] + missing["evictions"],
+        }
+
+
+agent_cache = AgentCache(
+    max_items=settings.agent_cache_max_items,
+    ttl=settings.agent_cache_ttl_seconds,
+    negative_max_items=settings.agent_cache_negative_max_items,
+    negative_ttl=settings.agent_cache_negative_ttl_seconds,
+)
@@ -0,0 +1,133 @@
+import asyncio
+from contextlib import suppress
+from typing import Awaitable, Callable
+
+import orjson
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from app.agent.schemas import ChatQuestion
+from app.agent.services.qa import Match
+
+Answerer = Callable[[list[str]], Awaitable[list[Match]]]
+
+# a parsed question, or the encoded error reply to a frame that wasn't one
+_Frame = ChatQuestion | bytes
+
+
+def _invalid(exc: ValidationError) -> bytes:
+    errors = [
+        f"{'.'.join(map(str, err['loc'])) or 'frame'}: {err['msg']}"
+        for err in exc.errors(include_url=False)
+    ]
+    return orjson.dumps({"id": None, "error": "; ".join(errors)})
+
+
+class ChatSession:
+    """
+    One WebSocket conversation: JSON frames `{"id": ..., "question": ...}`
+    in, `{"id", "answer", "match", "score"}` (or `{"id", "error"}`) out, in
+    the order the questions arrived.
+
+    A reader task parses frames into a queue of at most *max_pending*
+    questions. When it is full the reader stops reading, so a client that
+    pipelines faster than it is answered is held back by TCP flow control
+    instead of growing server memory. Everything queued is answered with
+    one *answer* call. The connection is closed after *idle_timeout*
+    seconds without a frame.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        answer: Answerer,
+        *,
+        max_pending: int,
+        idle_timeout: float,
+    ) -> None:
+        self._websocket = websocket
+        self._answer = answer
+        self._idle_timeout = idle_timeout
+        self._queue: asyncio.Queue[_Frame | None] = asyncio.Queue(max_pending)
+        self._idle = False
+
+    async def run(self) -> None:
+        reader = asyncio.create_task(self._read())
+        try:
+            while batch := await self._next_batch():
+                for reply in await self._replies(batch):
+                    await self._websocket.send_text(reply.decode())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            reader.cancel()
+            with suppress(asyncio.CancelledError):
+                await reader
+
+        if self._idle:
+            await self._websocket.close(status.WS_1000_NORMAL_CLOSURE, "Idle timeout")
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                message = await asyncio.wait_for(
+                    self._websocket.receive(), self._idle_timeout
+                )
+                if message["type"] == "websocket.disconnect":
+                    break
+
+                frame = message.get("text") or message.get("bytes") or b""
+                try:
+                    await self._queue.put(ChatQuestion.model_validate_json(frame))
+                except ValidationError as exc:
+                    await self._queue.put(_invalid(exc))
+        except asyncio.TimeoutError:
+            self._idle = True
+        finally:
+            try:
+                self._queue.put_nowait(None)
+            except asyncio.QueueFull:
+                # once run() has cancelled us nobody takes from the queue any
+                # more: waiting for room would never end
+                if not asyncio.current_task().cancelling():
+                    await self._queue.put(None)
+
+    async def _next_batch(self) -> list[_Frame]:
+        """All queued frames (waits for one); empty once the reader is done."""
+        frame = await self._queue.get()
+        batch: list[_Frame] = []
+        while frame is not None:
+            batch.append(frame)
+            if self._queue.empty():
+                break
+            frame = self._queue.get_nowait()
+        else:
+            self._queue.put_nowait(None)  # seen mid-batch: end after this one
+        return batch
+
+    async def _replies(self, batch: list[_Frame]) -> list[bytes]:
+        questions = [f.question for f in batch if isinstance(f, ChatQuestion)]
+        error: dict[str, object] | None = None
+        try:
+            matches = iter(await self._answer(questions) if questions else [])
+        except HTTPException as exc:  # busy matcher, agent can no longer answer
+            error = {"error": exc.detail}
+            if exc.headers and "Retry-After" in exc.headers:
+                error["retry_after"] = int(exc.headers["Retry-After"])
+
+        replies = []
+        for frame in batch:
+            if isinstance(frame, bytes):
+                replies.append(frame)
+            elif error is not None:
+                replies.append(orjson.dumps({"id": frame.id, **error}))
+            else:
+                match = next(matches)
+                reply = {
+                    "id": frame.id,
+                    "answer": match.answer,
+                    "match": match.type,
+                    "score": match.score,
+                }
+                replies.append(orjson.dumps(reply))
+        return replies
@@ -1,23 +1,77 @@
-from typing import Sequence
+from datetime import datetime
+from typing import AsyncIterator, Final, Sequence
 from uuid import UUID
 
-from sqlalchemy import or_, select
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    RowMapping,
+    Select,
+    and_,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    tuple_,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.agent.models import Agent
-from app.agent.schemas import AgentCreate
+from app.agent.cache import agent_cache
+from app.agent.models import Agent, KnowledgeEntry, QuestionLog
+from app.agent.pagination import Cursor
+from app.agent.schemas import AgentCreate, AgentRead, KnowledgeEntryCreate
 
-from .enums import AgentStatus, AgentType
+from .enums import AgentStatus, AgentType, MatchType
 
+AGENT_FIELDS: Final[tuple[str, ...]] = (
+    "id",
+    "name",
+    "type",
+    "status",
+    "description",
+    "version",
+    "updated_at",
+)
 
-async def get_agents(
-    db: AsyncSession,
+
+def _search_rank(q: str) -> ColumnElement[float]:
+    """pg_trgm relevance of *q* against name/description (Postgres only)."""
+    return func.greatest(
+        func.word_similarity(q, Agent.name),
+        func.word_similarity(q, func.coalesce(Agent.description, "")),
+        type_=Float,
+    )
+
+
+def agents_page_query(
+    dialect: str,
     *,
     q: str | None = None,
     type_: AgentType | None = None,
     status: AgentStatus | None = None,
-) -> Sequence[Agent]:
-    stmt = select(Agent)
+    after: Cursor | None = None,
+    limit: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> Select:
+    """
+    The `SELECT` behind `get_agents_page` for the given SQL *dialect*.
+
+    Filtering on `type` / `status` and ordering by `(name, id)` match the
+    composite indexes on `agents`, so a page is an index range scan with
+    no sort step. On Postgres a `q` search is ranked by trigram similarity
+    first; its `ILIKE` filter is served by the GIN trigram indexes.
+    """
+    rank = _search_rank(q) if q and dialect == "postgresql" else None
+
+    if fields is None:
+        stmt = select(Agent)
+    else:
+        # id/name feed the cursor, version the ETag
+        columns = dict.fromkeys(["id", "name", "version", *fields])
+        stmt = select(*(getattr(Agent, f) for f in columns))
+    if rank is not None:
+        stmt = stmt.add_columns(rank.label("search_rank"))
 
     if q:
         pattern = f"%{q.lower()}%"
@@ -34,10 +88,95 @@ async def get_agents(
     if status:
         stmt = stmt.where(Agent.status == status)
 
-    stmt = stmt.order_by(Agent.name)
-    result = await db.execute(stmt)
+    # keyset pagination: (name, id) is unique and matches the sort order
+    if after is not None:
+        key_after = tuple_(Agent.name, Agent.id) > tuple_(after.name, after.id)
+        if rank is not None and after.rank is not None:
+            key_after = or_(rank < after.rank, and_(rank == after.rank, key_after))
+        stmt = stmt.where(key_after)
 
-    return result.scalars().all()
+    if rank is not None:
+        stmt = stmt.order_by(rank.desc())
+    stmt = stmt.order_by(Agent.name, Agent.id)
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)  # the extra row tells us a next page exists
+
+    return stmt
+
+
+async def get_agents_page(
+    db: AsyncSession,
+    *,
+    q: str | None = None,
+    type_: AgentType | None = None,
+    status: AgentStatus | None = None,
+    after: Cursor | None = None,
+    limit: int | None = None,
+    fields: Sequence[str] | None = None,
+) -> tuple[Sequence[Agent] | Sequence[RowMapping], Cursor | None]:
+    """
+    One keyset page of agents, plus the cursor of the next page (if any).
+
+    With *fields* only those columns are loaded and the rows come back as
+    mappings instead of `Agent` objects.
+    """
+    stmt = agents_page_query(
+        db.get_bind().dialect.name,
+        q=q,
+        type_=type_,
+        status=status,
+        after=after,
+        limit=limit,
+        fields=fields,
+    )
+    rows = (await db.execute(stmt)).all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        if fields is None:
+            name, agent_id = last[Agent].name, last[Agent].id
+        else:
+            name, agent_id = last["name"], last["id"]
+        next_cursor = Cursor(name, agent_id, last.get("search_rank"))
+
+    if fields is None:
+        return [row[0] for row in rows], next_cursor
+    return [row._mapping for row in rows], next_cursor
+
+
+async def get_agents(
+    db: AsyncSession,
+    *,
+    q: str | None = None,
+    type_: AgentType | None = None,
+    status: AgentStatus | None = None,
+) -> Sequence[Agent]:
+    agents, _ = await get_agents_page(db, q=q, type_=type_, status=status)
+
+    return agents
+
+
+async def stream_agents(
+    db: AsyncSession,
+    *,
+    type_: AgentType | None = None,
+    status: AgentStatus | None = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[Sequence[RowMapping]]:
+    """
+    Every (matching) agent in `(name, id)` order, *batch_size* rows at a time.
+
+    Rows are fetched through a server-side cursor, so memory stays flat no
+    matter how large the table is.
+    """
+    stmt = agents_page_query(
+        db.get_bind().dialect.name, type_=type_, status=status, fields=AGENT_FIELDS
+    )
+    result = await db.stream(stmt.execution_options(yield_per=batch_size))
+    async for rows in result.mappings().partitions():
+        yield rows
 
 
 async def get_agent(db: AsyncSession, agent_id: UUID) -> Agent | None:
@@ -46,6 +185,21 @@ async def get_agent(db: AsyncSession, agent_id: UUID) -> Agent | None:
     return result.scalars().first()
 
 
+async def get_agent_snapshot(db: AsyncSession, agent_id: UUID) -> AgentRead | None:
+    """`get_agent` through the read-through `agent_cache` (hits skip the database)."""
+    if (cached := agent_cache.get(agent_id)) is not None:
+        return cached
+    if agent_cache.is_missing(agent_id):
+        return None
+
+    epoch = agent_cache.epoch()
+    agent = await get_agent(db, agent_id)
+    snapshot = None if agent is None else AgentRead.model_validate(agent)
+    agent_cache.store(agent_id, snapshot, epoch)
+
+    return snapshot
+
+
 async def create_agent(db: AsyncSession, data: AgentCreate) -> Agent:
     agent = Agent(**data.model_dump())
     db.add(agent)
@@ -53,4 +207,136 @@ async def create_agent(db: AsyncSession, data: AgentCreate) -> Agent:
     await db.commit()
     await db.refresh(agent)
 
+    agent_cache.put(AgentRead.model_validate(agent))
     return agent
+
+
+async def insert_agents(db: AsyncSession, rows: Sequence[AgentCreate]) -> list[UUID]:
+    """
+    Insert *rows* with one multi-row `INSERT ... RETURNING`; ids come back
+    in input order. The caller commits.
+    """
+    if not rows:
+        return []
+
+    result = await db.execute(
+        insert(Agent).returning(Agent.id, sort_by_parameter_order=True),
+        [row.model_dump() for row in rows],
+    )
+    return list(result.scalars())
+
+
+async def get_knowledge_entries(
+    db: AsyncSession, agent_id: UUID
+) -> Sequence[KnowledgeEntry]:
+    result = await db.execute(
+        select(KnowledgeEntry)
+        .where(KnowledgeEntry.agent_id == agent_id)
+        .order_by(KnowledgeEntry.created_at, KnowledgeEntry.id)
+    )
+
+    return result.scalars().all()
+
+
+async def get_knowledge_entry(
+    db: AsyncSession, agent_id: UUID, entry_id: UUID
+) -> KnowledgeEntry | None:
+    result = await db.execute(
+        select(KnowledgeEntry).where(
+            KnowledgeEntry.id == entry_id, KnowledgeEntry.agent_id == agent_id
+        )
+    )
+
+    return result.scalars().first()
+
+
+async def create_knowledge_entry(
+    db: AsyncSession, agent_id: UUID, data: KnowledgeEntryCreate
+) -> KnowledgeEntry:
+    entry = KnowledgeEntry(agent_id=agent_id, **data.model_dump())
+    db.add(entry)
+
+    await db.commit()
+    await db.refresh(entry)
+
+    return entry
+
+
+async def update_knowledge_entry(
+    db: AsyncSession, entry: KnowledgeEntry, data: KnowledgeEntryCreate
+) -> KnowledgeEntry:
+    for key, value in data.model_dump().items():
+        setattr(entry, key, value)
+
+    await db.commit()
+    await db.refresh(entry)
+
+    return entry
+
+
+async def delete_knowledge_entry(db: AsyncSession, entry: KnowledgeEntry) -> None:
+    await db.delete(entry)
+    await db.commit()
+
+
+async def insert_question_log(db: AsyncSession, rows: Sequence[dict]) -> None:
+    """One multi-row `INSERT` for a batch of question log rows. The caller commits."""
+    if rows:
+        await db.execute(insert(QuestionLog), rows)
+
+
+async def delete_question_log(db: AsyncSession, *, before: datetime) -> int:
+    """Delete the question log rows asked before *before*. The caller commits."""
+    result = await db.execute(delete(QuestionLog).where(QuestionLog.asked_at < before))
+    return result.rowcount
+
+
+async def get_unanswered_questions(
+    db: AsyncSession,
+    agent_id: UUID,
+    *,
+    limit: int,
+    since: datetime | None = None,
+) -> Sequence[RowMapping]:
+    """
+    The agent's most frequent fallback questions, grouped by normalised form,
+    with how often and when last each was asked and one original wording.
+    """
+    asked = func.count().label("count")
+    stmt = (
+        select(
+            QuestionLog.q_norm,
+            asked,
+            func.max(QuestionLog.asked_at).label("last_asked_at"),
+            func.min(QuestionLog.question).label("example"),
+        )
+        .where(
+            QuestionLog.agent_id == agent_id,
+            QuestionLog.match == MatchType.FALLBACK,
+        )
+        .group_by(QuestionLog.q_norm)
+        .order_by(asked.desc(), QuestionLog.q_norm)
+        .limit(limit)
+    )
+    if since is not None:
+        stmt = stmt.where(QuestionLog.asked_at >= since)
+
+    return (await db.execute(stmt)).mappings().all()
+
+
+async def get_hot_questions(
+    db: AsyncSession, *, since: datetime, limit: int
+) -> Sequence[RowMapping]:
+    """
+    The most asked `(agent_id, q_norm)` pairs since *since*, over all agents
+    and match types, most frequent first.
+    """
+    asked = func.count().label("count")
+    stmt = (
+        select(QuestionLog.agent_id, QuestionLog.q_norm, asked)
+        .where(QuestionLog.asked_at >= since)
+        .group_by(QuestionLog.agent_id, QuestionLog.q_norm)
+        .order_by(asked.desc())
+        .limit(limit)
+    )
+    return (await db.execute(stmt)).mappings().all()
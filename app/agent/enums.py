@@ -10,3 +10,10 @@ class AgentType(StrEnum):
 class AgentStatus(StrEnum):
     ACTIVE = "Active"
     INACTIVE = "Inactive"
+
+
+class MatchType(StrEnum):
+    EXACT = "exact"
+    SUBSTRING = "substring"
+    FUZZY = "fuzzy"
+    FALLBACK = "fallback"
@@ -0,0 +1,16 @@
+from typing import AsyncIterable, AsyncIterator, Sequence
+
+from sqlalchemy import RowMapping
+
+from app.agent.schemas import AgentRead
+
+NDJSON = "application/x-ndjson"
+
+
+async def ndjson(batches: AsyncIterable[Sequence[RowMapping]]) -> AsyncIterator[bytes]:
+    """One `AgentRead` JSON document per line, one chunk per batch of rows."""
+    async for rows in batches:
+        yield b"".join(
+            AgentRead.model_validate(dict(row)).model_dump_json().encode() + b"\n"
+            for row in rows
+        )
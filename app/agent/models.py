@@ -1,15 +1,47 @@
 import uuid
+from datetime import datetime, timezone
 
-from sqlalchemy import Enum, String
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.agent.enums import AgentStatus, AgentType
+from app.agent.enums import AgentStatus, AgentType, MatchType
 from app.db.database import Base
 
 
 class Agent(Base):
     __tablename__ = "agents"
+    __table_args__ = (
+        # list queries: equality on type/status, then ORDER BY (name, id)
+        Index("ix_agents_type_status_name", "type", "status", "name", "id"),
+        Index("ix_agents_type_name", "type", "name", "id"),
+        Index("ix_agents_status_name", "status", "name", "id"),
+        Index("ix_agents_name", "name", "id"),
+        # pg_trgm GIN indexes serve the `q` ILIKE search (plain indexes elsewhere)
+        Index(
+            "ix_agents_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_agents_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -26,3 +58,70 @@ class Agent(Base):
     )
 
     description: Mapped[str | None]
+
+    # bumped by every ORM update (optimistic locking); ETags are derived from it.
+    # Core UPDATEs must set `version=Agent.version + 1, updated_at=...` themselves.
+    version: Mapped[int] = mapped_column(nullable=False, default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+class KnowledgeEntry(Base):
+    __tablename__ = "knowledge_entries"
+    __table_args__ = (UniqueConstraint("agent_id", "question"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    agent_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("agents.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    question: Mapped[str] = mapped_column(String(300), nullable=False)
+    answer: Mapped[str] = mapped_column(String(2000), nullable=False)
+
+    # earlier entries win ties, like the insertion order of `_QA_PAIRS`
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+
+class QuestionLog(Base):
+    """Every question asked, written behind the request by `QuestionLogWriter`."""
+
+    __tablename__ = "question_log"
+    __table_args__ = (
+        # unanswered-question report: an agent's fallbacks grouped by q_norm
+        Index(
+            "ix_question_log_unanswered",
+            "agent_id",
+            "q_norm",
+            postgresql_where=text("match = 'FALLBACK'"),
+        ),
+        # retention pruning and the warm-up's recent-questions scan
+        Index("ix_question_log_asked_at", "asked_at"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True
+    )
+    # no foreign key: a log row must not fail (or cascade) with its agent
+    agent_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    question: Mapped[str] = mapped_column(String(300), nullable=False)
+    q_norm: Mapped[str] = mapped_column(String(300), nullable=False)
+    match: Mapped[MatchType] = mapped_column(
+        Enum(MatchType, name="match_type", validate_strings=True), nullable=False
+    )
+    score: Mapped[float] = mapped_column(nullable=False)
+    asked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,45 @@
+import base64
+import json
+from typing import NamedTuple, Sequence
+from uuid import UUID
+
+from app.exceptions import BadRequest
+
+
+class Cursor(NamedTuple):
+    """Keyset position: the sort key of the last row of the previous page."""
+
+    name: str
+    id: UUID
+    rank: float | None = None  # search relevance, only when results are ranked
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Opaque, URL-safe form of *cursor*."""
+    values = [cursor.name, str(cursor.id)]
+    if cursor.rank is not None:
+        values.append(cursor.rank)
+
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        name, agent_id, *rank = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(agent_id, str):  # UUID() raises AttributeError on others
+            raise TypeError("cursor id must be a string")
+        return Cursor(str(name), UUID(agent_id), float(rank[0]) if rank else None)
+    except (ValueError, TypeError):
+        raise BadRequest("Invalid cursor")
+
+
+def parse_fields(fields: str, allowed: Sequence[str]) -> list[str]:
+    """`"name, id"` -> `["name", "id"]`, rejecting unknown or empty selections."""
+    selected = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in selected if f not in allowed]
+    if unknown or not selected:
+        raise BadRequest(f"fields must be a subset of: {', '.join(allowed)}")
+
+    return selected
@@ -1,51 +1,170 @@
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Query, status
+import orjson
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketException,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 
-from app.agent import crud
+from app.agent import bulk, crud, export
+from app.agent.chat import ChatSession
 from app.agent.schemas import (
+    AgentBulkResponse,
     AgentCreate,
     AgentRead,
+    AskBatchRequest,
+    AskBatchResponse,
     AskQuestionRequest,
     AskQuestionResponse,
+    KnowledgeEntryCreate,
+    KnowledgeEntryRead,
+    UnansweredQuestion,
+)
+from app.core.conditional import http_date, is_fresh, make_etag, not_modified
+from app.core.config import get_settings
+from app.db.database import ReplicaFallbackRoute
+from app.db.deps import (
+    AsyncSessionDependency,
+    ReadSessionDependency,
+    ReadSessionFactoryDependency,
 )
-from app.db.deps import AsyncSessionDependency
-from app.exceptions import BadRequest, NotFound
+from app.exceptions import Conflict, NotFound
 
 from .enums import AgentStatus, AgentType
-from .services.qa import answer
+from .pagination import decode_cursor, encode_cursor, parse_fields
+from .services.answer_cache import answer_cache
+from .services.answering import agent_index, get_agent_or_404, get_index, matcher
+from .services.knowledge import knowledge_cache
+from .services.qa import BUILTIN_ANSWERS, Match
+from .services.question_log import question_log
+
+NEXT_CURSOR = "X-Next-Cursor"
+
+settings = get_settings()
 
-AGENT_NAME = "Hotel Q&A Bot"
+# `/ask` bodies for the built-in answers, encoded once
+_ANSWER_PAYLOADS: dict[str, bytes] = {
+    answer: orjson.dumps({"answer": answer}) for answer in BUILTIN_ANSWERS
+}
 
+router = APIRouter(prefix="/agents", tags=["Agents"], route_class=ReplicaFallbackRoute)
 
-router = APIRouter(prefix="/agents", tags=["Agents"])
+
+def _raw_json(payload: bytes, headers: dict[str, str] | None = None) -> Response:
+    """Already-encoded JSON: skips `response_model` validation and re-encoding."""
+    return Response(payload, media_type="application/json", headers=headers)
 
 
 @router.get("", response_model=list[AgentRead])
 async def list_agents(
-    db: AsyncSessionDependency,
+    request: Request,
+    db: ReadSessionDependency,
     q: str | None = Query(None, description="Fuzzy search in name/description"),
     type: AgentType | None = Query(None),
     status: AgentStatus | None = Query(None),
-) -> list[AgentRead]:
+    limit: int | None = Query(None, ge=1, le=settings.agents_page_max_size),
+    cursor: str | None = Query(
+        None, description="`X-Next-Cursor` of the previous page"
+    ),
+    fields: str | None = Query(None, description="Comma-separated, e.g. `id,name`"),
+) -> Response:
     """
-    Return all agents or a filtered subset.
+    Return all agents or a filtered subset, ordered by name.
 
     - **q**: case-insensitive substring match for *name* or *description*
+      (on Postgres ranked by trigram similarity, best first)
     - **type**: filter by agent type (Sales, Support, Marketing)
     - **status**: filter by status (Active, Inactive)
+    - **limit** / **cursor**: keyset pagination; when more rows exist the
+      `X-Next-Cursor` response header holds the cursor for the next page
+    - **fields**: only return these fields of each agent
+
+    The `ETag` covers the ids and versions on the page, so polling with
+    `If-None-Match` gets a bodiless 304 until one of them changes.
+    """
+    selected = crud.AGENT_FIELDS
+    if fields is not None:
+        selected = parse_fields(fields, crud.AGENT_FIELDS)
+    rows, next_cursor = await crud.get_agents_page(
+        db,
+        q=q,
+        type_=type,
+        status=status,
+        after=decode_cursor(cursor) if cursor else None,
+        limit=limit or settings.agents_list_max_size,
+        fields=selected,
+    )
+    headers = {NEXT_CURSOR: encode_cursor(next_cursor)} if next_cursor else {}
+    headers["ETag"] = make_etag(
+        selected, next_cursor, [(row["id"], row["version"]) for row in rows]
+    )
+    if is_fresh(request.headers, headers["ETag"]):
+        return not_modified(headers)
+
+    # plain column values, typed by the database: encode them directly
+    payload = orjson.dumps(
+        [{f: row[f] for f in selected} for row in rows], option=orjson.OPT_UTC_Z
+    )
+    return _raw_json(payload, headers)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {export.NDJSON: {}}}},
+)
+async def export_agents(
+    sessions: ReadSessionFactoryDependency,
+    type: AgentType | None = Query(None),
+    status: AgentStatus | None = Query(None),
+) -> StreamingResponse:
+    """
+    Stream every agent as NDJSON (one `AgentRead` per line), ordered by name.
+
+    Rows are read through a server-side cursor and written as they arrive,
+    so the first byte goes out immediately and memory does not grow with
+    the table.
     """
 
-    return await crud.get_agents(db, q=q, type_=type, status=status)
+    async def body():
+        # the request's session is closed before streaming starts: use our own
+        async with sessions() as db:
+            batches = crud.stream_agents(
+                db,
+                type_=type,
+                status=status,
+                batch_size=settings.agents_export_batch_size,
+            )
+            async for chunk in export.ndjson(batches):
+                yield chunk
+
+    return StreamingResponse(body(), media_type=export.NDJSON)
 
 
 @router.get("/{agent_id}", response_model=AgentRead)
-async def get_agent(agent_id: UUID, db: AsyncSessionDependency) -> AgentRead:
-    agent = await crud.get_agent(db, agent_id)
-    if not agent:
-        raise NotFound("Agent not found")
+async def get_agent(
+    agent_id: UUID, request: Request, db: ReadSessionDependency
+) -> Response:
+    """Supports `If-None-Match` / `If-Modified-Since` (304 when unchanged)."""
+    agent = await get_agent_or_404(db, agent_id)
+
+    headers = {
+        "ETag": make_etag(agent.id, agent.version),
+        "Last-Modified": http_date(agent.updated_at),
+    }
+    if is_fresh(request.headers, headers["ETag"], agent.updated_at):
+        return not_modified(headers)
 
-    return agent
+    return _raw_json(agent.model_dump_json().encode(), headers)
 
 
 @router.post("", response_model=AgentRead, status_code=status.HTTP_201_CREATED)
@@ -53,15 +172,209 @@ async def create_agent(payload: AgentCreate, db: AsyncSessionDependency) -> Agen
     return await crud.create_agent(db, payload)
 
 
+@router.post(
+    ":bulk",
+    response_model=AgentBulkResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/AgentCreate"},
+                    }
+                },
+                "application/x-ndjson": {
+                    "schema": {"$ref": "#/components/schemas/AgentCreate"}
+                },
+            },
+        }
+    },
+)
+async def create_agents_bulk(
+    request: Request, db: AsyncSessionDependency
+) -> AgentBulkResponse:
+    """
+    Create many agents in one request.
+
+    The body is either a JSON array of agents or, with
+    `Content-Type: application/x-ndjson`, one agent per line (streamed, not
+    buffered). Each row gets a result in input order: its new `id`, or the
+    validation `errors` that kept it out. Valid rows are inserted in chunks
+    of multi-row `INSERT ... RETURNING` and committed together.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in bulk.NDJSON_TYPES:
+        records = bulk.ndjson_lines(request.stream())
+    else:
+        records = bulk.json_array_items(await request.body())
+
+    return await bulk.load_agents(
+        db,
+        records,
+        chunk_size=settings.agents_bulk_chunk_size,
+        max_rows=settings.agents_bulk_max_rows,
+    )
+
+
 @router.post("/{agent_id}/ask", response_model=AskQuestionResponse)
 async def ask_hotel_bot(
-    agent_id: UUID, payload: AskQuestionRequest, db: AsyncSessionDependency
-) -> AskQuestionResponse:
-    agent = await crud.get_agent(db, agent_id)
-    if not agent:
-        raise NotFound("Agent not found")
+    agent_id: UUID, payload: AskQuestionRequest, db: ReadSessionDependency
+) -> Response:
+    """
+    Answer from the agent's own knowledge entries; the built-in hotel
+    knowledge base is used for the *Hotel Q&A Bot* when it has none.
+    """
+    index = await get_index(db, agent_id)
+    [match] = await answer_cache.resolve(agent_id, [payload.question], matcher(index))
+    question_log.record(agent_id, [payload.question], [match])
+
+    cached = _ANSWER_PAYLOADS.get(match.answer)
+    return _raw_json(cached or orjson.dumps({"answer": match.answer}))
+
+
+@router.post("/{agent_id}/ask:batch", response_model=AskBatchResponse)
+async def ask_hotel_bot_batch(
+    agent_id: UUID, payload: AskBatchRequest, db: ReadSessionDependency
+) -> Response:
+    """
+    Answer many questions in one round-trip, in input order.
 
-    if agent.name.lower() != AGENT_NAME.lower():
-        raise BadRequest(f"Only {AGENT_NAME} can answer questions")
+    The agent is resolved once and the uncached questions are matched in a
+    single off-loop call; repeated questions (after normalisation) are
+    scored once.
+    """
+    index = await get_index(db, agent_id)
+    matches = await answer_cache.resolve(agent_id, payload.questions, matcher(index))
+    question_log.record(agent_id, payload.questions, matches)
+
+    results = [
+        {"question": q, "answer": m.answer, "match": m.type, "score": m.score}
+        for q, m in zip(payload.questions, matches)
+    ]
+    return _raw_json(orjson.dumps({"results": results}))
+
+
+@router.websocket("/{agent_id}/chat")
+async def chat(
+    websocket: WebSocket, agent_id: UUID, sessions: ReadSessionFactoryDependency
+) -> None:
+    """
+    Conversational `/ask`: send `{"id": ..., "question": ...}` text frames,
+    get `{"id", "answer", "match", "score"}` back in order (see `ChatSession`).
+
+    The agent is looked up and checked once, before the handshake completes;
+    an unknown agent, or one that can't answer, is refused with close code
+    1008. No session is held between frames: the index comes from the
+    knowledge cache, so edits to the agent's entries apply right away.
+    """
+    try:
+        async with sessions() as db:
+            agent = await get_agent_or_404(db, agent_id)
+            await agent_index(db, agent)
+    except HTTPException as exc:
+        raise WebSocketException(status.WS_1008_POLICY_VIOLATION, exc.detail)
+
+    async def answer(questions: list[str]) -> list[Match]:
+        async with sessions() as db:  # lazy: only used on a knowledge cache miss
+            index = await agent_index(db, agent)
+        matches = await answer_cache.resolve(agent.id, questions, matcher(index))
+        question_log.record(agent.id, questions, matches)
+        return matches
+
+    await websocket.accept()
+    await ChatSession(
+        websocket,
+        answer,
+        max_pending=settings.chat_max_pending,
+        idle_timeout=settings.chat_idle_timeout_seconds,
+    ).run()
+
+
+@router.get("/{agent_id}/questions/unanswered", response_model=list[UnansweredQuestion])
+async def list_unanswered_questions(
+    agent_id: UUID,
+    db: ReadSessionDependency,
+    limit: int = Query(20, ge=1, le=500),
+    days: int | None = Query(None, ge=1, description="Only the last N days"),
+) -> list[UnansweredQuestion]:
+    """
+    The agent's most frequent questions that got the fallback answer, i.e.
+    what its knowledge base is missing. Counts come from the question log,
+    which is written a second or so behind the requests.
+    """
+    await get_agent_or_404(db, agent_id)
+
+    since = None
+    if days is not None:
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = await crud.get_unanswered_questions(db, agent_id, limit=limit, since=since)
+    return [UnansweredQuestion.model_validate(dict(row)) for row in rows]
+
+
+@router.get("/{agent_id}/knowledge", response_model=list[KnowledgeEntryRead])
+async def list_knowledge_entries(
+    agent_id: UUID, db: ReadSessionDependency
+) -> list[KnowledgeEntryRead]:
+    await get_agent_or_404(db, agent_id)
+
+    return await crud.get_knowledge_entries(db, agent_id)
+
+
+@router.post(
+    "/{agent_id}/knowledge",
+    response_model=KnowledgeEntryRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_knowledge_entry(
+    agent_id: UUID, payload: KnowledgeEntryCreate, db: AsyncSessionDependency
+) -> KnowledgeEntryRead:
+    await get_agent_or_404(db, agent_id)
+
+    try:
+        entry = await crud.create_knowledge_entry(db, agent_id, payload)
+    except IntegrityError:
+        await db.rollback()
+        raise Conflict("Question already exists for this agent")
+
+    knowledge_cache.put_entry(entry)
+    await answer_cache.invalidate(agent_id)
+    return entry
+
+
+@router.put("/{agent_id}/knowledge/{entry_id}", response_model=KnowledgeEntryRead)
+async def update_knowledge_entry(
+    agent_id: UUID,
+    entry_id: UUID,
+    payload: KnowledgeEntryCreate,
+    db: AsyncSessionDependency,
+) -> KnowledgeEntryRead:
+    entry = await crud.get_knowledge_entry(db, agent_id, entry_id)
+    if not entry:
+        raise NotFound("Knowledge entry not found")
+
+    try:
+        entry = await crud.update_knowledge_entry(db, entry, payload)
+    except IntegrityError:
+        await db.rollback()
+        raise Conflict("Question already exists for this agent")
+
+    knowledge_cache.put_entry(entry)
+    await answer_cache.invalidate(agent_id)
+    return entry
+
+
+@router.delete(
+    "/{agent_id}/knowledge/{entry_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_knowledge_entry(
+    agent_id: UUID, entry_id: UUID, db: AsyncSessionDependency
+) -> None:
+    entry = await crud.get_knowledge_entry(db, agent_id, entry_id)
+    if not entry:
+        raise NotFound("Knowledge entry not found")
 
-    return AskQuestionResponse(answer=answer(payload.question))
+    await crud.delete_knowledge_entry(db, entry)
+    knowledge_cache.drop_entry(agent_id, entry_id)
+    await answer_cache.invalidate(agent_id)
@@ -1,10 +1,14 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 
-from app.agent.enums import AgentStatus, AgentType
-from app.agent.types import NameStr, QuestionStr
+from app.agent.enums import AgentStatus, AgentType, MatchType
+from app.agent.types import AnswerStr, NameStr, QuestionStr
+from app.core.config import get_settings
+
+settings = get_settings()
 
 
 class AgentBase(BaseModel):
@@ -20,8 +24,22 @@ class AgentCreate(AgentBase):
 
 class AgentRead(AgentBase):
     id: UUID
+    version: int
+    updated_at: datetime
 
-    model_config = {"from_attributes": True}
+    model_config = {"from_attributes": True, "frozen": True}
+
+
+class AgentBulkResult(BaseModel):
+    index: int  # position in the request body
+    id: Optional[UUID] = None
+    errors: Optional[list[str]] = None
+
+
+class AgentBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[AgentBulkResult]
 
 
 class AskQuestionRequest(BaseModel):
@@ -30,3 +48,52 @@ class AskQuestionRequest(BaseModel):
 
 class AskQuestionResponse(BaseModel):
     answer: str
+
+
+class AskBatchRequest(BaseModel):
+    questions: list[QuestionStr] = Field(
+        min_length=1, max_length=settings.ask_batch_max_questions
+    )
+
+
+class ChatQuestion(AskQuestionRequest):
+    id: Optional[int | str] = None  # echoed in the reply to pair pipelined frames
+
+
+class AskBatchItem(AskQuestionResponse):
+    question: str
+    match: MatchType
+    score: float
+
+
+class AskBatchResponse(BaseModel):
+    results: list[AskBatchItem]
+
+
+class UnansweredQuestion(BaseModel):
+    q_norm: str  # normalised form the count is grouped by
+    example: str  # one original wording
+    count: int
+    last_asked_at: datetime
+
+
+class KnowledgeEntryBase(BaseModel):
+    question: QuestionStr
+    answer: AnswerStr
+
+
+class KnowledgeEntryCreate(KnowledgeEntryBase):
+    @field_validator("question")
+    @classmethod
+    def _has_words(cls, question: str) -> str:
+        # matching ignores everything but letters and digits; a key with none
+        # normalises to "" and would be a substring of every question
+        if not any(ch.isalnum() for ch in question):
+            raise ValueError("Question must contain letters or digits")
+        return question
+
+
+class KnowledgeEntryRead(KnowledgeEntryBase):
+    id: UUID
+
+    model_config = {"from_attributes": True}
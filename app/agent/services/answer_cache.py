@@ -0,0 +1,167 @@
+import json
+from typing import Awaitable, Callable, Protocol, Sequence
+from uuid import UUID
+
+from app.agent.enums import MatchType
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+
+from .qa import Match, _norm
+
+settings = get_settings()
+
+
+class AnswerCacheBackend(Protocol):
+    """
+    Storage behind `AnswerCache`.
+
+    Keys already embed the agent's knowledge-base *generation*, so
+    invalidating an agent is a single `bump()`: stale keys simply become
+    unreachable and age out.
+    """
+
+    async def get(self, key: str) -> Match | None: ...
+
+    async def set(self, key: str, match: Match) -> None: ...
+
+    async def generation(self, agent_id: UUID) -> int: ...
+
+    async def bump(self, agent_id: UUID) -> int: ...
+
+
+class SharedStore(Protocol):
+    """The few commands a shared key-value store (e.g. Redis) must provide."""
+
+    async def get(self, key: str) -> str | None: ...
+
+    async def set(self, key: str, value: str, ttl: float) -> None: ...
+
+    async def incr(self, key: str) -> int: ...
+
+
+class InMemoryAnswerBackend:
+    """Per-process LRU + TTL backend."""
+
+    def __init__(self, *, max_items: int, ttl: float | None) -> None:
+        self._answers: LRUCache[str, Match] = LRUCache(max_items=max_items, ttl=ttl)
+        self._generations: dict[UUID, int] = {}
+
+    async def get(self, key: str) -> Match | None:
+        return self._answers.get(key)
+
+    async def set(self, key: str, match: Match) -> None:
+        self._answers.set(key, match)
+
+    async def generation(self, agent_id: UUID) -> int:
+        return self._generations.get(agent_id, 0)
+
+    async def bump(self, agent_id: UUID) -> int:
+        generation = self._generations[agent_id] = (
+            self._generations.get(agent_id, 0) + 1
+        )
+        return generation
+
+
+class SharedAnswerBackend:
+    """Backend on a `SharedStore`, so every worker process shares hits and invalidations."""
+
+    def __init__(
+        self, store: SharedStore, *, ttl: float, prefix: str = "answers"
+    ) -> None:
+        self._store = store
+        self._ttl = ttl
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Match | None:
+        raw = await self._store.get(f"{self._prefix}:{key}")
+        if raw is None:
+            return None
+
+        answer, match_type, score = json.loads(raw)
+        return Match(answer, MatchType(match_type), score)
+
+    async def set(self, key: str, match: Match) -> None:
+        await self._store.set(f"{self._prefix}:{key}", json.dumps(match), self._ttl)
+
+    async def generation(self, agent_id: UUID) -> int:
+        raw = await self._store.get(f"{self._prefix}:gen:{agent_id}")
+        return 0 if raw is None else int(raw)
+
+    async def bump(self, agent_id: UUID) -> int:
+        return await self._store.incr(f"{self._prefix}:gen:{agent_id}")
+
+
+class AnswerCache:
+    """
+    Cache in front of the matcher, keyed on `(agent_id, _norm(question))`.
+
+    Hit/miss counters live here, independent of the backend; swap
+    `backend` at startup to share the cache between workers.
+    """
+
+    def __init__(self, backend: AnswerCacheBackend, *, enabled: bool = True) -> None:
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(agent_id: UUID, generation: int, q_norm: str) -> str:
+        return f"{agent_id}:{generation}:{q_norm}"
+
+    async def resolve(
+        self,
+        agent_id: UUID,
+        questions: Sequence[str],
+        compute: Callable[[list[str]], Awaitable[list[Match]]],
+    ) -> list[Match]:
+        """
+        Matches for *questions*, in order.
+
+        Cached answers are served directly; the distinct normalised misses
+        are handed to *compute* in one call and stored under the generation
+        read up-front, so a concurrent invalidation can't resurrect stale data.
+        """
+        q_norms = [_norm(q) for q in questions]
+        if not self.enabled:
+            return await compute(q_norms)
+
+        generation = await self.backend.generation(agent_id)
+        found: dict[str, Match] = {}
+        missing: list[str] = []
+        for q_norm in dict.fromkeys(q_norms):
+            match = await self.backend.get(self._key(agent_id, generation, q_norm))
+            if match is None:
+                missing.append(q_norm)
+            else:
+                found[q_norm] = match
+
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        if missing:
+            for q_norm, match in zip(missing, await compute(missing)):
+                found[q_norm] = match
+                await self.backend.set(self._key(agent_id, generation, q_norm), match)
+
+        return [found[q_norm] for q_norm in q_norms]
+
+    async def invalidate(self, agent_id: UUID) -> None:
+        """Forget every cached answer of *agent_id* (its knowledge base changed)."""
+        await self.backend.bump(agent_id)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def default_backend() -> InMemoryAnswerBackend:
+    # `invalidate()` only reaches this worker's generations: other workers
+    # drop their answers when they reload the knowledge base (see
+    # `KnowledgeCache`), at most `kb_cache_ttl_seconds` after an edit
+    return InMemoryAnswerBackend(
+        max_items=settings.answer_cache_max_items,
+        ttl=settings.answer_cache_ttl_seconds,
+    )
+
+
+answer_cache = AnswerCache(default_backend(), enabled=settings.answer_cache_enabled)
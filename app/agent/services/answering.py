@@ -0,0 +1,66 @@
+import time
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import crud
+from app.agent.schemas import AgentRead
+from app.core.executor import matcher_executor
+from app.core.metrics import registry
+from app.exceptions import BadRequest, NotFound
+
+from .knowledge import knowledge_cache
+from .qa import DEFAULT_INDEX, Match, QAIndex
+
+AGENT_NAME = "Hotel Q&A Bot"
+
+MATCHER_SECONDS = registry.histogram(
+    "matcher_seconds", "Answer matching time per call, executor queue wait included."
+)
+MATCHES = registry.counter(
+    "matcher_matches_total",
+    "Questions matched (answer cache misses), by match type.",
+    ("type",),
+)
+
+
+async def get_agent_or_404(db: AsyncSession, agent_id: UUID) -> AgentRead:
+    agent = await crud.get_agent_snapshot(db, agent_id)
+    if not agent:
+        raise NotFound("Agent not found")
+
+    return agent
+
+
+async def get_index(db: AsyncSession, agent_id: UUID) -> QAIndex:
+    """The matcher an agent answers from, or 400 if it can't answer at all."""
+    return await agent_index(db, await get_agent_or_404(db, agent_id))
+
+
+async def agent_index(db: AsyncSession, agent: AgentRead) -> QAIndex:
+    kb = await knowledge_cache.get(db, agent.id)
+    if kb.index:
+        return kb.index
+
+    if agent.name.lower() != AGENT_NAME.lower():
+        raise BadRequest(
+            f"Only {AGENT_NAME} or agents with knowledge entries can answer questions"
+        )
+
+    return DEFAULT_INDEX
+
+
+def matcher(index: QAIndex) -> Callable[[list[str]], Awaitable[list[Match]]]:
+    """*index*'s `match_many`, run off the event loop and instrumented."""
+
+    async def match_many(questions: list[str]) -> list[Match]:
+        # matching is pure CPU: keep it off the event loop
+        start = time.perf_counter()
+        matches = await matcher_executor.run(index.match_many, questions)
+        MATCHER_SECONDS.observe(time.perf_counter() - start)
+        for match in matches:
+            MATCHES.inc(match.type)
+        return matches
+
+    return match_many
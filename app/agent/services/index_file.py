@@ -0,0 +1,479 @@
+"""
+Read-only `QAIndex` files, memory-mapped by every worker process.
+
+A compiled index is flattened into one file of packed arrays: offsets plus
+UTF-8 bytes for the normalised keys and the answers, per-key character
+counts, the Aho-Corasick automaton as sorted edge lists and the BM25
+posting lists under a sorted term table. `open_index()` maps the file and
+answers straight from the mapping, so N workers on a host share one copy
+of the data through the page cache instead of holding N private ones;
+only the `SequenceMatcher`s built for fuzzy scoring stay per process.
+
+Files are written next to their final name and swapped in with
+`os.replace()`, so readers see either the old or the new index, never a
+partial one. Arrays use the native byte order: the files are a per-host
+cache (put them on a tmpfs such as /dev/shm), rebuilt from the database
+whenever they are missing, expired or unreadable.
+"""
+
+import fcntl
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import Final, Iterator
+from uuid import UUID
+
+from .qa import _NO_MATCH, QAIndex
+from .retrieval import BM25Index
+
+MAGIC: Final[bytes] = b"QAIX"
+VERSION: Final[int] = 1
+
+# magic, version, byte order, key count, generation
+_HEADER: Final[struct.Struct] = struct.Struct("<4sHBxIQ")
+_ENTRY: Final[struct.Struct] = struct.Struct("<QQ")  # section offset, length
+_ALIGN: Final[int] = 8
+_BYTE_ORDER: Final[int] = sys.byteorder == "big"
+
+# section name -> array typecode, in file order
+_SECTIONS: Final[dict[str, str]] = {
+    "key_offsets": "I",  # n + 1 byte offsets into `keys`
+    "keys": "B",  # each normalised key + "\0", so the section doubles as haystack
+    "key_lengths": "I",  # in characters
+    "answer_offsets": "I",
+    "answers": "B",
+    "count_offsets": "I",  # n + 1 offsets into count_chars / count_values
+    "count_chars": "I",  # code points
+    "count_values": "I",
+    "edge_offsets": "I",  # automaton: states + 1 offsets into edge_chars / targets
+    "edge_chars": "I",  # sorted per state
+    "edge_targets": "I",
+    "fail": "I",
+    "out": "i",
+    "term_offsets": "I",  # BM25: terms + 1 byte offsets into `terms`
+    "terms": "B",  # trigrams, sorted by their UTF-8 bytes
+    "posting_offsets": "I",
+    "posting_ids": "I",
+    "posting_impacts": "d",
+}
+
+_EXPIRED_NS: Final[int] = 0  # mtime of a file marked stale by `IndexStore.expire`
+_VERSION: Final[struct.Struct] = struct.Struct("<Q")  # per-agent lock file content
+
+# indexes mapped by unpickling (process-pool workers), by path
+_SHARED: Final[OrderedDict[str, tuple[tuple[int, int], QAIndex]]] = OrderedDict()
+_SHARED_MAX: Final[int] = 32
+
+
+class _Strings:
+    """`Sequence[str]` over packed UTF-8 with *trailing* separator bytes each."""
+
+    __slots__ = ("_data", "_offsets", "_trailing")
+
+    def __init__(self, data: memoryview, offsets: memoryview, trailing: int) -> None:
+        self._data = data
+        self._offsets = offsets
+        self._trailing = trailing
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        start, end = self._offsets[idx], self._offsets[idx + 1] - self._trailing
+        return str(self._data[start:end], "utf-8")
+
+
+class _Haystack:
+    """`str.find` for the packed keys section, in byte offsets like `key_offsets`."""
+
+    __slots__ = ("_buf", "_start", "_end")
+
+    def __init__(self, buf: mmap, start: int, end: int) -> None:
+        self._buf = buf
+        self._start = start
+        self._end = end
+
+    def find(self, q_norm: str) -> int:
+        # UTF-8 is self-synchronising: a byte match is a character match
+        pos = self._buf.find(q_norm.encode(), self._start, self._end)
+        return pos if pos == _NO_MATCH else pos - self._start
+
+
+class _Counts:
+    """Per-key `(char, count)` pairs, as `QAIndex._counts`."""
+
+    __slots__ = ("_offsets", "_chars", "_values")
+
+    def __init__(
+        self, offsets: memoryview, chars: memoryview, values: memoryview
+    ) -> None:
+        self._offsets = offsets
+        self._chars = chars
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx: int) -> zip:
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        return zip(map(chr, self._chars[start:end]), self._values[start:end])
+
+
+class _MappedAutomaton:
+    """`_Automaton.lowest()` over flat edge arrays (binary search per step)."""
+
+    __slots__ = ("_edges", "_chars", "_targets", "_fail", "_out")
+
+    def __init__(self, sections: dict[str, memoryview]) -> None:
+        self._edges = sections["edge_offsets"]
+        self._chars = sections["edge_chars"]
+        self._targets = sections["edge_targets"]
+        self._fail = sections["fail"]
+        self._out = sections["out"]
+
+    def lowest(self, text: str) -> int:
+        edges, chars, targets = self._edges, self._chars, self._targets
+        fail, out = self._fail, self._out
+        state = 0
+        best = out[0]
+        for ch in text:
+            code = ord(ch)
+            while True:
+                lo, hi = edges[state], edges[state + 1]
+                edge = bisect_left(chars, code, lo, hi)
+                if edge < hi and chars[edge] == code:
+                    state = targets[edge]
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            hit = out[state]
+            if hit != _NO_MATCH and (best == _NO_MATCH or hit < best):
+                best = hit
+                if best == 0:
+                    break
+        return best
+
+
+class _Bytes:
+    """Packed byte strings, comparable by `bisect`."""
+
+    __slots__ = ("_data", "_offsets")
+
+    def __init__(self, data: memoryview, offsets: memoryview) -> None:
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx: int) -> bytes:
+        return bytes(self._data[self._offsets[idx] : self._offsets[idx + 1]])
+
+
+class _Postings:
+    """`BM25Index._postings` lookups over the sorted term table."""
+
+    __slots__ = ("_terms", "_offsets", "_ids", "_impacts")
+
+    def __init__(self, sections: dict[str, memoryview]) -> None:
+        self._terms = _Bytes(sections["terms"], sections["term_offsets"])
+        self._offsets = sections["posting_offsets"]
+        self._ids = sections["posting_ids"]
+        self._impacts = sections["posting_impacts"]
+
+    def get(self, term: str) -> tuple[memoryview, memoryview] | None:
+        key = term.encode()
+        idx = bisect_left(self._terms, key)
+        if idx == len(self._terms) or self._terms[idx] != key:
+            return None
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        return self._ids[start:end], self._impacts[start:end]
+
+
+@dataclass(frozen=True, slots=True)
+class IndexFile:
+    """Where a mapped index came from; `current()` is false once it was swapped."""
+
+    path: Path
+    generation: int
+    size: int
+    inode: int
+    mtime_ns: int
+
+    def current(self) -> bool:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns) == (self.inode, self.mtime_ns)
+
+
+def _packed(strings: list[str], separator: bytes = b"") -> tuple[array, bytes]:
+    offsets, data = array("I", [0]), bytearray()
+    for s in strings:
+        data += s.encode() + separator
+        offsets.append(len(data))
+    return offsets, bytes(data)
+
+
+def _sections(index: QAIndex) -> dict[str, array | bytes]:
+    # reads the fields `QAIndex._compile` builds
+    sections: dict[str, array | bytes] = {}
+    norms = list(index._norms)
+    sections["key_offsets"], sections["keys"] = _packed(norms, b"\0")
+    sections["key_lengths"] = array("I", index._lengths)
+    sections["answer_offsets"], sections["answers"] = _packed(list(index._answers))
+
+    count_offsets, chars, values = array("I", [0]), array("I"), array("I")
+    for pairs in index._counts:
+        for ch, n in pairs:
+            chars.append(ord(ch))
+            values.append(n)
+        count_offsets.append(len(chars))
+    sections.update(count_offsets=count_offsets, count_chars=chars, count_values=values)
+
+    automaton = index._automaton
+    edge_offsets, edge_chars, targets = array("I", [0]), array("I"), array("I")
+    for goto in automaton._goto:
+        for code, target in sorted((ord(ch), t) for ch, t in goto.items()):
+            edge_chars.append(code)
+            targets.append(target)
+        edge_offsets.append(len(edge_chars))
+    sections.update(edge_offsets=edge_offsets, edge_chars=edge_chars)
+    sections["edge_targets"] = targets
+    sections["fail"] = array("I", automaton._fail)
+    sections["out"] = array("i", automaton._out)
+
+    postings = index._retriever._postings
+    terms = sorted(postings, key=str.encode)
+    sections["term_offsets"], sections["terms"] = _packed(terms)
+    posting_offsets, ids, impacts = array("I", [0]), array("I"), array("d")
+    for term in terms:
+        term_ids, term_impacts = postings[term]
+        ids.extend(term_ids)
+        impacts.extend(term_impacts)
+        posting_offsets.append(len(ids))
+    sections.update(posting_offsets=posting_offsets, posting_ids=ids)
+    sections["posting_impacts"] = impacts
+    return sections
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def write_index(index: QAIndex, path: Path, generation: int) -> None:
+    """Serialise *index* to *path*, atomically replacing any previous file."""
+    tmp = _write_temp(index, path, generation)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _write_temp(index: QAIndex, path: Path, generation: int) -> str:
+    """Serialise *index* into a new file next to *path*; returns its name."""
+    sections = _sections(index)
+    layout, offset = [], _aligned(_HEADER.size + _ENTRY.size * len(_SECTIONS))
+    for name in _SECTIONS:
+        section = sections[name]
+        data = section.tobytes() if isinstance(section, array) else section
+        layout.append((offset, data))
+        offset = _aligned(offset + len(data))
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, _BYTE_ORDER, len(index), generation))
+            for start, data in layout:
+                f.write(_ENTRY.pack(start, len(data)))
+            for start, data in layout:
+                f.seek(start)
+                f.write(data)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return tmp
+
+
+def _set_generation(name: str, generation: int) -> None:
+    with open(name, "r+b") as f:
+        header = _HEADER.unpack(f.read(_HEADER.size))
+        f.seek(0)
+        f.write(_HEADER.pack(*header[:-1], generation))
+
+
+def open_index(path: Path) -> tuple[QAIndex, IndexFile]:
+    """
+    Map the index file at *path*. Raises `FileNotFoundError`, or
+    `ValueError` for a file of another format version or byte order, or
+    one that is truncated or corrupt.
+    """
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        buf = mmap(f.fileno(), 0, access=ACCESS_READ)
+
+    magic, version, order, count, generation = _HEADER.unpack_from(buf)
+    if (magic, version, order) != (MAGIC, VERSION, _BYTE_ORDER):
+        raise ValueError(f"{path} is not a version {VERSION} index file for this host")
+
+    view = memoryview(buf)
+    starts: dict[str, int] = {}
+    sections: dict[str, memoryview] = {}
+    for i, (name, typecode) in enumerate(_SECTIONS.items()):
+        start, length = _ENTRY.unpack_from(buf, _HEADER.size + i * _ENTRY.size)
+        if (length and start + length > len(buf)) or length % struct.calcsize(typecode):
+            raise ValueError(f"{path} is truncated or corrupt")
+        starts[name] = start
+        sections[name] = view[start : start + length].cast(typecode)
+
+    retriever = BM25Index.__new__(BM25Index)
+    retriever._size = count
+    retriever._postings = _Postings(sections)
+
+    # the fields `QAIndex._compile` sets, backed by the mapping
+    index = QAIndex.__new__(QAIndex)
+    index._token = f"{path}:{generation}"
+    index._norms = _Strings(sections["keys"], sections["key_offsets"], 1)
+    index._answers = _Strings(sections["answers"], sections["answer_offsets"], 0)
+    index._lengths = sections["key_lengths"]
+    index._automaton = _MappedAutomaton(sections)
+    keys = starts["keys"]
+    index._haystack = _Haystack(buf, keys, keys + len(sections["keys"]))
+    index._starts = sections["key_offsets"]
+    index._matchers = [None] * count
+    index._counts = _Counts(
+        sections["count_offsets"], sections["count_chars"], sections["count_values"]
+    )
+    index._retriever = retriever
+    index._reduce = (open_shared, (str(path),))
+
+    file = IndexFile(path, generation, stat.st_size, stat.st_ino, stat.st_mtime_ns)
+    return index, file
+
+
+def open_shared(path: str) -> QAIndex:
+    """
+    Unpickle a mapped `QAIndex`: map the file the pickle names, once per
+    process and file version, instead of shipping or rebuilding the index.
+    """
+    stat = os.stat(path)
+    identity = (stat.st_ino, stat.st_mtime_ns)
+    cached = _SHARED.get(path)
+    if cached is not None and cached[0] == identity:
+        _SHARED.move_to_end(path)
+        return cached[1]
+
+    index, file = open_index(Path(path))
+    _SHARED[path] = ((file.inode, file.mtime_ns), index)
+    if len(_SHARED) > _SHARED_MAX:
+        _SHARED.popitem(last=False)
+    return index
+
+
+def _generation(path: Path) -> int:
+    try:
+        with open(path, "rb") as f:
+            return _HEADER.unpack(f.read(_HEADER.size))[-1]
+    except (FileNotFoundError, struct.error):
+        return 0
+
+
+class IndexStore:
+    """
+    One index file per agent in *directory*, shared by the workers of a host.
+
+    Files older than *max_age* seconds, or marked stale by `expire()` after
+    an edit, are not opened, so the next reader rebuilds them from the
+    database. Every write bumps the file's generation counter.
+
+    A reader rebuilding a file may have loaded the entries before an edit
+    in another worker, so it reads `version()` before loading them and
+    hands it to `save()`: every `expire()` bumps the version, and a save
+    whose version is out of date writes nothing. Both run under a per-agent
+    file lock, so an expiry cannot slip between that check and the swap.
+    The file is serialised before the lock is taken and only swapped in
+    under it: `version()` and `expire()` are called on the event loop and
+    must not wait for a large index to be written.
+    """
+
+    def __init__(self, directory: Path, *, max_age: float | None = None) -> None:
+        self.directory = directory
+        self.max_age = max_age
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, agent_id: UUID) -> Path:
+        return self.directory / f"{agent_id}.qaix"
+
+    @contextmanager
+    def _locked(self, agent_id: UUID) -> Iterator[int]:
+        """The agent's lock file, exclusively locked; it holds the version."""
+        fd = os.open(self.directory / f".{agent_id}.lock", os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield fd
+        finally:
+            os.close(fd)  # releases the lock
+
+    @staticmethod
+    def _read_version(fd: int) -> int:
+        data = os.pread(fd, _VERSION.size, 0)
+        return _VERSION.unpack(data)[0] if len(data) == _VERSION.size else 0
+
+    def version(self, agent_id: UUID) -> int:
+        """Read before loading the entries a `save()` will be built from."""
+        with self._locked(agent_id) as fd:
+            return self._read_version(fd)
+
+    def open(self, agent_id: UUID) -> tuple[QAIndex, IndexFile] | None:
+        path = self.path(agent_id)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            if mtime_ns == _EXPIRED_NS or (
+                self.max_age is not None
+                and time.time_ns() - mtime_ns > self.max_age * 1e9
+            ):
+                return None
+            return open_index(path)
+        except (FileNotFoundError, ValueError, TypeError, struct.error):
+            return None  # rebuilt by the caller
+
+    def save(
+        self, agent_id: UUID, index: QAIndex, version: int | None = None
+    ) -> tuple[QAIndex, IndexFile] | None:
+        """
+        Write *index* as the agent's next generation and map it; None, with
+        nothing written, if the agent was expired since *version* was read.
+        """
+        path = self.path(agent_id)
+        tmp = _write_temp(index, path, 0)  # the slow part, outside the lock
+        try:
+            with self._locked(agent_id) as fd:
+                if version is not None and self._read_version(fd) != version:
+                    return None
+                _set_generation(tmp, _generation(path) + 1)
+                os.replace(tmp, path)
+                return open_index(path)
+        finally:
+            with suppress(FileNotFoundError):
+                os.unlink(tmp)  # only still there when nothing was swapped in
+
+    def expire(self, agent_id: UUID) -> None:
+        """Mark the agent's file stale for every worker (see `IndexFile.current`)."""
+        with self._locked(agent_id) as fd:
+            os.pwrite(fd, _VERSION.pack(self._read_version(fd) + 1), 0)
+            try:
+                os.utime(self.path(agent_id), ns=(_EXPIRED_NS, _EXPIRED_NS))
+            except FileNotFoundError:
+                pass
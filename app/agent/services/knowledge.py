@@ -0,0 +1,160 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import crud
+from app.agent.models import KnowledgeEntry
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+
+from .answer_cache import AnswerCache, answer_cache
+from .index_file import IndexFile, IndexStore
+from .qa import QAIndex
+
+settings = get_settings()
+
+
+@dataclass(frozen=True, slots=True)
+class KnowledgeBase:
+    """An agent's entries (in match order) and the index compiled from them."""
+
+    entries: Mapping[UUID, tuple[str, str]]
+    index: QAIndex
+    # set when the index is mapped from a shared file; `entries` is then empty
+    file: IndexFile | None = None
+
+    @classmethod
+    def build(cls, entries: Mapping[UUID, tuple[str, str]]) -> "KnowledgeBase":
+        return cls(entries=entries, index=QAIndex(dict(entries.values())))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[KnowledgeEntry]) -> "KnowledgeBase":
+        return cls.build({row.id: (row.question, row.answer) for row in rows})
+
+    def nbytes(self) -> int:
+        return self.file.size if self.file is not None else self.index.nbytes()
+
+
+class KnowledgeCache:
+    """
+    Lazily built per-agent `KnowledgeBase`s kept in a memory-capped LRU.
+
+    The first `/ask` for an agent loads its entries; later questions are
+    answered without touching the database. Writes patch the cached entry
+    list in place instead of dropping it, so an edit never costs a reload.
+
+    With *files*, indexes are instead kept in memory-mapped files that all
+    workers of the host share (see `index_file`): a worker maps the file
+    when it is fresh and otherwise loads the entries, builds the index and
+    writes the file for the others. A write marks the file stale, and each
+    worker drops its mapping as soon as the file has changed.
+
+    Every knowledge base loaded afresh, from the database or a (re)mapped
+    file, invalidates the agent's cached *answers*, so they never outlive
+    the knowledge base they came from, even when the edit that replaced it
+    was made in another worker.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        ttl: float | None = None,
+        files: IndexStore | None = None,
+        answers: AnswerCache | None = None,
+    ) -> None:
+        self._lru: LRUCache[UUID, KnowledgeBase] = LRUCache(max_cost=max_bytes, ttl=ttl)
+        self._files = files
+        self._answers = answers
+        # bumped on every write so a load racing with it is not cached
+        self._epoch = 0
+
+    async def get(self, db: AsyncSession, agent_id: UUID) -> KnowledgeBase:
+        kb = self._lru.get(agent_id)
+        if kb is not None and (kb.file is None or kb.file.current()):
+            return kb
+
+        if self._files is not None and (mapped := self._files.open(agent_id)):
+            kb = KnowledgeBase({}, *mapped)
+            await self._loaded(agent_id)  # e.g. remapped after another worker's edit
+            self._store(agent_id, kb)
+            return kb
+
+        epoch = self._epoch
+        version = self._files.version(agent_id) if self._files is not None else 0
+        kb = KnowledgeBase.from_rows(await crud.get_knowledge_entries(db, agent_id))
+        await self._loaded(agent_id)
+        if self._files is not None:
+            # empty knowledge bases get a file too, so their first entry,
+            # added in any worker, reaches every worker
+            save = self._files.save
+            saved = await asyncio.to_thread(save, agent_id, kb.index, version)
+            if saved is None:  # an edit landed meanwhile, maybe in another worker
+                return kb  # answers this question, but is not kept
+            kb = KnowledgeBase({}, *saved)
+        if epoch == self._epoch:
+            self._store(agent_id, kb)
+
+        return kb
+
+    def put_entry(self, entry: KnowledgeEntry) -> None:
+        """Apply an added or edited entry to the cached knowledge base, if any."""
+        self._epoch += 1
+        kb = self._lru.pop(entry.agent_id)
+        if self._files is not None:
+            self._files.expire(entry.agent_id)  # every worker reloads it
+            return
+        if kb is None:
+            return
+
+        entries = dict(kb.entries)
+        entries[entry.id] = (entry.question, entry.answer)
+        self._store(entry.agent_id, KnowledgeBase.build(entries))
+
+    def drop_entry(self, agent_id: UUID, entry_id: UUID) -> None:
+        """Remove a deleted entry from the cached knowledge base, if any."""
+        self._epoch += 1
+        kb = self._lru.pop(agent_id)
+        if self._files is not None:
+            self._files.expire(agent_id)
+            return
+        if kb is None:
+            return
+
+        entries = {k: v for k, v in kb.entries.items() if k != entry_id}
+        self._store(agent_id, KnowledgeBase.build(entries))
+
+    def invalidate(self, agent_id: UUID) -> None:
+        self._epoch += 1
+        self._lru.pop(agent_id)
+        if self._files is not None:
+            self._files.expire(agent_id)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._lru.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._lru.stats()
+
+    async def _loaded(self, agent_id: UUID) -> None:
+        if self._answers is not None:
+            await self._answers.invalidate(agent_id)
+
+    def _store(self, agent_id: UUID, kb: KnowledgeBase) -> None:
+        self._lru.set(agent_id, kb, cost=kb.nbytes())
+
+
+knowledge_cache = KnowledgeCache(
+    max_bytes=settings.kb_cache_max_bytes,
+    ttl=settings.kb_cache_ttl_seconds,
+    files=(
+        IndexStore(settings.kb_index_dir, max_age=settings.kb_cache_ttl_seconds)
+        if settings.kb_index_dir is not None
+        else None
+    ),
+    answers=answer_cache,
+)
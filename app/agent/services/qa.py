@@ -1,5 +1,14 @@
+import copy
+import sys
+import uuid
+from bisect import bisect_right
+from collections import Counter, OrderedDict, deque
 from difflib import SequenceMatcher
-from typing import Final
+from typing import Callable, Final, Mapping, NamedTuple, Sequence
+
+from app.agent.enums import MatchType
+
+from .retrieval import BM25Index
 
 _QA_PAIRS: Final[dict[str, str]] = {
     "check-in": "Check-in starts at 16:00 (4 PM) and is open until late.",
@@ -31,6 +40,20 @@ _QA_PAIRS: Final[dict[str, str]] = {
 _FALLBACK = "Sorry, I couldn't find an answer to that."
 _MIN_FUZZ_RATIO: Final[float] = 0.56
 
+_NO_MATCH: Final[int] = -1
+_SEPARATOR: Final[str] = "\0"  # never survives _norm(), so it can't be matched
+
+# Above this many keys the fuzzy pass only re-ranks the BM25 shortlist
+# instead of bounding every key, trading exactness for flat latency.
+_SHORTLIST_MIN_KEYS: Final[int] = 512
+_SHORTLIST_SIZE: Final[int] = 64
+
+
+class Match(NamedTuple):
+    answer: str
+    type: MatchType
+    score: float  # similarity of the winning key in [0, 1]; 0 for fallback
+
 
 def _norm(s: str) -> str:
     """
@@ -48,18 +71,285 @@ def _ratio(a: str, b: str) -> float:
     return SequenceMatcher(None, a, b).ratio()
 
 
-def answer(question: str) -> str:
-    q_norm = _norm(question)
+def _ratio_bound(a_len: int, b_len: int) -> float:
+    """Upper bound of `_ratio()` for strings of the given lengths."""
+    return 2.0 * min(a_len, b_len) / (a_len + b_len)
+
+
+def _beaten(bound: float, idx: int, best_ratio: float, best_idx: int) -> bool:
+    """True when a key capped at *bound* can no longer win `max()`-style."""
+    return bound < best_ratio or (bound == best_ratio and idx > best_idx)
+
+
+class _Automaton:
+    """
+    Aho-Corasick automaton over the normalised keys.
+
+    `lowest(text)` returns the smallest key index occurring in *text*
+    in a single left-to-right scan, or `_NO_MATCH`.
+    """
+
+    __slots__ = ("_goto", "_fail", "_out")
+
+    def __init__(self, patterns: tuple[str, ...]) -> None:
+        goto: list[dict[str, int]] = [{}]
+        out: list[int] = [len(patterns)]
+
+        for idx, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(len(patterns))
+                state = nxt
+            out[state] = min(out[state], idx)
+
+        # breadth-first pass: failure links + lowest index reachable through them
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        for child in queue:
+            out[child] = min(out[child], out[0])
+        while queue:
+            state = queue.popleft()
+            for ch, child in goto[state].items():
+                queue.append(child)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                out[child] = min(out[child], out[fail[child]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [_NO_MATCH if o == len(patterns) else o for o in out]
+
+    def lowest(self, text: str) -> int:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        best = out[0]
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = out[state]
+            if hit != _NO_MATCH and (best == _NO_MATCH or hit < best):
+                best = hit
+                if best == 0:
+                    break
+        return best
+
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(edges) for edges in self._goto) + 16 * len(self._fail)
+
+
+class QAIndex:
+    """
+    Precompiled matcher over a fixed set of Q&A pairs.
+
+    Keys are normalised once at build time; every `answer()` call then only
+    pays for normalising the question:
+
+    * substring pass - one Aho-Corasick scan (key ⊂ question) plus one
+      `str.find` over the packed keys (question ⊂ key);
+    * fuzzy pass - keys are visited in BM25 trigram-score order and skipped
+      when their length / character-multiset bounds can't beat the best
+      ratio found so far, so `SequenceMatcher` only runs on real contenders.
+
+    Up to `_SHORTLIST_MIN_KEYS` keys the results are identical to the naive
+    "first key in insertion order wins" scan, including tie-breaking. Larger
+    knowledge bases only re-rank the top `_SHORTLIST_SIZE` BM25 candidates.
+    """
+
+    __slots__ = (
+        "_token",
+        "_answers",
+        "_norms",
+        "_lengths",
+        "_automaton",
+        "_haystack",
+        "_starts",
+        "_matchers",
+        "_counts",
+        "_retriever",
+        "_reduce",
+    )
+
+    def __init__(self, pairs: Mapping[str, str]) -> None:
+        self._compile(tuple(_norm(k) for k in pairs), tuple(pairs.values()))
+
+    def _compile(self, norms: tuple[str, ...], answers: tuple[str, ...]) -> None:
+        self._token = uuid.uuid4().hex
+        self._answers = answers
+        self._norms = norms
+        self._lengths = tuple(map(len, norms))
+        self._automaton = _Automaton(self._norms)
 
-    # 1️⃣ exact / substring pass on normalised forms
-    for k, v in _QA_PAIRS.items():
-        k_norm = _norm(k)
-        if k_norm in q_norm or q_norm in k_norm:
-            return v
+        self._haystack = _SEPARATOR.join(self._norms)
+        starts, offset = [], 0
+        for k_norm in self._norms:
+            starts.append(offset)
+            offset += len(k_norm) + len(_SEPARATOR)
+        self._starts = starts
 
-    # 2️⃣ fuzzy pass on normalised forms (handles typos like 'cheeckin')
-    best_key = max(_QA_PAIRS, key=lambda k: _ratio(q_norm, _norm(k)))
-    if _ratio(q_norm, _norm(best_key)) >= _MIN_FUZZ_RATIO:
-        return _QA_PAIRS[best_key]
+        # SequenceMatcher caches its analysis of `b`: build one per key on demand
+        self._matchers: list[SequenceMatcher | None] = [None] * len(self._norms)
+        self._counts = tuple(tuple(Counter(k).items()) for k in self._norms)
+        self._retriever = BM25Index(self._norms)
+        self._reduce: tuple[Callable[..., "QAIndex"], tuple[object, ...]] | None = None
 
-    return _FALLBACK
+    def __len__(self) -> int:
+        return len(self._norms)
+
+    def __reduce__(self) -> tuple[Callable[..., "QAIndex"], tuple[object, ...]]:
+        if self._reduce is not None:  # mapped from a shared index file
+            return self._reduce
+        # ship the source data, not the derived structures; see _restore_index.
+        # That is still O(knowledge base) per call: pools want index files
+        return _restore_index, (self._token, self._norms, self._answers)
+
+    def nbytes(self) -> int:
+        """Rough memory footprint, used to bound index caches."""
+        strings = sum(map(sys.getsizeof, self._answers + self._norms))
+        return (
+            strings
+            + sys.getsizeof(self._haystack)
+            + 8 * len(self._starts)
+            + 64 * len(self._counts)
+            + self._automaton.nbytes()
+            + self._retriever.nbytes()
+        )
+
+    def _substring_hit(self, q_norm: str) -> int:
+        hit = self._automaton.lowest(q_norm)
+
+        pos = self._haystack.find(q_norm)
+        if pos != _NO_MATCH:
+            container = bisect_right(self._starts, pos) - 1
+            if hit == _NO_MATCH or container < hit:
+                hit = container
+
+        return hit
+
+    def _ratio_at(self, q_norm: str, idx: int) -> float:
+        matcher = self._matchers[idx]
+        if matcher is None:
+            matcher = self._matchers[idx] = SequenceMatcher(None, "", self._norms[idx])
+
+        # shallow copy shares the cached `b` analysis but keeps callers independent
+        matcher = copy.copy(matcher)
+        matcher.set_seq1(q_norm)
+        return matcher.ratio()
+
+    def _candidates(self, q_norm: str) -> list[int]:
+        """Key indices worth scoring, most promising first."""
+        if len(self._norms) > _SHORTLIST_MIN_KEYS:
+            return self._retriever.top_k(q_norm, _SHORTLIST_SIZE)
+
+        ranked = self._retriever.ranked(q_norm)
+        scored = set(ranked)
+        ranked.extend(idx for idx in range(len(self._norms)) if idx not in scored)
+        return ranked
+
+    def _fuzzy_hit(self, q_norm: str, min_ratio: float) -> tuple[int, float]:
+        q_len = len(q_norm)
+        q_counts = Counter(q_norm)
+        best_idx, best_ratio = _NO_MATCH, -1.0
+
+        for idx in self._candidates(q_norm):
+            k_len = self._lengths[idx]
+            bound = _ratio_bound(q_len, k_len)
+            if bound < min_ratio or _beaten(bound, idx, best_ratio, best_idx):
+                continue
+
+            # same bound as SequenceMatcher.quick_ratio(), minus the rescan of `b`
+            common = sum(min(n, q_counts[ch]) for ch, n in self._counts[idx])
+            bound = 2.0 * common / (q_len + k_len)
+            if bound < min_ratio or _beaten(bound, idx, best_ratio, best_idx):
+                continue
+
+            ratio = self._ratio_at(q_norm, idx)
+            if ratio > best_ratio or (ratio == best_ratio and idx < best_idx):
+                best_idx, best_ratio = idx, ratio
+
+        if best_ratio < min_ratio:
+            return _NO_MATCH, 0.0
+        return best_idx, best_ratio
+
+    def match(self, question: str, min_ratio: float | None = None) -> Match:
+        """Best answer for *question*, with how it was found and its similarity."""
+        if not self._norms:
+            return Match(_FALLBACK, MatchType.FALLBACK, 0.0)
+
+        q_norm = _norm(question)
+        threshold = _MIN_FUZZ_RATIO if min_ratio is None else min_ratio
+
+        # 1️⃣ exact / substring pass on normalised forms
+        hit = self._substring_hit(q_norm)
+        if hit != _NO_MATCH:
+            k_norm = self._norms[hit]
+            if k_norm == q_norm:
+                return Match(self._answers[hit], MatchType.EXACT, 1.0)
+            score = _ratio_bound(len(q_norm), len(k_norm))
+            return Match(self._answers[hit], MatchType.SUBSTRING, score)
+
+        # 2️⃣ fuzzy pass on normalised forms (handles typos like 'cheeckin')
+        hit, ratio = self._fuzzy_hit(q_norm, threshold)
+        if hit != _NO_MATCH:
+            return Match(self._answers[hit], MatchType.FUZZY, ratio)
+
+        return Match(_FALLBACK, MatchType.FALLBACK, 0.0)
+
+    def match_many(self, questions: Sequence[str]) -> list[Match]:
+        """`match()` for every question (in order), scoring each normalised form once."""
+        memo: dict[str, Match] = {}
+        results = []
+        for question in questions:
+            q_norm = _norm(question)
+            found = memo.get(q_norm)
+            if found is None:
+                found = memo[q_norm] = self.match(q_norm)
+            results.append(found)
+        return results
+
+    def answer(self, question: str, min_ratio: float | None = None) -> str:
+        return self.match(question, min_ratio).answer
+
+    def warm(self) -> None:
+        """Build every per-key `SequenceMatcher` now instead of on first use."""
+        for idx, matcher in enumerate(self._matchers):
+            if matcher is None:
+                self._matchers[idx] = SequenceMatcher(None, "", self._norms[idx])
+
+
+# indexes rebuilt from pickles (process-pool workers), keyed by build token
+_RESTORED: Final[OrderedDict[str, QAIndex]] = OrderedDict()
+_RESTORED_MAX: Final[int] = 32
+
+
+def _restore_index(
+    token: str, norms: tuple[str, ...], answers: tuple[str, ...]
+) -> QAIndex:
+    """Unpickle a `QAIndex`, compiling each distinct index once per process."""
+    index = _RESTORED.get(token)
+    if index is None:
+        index = QAIndex.__new__(QAIndex)
+        index._compile(norms, answers)
+        index._token = token
+        _RESTORED[token] = index
+        if len(_RESTORED) > _RESTORED_MAX:
+            _RESTORED.popitem(last=False)
+    else:
+        _RESTORED.move_to_end(token)
+    return index
+
+
+DEFAULT_INDEX: Final[QAIndex] = QAIndex(_QA_PAIRS)
+# every answer the built-in knowledge base can give
+BUILTIN_ANSWERS: Final[tuple[str, ...]] = (*_QA_PAIRS.values(), _FALLBACK)
+
+
+def answer(question: str) -> str:
+    return DEFAULT_INDEX.answer(question)
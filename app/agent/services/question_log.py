@@ -0,0 +1,191 @@
+import asyncio
+import contextlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncContextManager, Callable, Sequence
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import crud
+from app.core.config import get_settings
+from app.db.database import AsyncSessionLocal
+
+from .qa import Match, _norm
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QuestionLogStats:
+    pending: int = 0
+    written: int = 0
+    dropped: int = 0  # the buffer was full
+    failed: int = 0  # lost with a batch whose INSERT raised
+    pruned: int = 0  # deleted once older than the retention window
+
+
+class QuestionLogWriter:
+    """
+    Write-behind log of asked questions and how they were answered.
+
+    `record()` only appends to an in-memory buffer, so `/ask` never waits
+    on the database. A background task flushes the buffer in multi-row
+    INSERTs of at most *batch_size* rows, as soon as a batch is full or
+    every *flush_interval* seconds. When *max_pending* rows are waiting,
+    new ones are dropped (and counted) instead of blocking requests.
+    `stop()` flushes what is left.
+
+    With a *retention* (seconds), the same task deletes older rows at
+    start-up and then every *prune_interval* seconds, so the table holds
+    about *retention* worth of questions instead of growing forever.
+    """
+
+    def __init__(
+        self,
+        sessions: Callable[[], AsyncContextManager[AsyncSession]],
+        *,
+        max_pending: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        retention: float | None = None,
+        prune_interval: float = 3600.0,
+        enabled: bool = True,
+    ) -> None:
+        self.sessions = sessions
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self.stats = QuestionLogStats()
+        self._pending: list[dict] = []
+        # loop-bound, so created by start() in the loop that runs the writer
+        self._batch_ready: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    def record(
+        self, agent_id: UUID, questions: Sequence[str], matches: Sequence[Match]
+    ) -> None:
+        if not self.enabled:
+            return
+
+        asked_at = datetime.now(timezone.utc)
+        for question, match in zip(questions, matches):
+            if len(self._pending) >= self.max_pending:
+                self.stats.dropped += 1
+                continue
+            self._pending.append(
+                {
+                    "agent_id": agent_id,
+                    "question": question,
+                    "match": match.type,
+                    "score": match.score,
+                    "asked_at": asked_at,
+                }
+            )
+
+        self.stats.pending = len(self._pending)
+        if len(self._pending) >= self.batch_size and self._batch_ready is not None:
+            self._batch_ready.set()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of rows written."""
+        written = failed = 0
+        error: Exception | None = None
+        while self._pending:
+            batch = self._pending[: self.batch_size]
+            del self._pending[: self.batch_size]
+            self.stats.pending = len(self._pending)
+
+            for row in batch:  # normalised here, off the request path
+                row["q_norm"] = _norm(row["question"])
+            try:
+                async with self.sessions() as db:
+                    await crud.insert_question_log(db, batch)
+                    await db.commit()
+            except Exception as exc:
+                # analytics only: losing a batch must not take the writer down
+                self.stats.failed += len(batch)
+                failed += len(batch)
+                error = exc
+                continue
+
+            self.stats.written += len(batch)
+            written += len(batch)
+
+        if error is not None:  # once per flush, not per batch of an outage
+            logger.error("Question log: lost %d rows", failed, exc_info=error)
+        return written
+
+    async def prune(self) -> int:
+        """Delete the rows older than *retention*; returns how many."""
+        if self.retention is None:
+            return 0
+        before = datetime.now(timezone.utc) - timedelta(seconds=self.retention)
+        async with self.sessions() as db:
+            deleted = await crud.delete_question_log(db, before=before)
+            await db.commit()
+        self.stats.pruned += deleted
+        return deleted
+
+    async def _run(self, batch_ready: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        next_prune = loop.time()
+        while not self._stopping:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(batch_ready.wait(), self.flush_interval)
+            batch_ready.clear()
+            await self.flush()
+
+            if self.retention is not None and loop.time() >= next_prune:
+                next_prune = loop.time() + self.prune_interval
+                try:
+                    await self.prune()
+                except Exception:
+                    logger.exception("Question log: pruning failed")
+
+    def _running(self) -> bool:
+        """Whether the writer task is alive in the current event loop."""
+        task = self._task
+        return (
+            task is not None
+            and not task.done()
+            and task.get_loop() is asyncio.get_running_loop()
+        )
+
+    def start(self) -> None:
+        if self._running():
+            return
+        # a task or event left from another loop (an earlier lifespan) is dropped
+        self._stopping = False
+        self._batch_ready = asyncio.Event()
+        self._task = asyncio.create_task(self._run(self._batch_ready))
+
+    async def stop(self) -> None:
+        # no cancel: a batch cut off mid-INSERT would be lost
+        if self._running():
+            self._stopping = True
+            self._batch_ready.set()
+            await self._task
+        self._task = None
+        self._batch_ready = None
+        await self.flush()
+
+
+question_log = QuestionLogWriter(
+    AsyncSessionLocal,
+    max_pending=settings.question_log_max_pending,
+    batch_size=settings.question_log_batch_size,
+    flush_interval=settings.question_log_flush_seconds,
+    retention=(
+        settings.question_log_retention_days * 86400
+        if settings.question_log_retention_days > 0
+        else None
+    ),
+    enabled=settings.question_log_enabled,
+)
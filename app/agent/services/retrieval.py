@@ -0,0 +1,97 @@
+import heapq
+import math
+import sys
+from array import array
+from collections import Counter
+from typing import Final, Sequence
+
+_GRAM: Final[int] = 3
+_K1: Final[float] = 1.2
+_B: Final[float] = 0.75
+
+
+def grams(s: str) -> list[str]:
+    """
+    Character trigrams of a normalised string (the string itself if shorter).
+
+    Trigrams rather than words are the index terms, so a typo only costs
+    the few grams it touches instead of the whole token.
+
+    Example:
+        "parking" -> ["par", "ark", "rki", "kin", "ing"]
+    """
+    if len(s) <= _GRAM:
+        return [s] if s else []
+    return [s[i : i + _GRAM] for i in range(len(s) - _GRAM + 1)]
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over the trigrams of normalised keys.
+
+    Each posting stores its precomputed BM25 impact (idf x saturated tf),
+    packed into `array` buffers, so scoring a question is a flat
+    accumulate over the postings of its trigrams - no per-key work.
+    """
+
+    __slots__ = ("_postings", "_size")
+
+    def __init__(self, docs: Sequence[str], *, k1: float = _K1, b: float = _B) -> None:
+        self._size = len(docs)
+
+        doc_terms = [Counter(grams(doc)) for doc in docs]
+        lengths = [sum(terms.values()) for terms in doc_terms]
+        avg_len = (sum(lengths) / len(lengths)) if lengths and any(lengths) else 1.0
+
+        raw: dict[str, tuple[array, list[int]]] = {}
+        for idx, terms in enumerate(doc_terms):
+            for term, tf in terms.items():
+                ids, tfs = raw.setdefault(term, (array("I"), []))
+                ids.append(idx)
+                tfs.append(tf)
+
+        postings: dict[str, tuple[array, array]] = {}
+        for term, (ids, tfs) in raw.items():
+            df = len(ids)
+            idf = math.log(1.0 + (self._size - df + 0.5) / (df + 0.5))
+            impacts = array("d")
+            for idx, tf in zip(ids, tfs):
+                norm = k1 * (1.0 - b + b * lengths[idx] / avg_len)
+                impacts.append(idf * tf * (k1 + 1.0) / (tf + norm))
+            postings[term] = (ids, impacts)
+
+        self._postings = postings
+
+    def __len__(self) -> int:
+        return self._size
+
+    def nbytes(self) -> int:
+        """Rough memory footprint of the postings."""
+        return sum(
+            sys.getsizeof(term)
+            + ids.itemsize * len(ids)
+            + impacts.itemsize * len(impacts)
+            for term, (ids, impacts) in self._postings.items()
+        )
+
+    def scores(self, q_norm: str) -> dict[int, float]:
+        """BM25 score of every key sharing at least one trigram with *q_norm*."""
+        acc: dict[int, float] = {}
+        get = acc.get
+        for term, qtf in Counter(grams(q_norm)).items():
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            for idx, impact in zip(*posting):
+                acc[idx] = get(idx, 0.0) + qtf * impact
+        return acc
+
+    def ranked(self, q_norm: str) -> list[int]:
+        """Every scored key index, best first (ties by insertion order)."""
+        acc = self.scores(q_norm)
+        return sorted(acc, key=lambda idx: (-acc[idx], idx))
+
+    def top_k(self, q_norm: str, k: int) -> list[int]:
+        """The *k* best scoring key indices, best first (ties by insertion order)."""
+        acc = self.scores(q_norm)
+        return heapq.nsmallest(k, acc, key=lambda idx: (-acc[idx], idx))
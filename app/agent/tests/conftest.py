@@ -3,8 +3,23 @@ from uuid import uuid4
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.agent.cache import agent_cache
 from app.agent.enums import AgentStatus, AgentType
 from app.agent.models import Agent
+from app.agent.services.answer_cache import answer_cache, default_backend
+from app.agent.services.knowledge import knowledge_cache
+from app.agent.services.question_log import question_log
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches() -> None:
+    """In-process caches outlive the per-test database; start each test cold."""
+    agent_cache.clear()
+    agent_cache.reset_stats()
+    knowledge_cache.clear()
+    answer_cache.backend = default_backend()
+    answer_cache.hits = answer_cache.misses = 0
+    question_log._pending.clear()
 
 
 @pytest.fixture
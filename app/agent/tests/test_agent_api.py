@@ -3,10 +3,12 @@ from uuid import uuid4
 import pytest
 from fastapi import status
 from httpx import AsyncClient
+from pytest import MonkeyPatch
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.agent.enums import AgentStatus, AgentType
 from app.agent.models import Agent
+from app.agent.routes import settings
 from app.agent.tests.utils import create_agent
 
 RETRIEVE_ENDPOINT = "/agents/{agent_id}"
@@ -94,3 +96,82 @@ class TestListAgentsAPI:
 
         error_fields = {err["loc"][-1] for err in response.json()["detail"]}
         assert bad_field in error_fields
+
+
+class TestListAgentsPagination:
+    """Keyset pagination and field projection for the list endpoint."""
+
+    async def _pages(self, client: AsyncClient, params: dict) -> list[list[dict]]:
+        pages, cursor = [], None
+        while True:
+            query = dict(params, **({"cursor": cursor} if cursor else {}))
+            response = await client.get(LIST_ENDPOINT, params=query)
+            assert response.status_code == status.HTTP_200_OK
+            pages.append(response.json())
+
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                return pages
+
+    async def test_walks_all_pages_in_name_order(
+        self, seeded_agents: list[Agent], client: AsyncClient
+    ):
+        pages = await self._pages(client, {"limit": 3})
+
+        assert [len(page) for page in pages] == [3, 1]
+        names = [item["name"] for page in pages for item in page]
+        assert names == sorted(agent.name for agent in seeded_agents)
+
+    async def test_duplicate_names_are_not_skipped(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        for _ in range(5):
+            await create_agent(db, name="Twin")
+
+        pages = await self._pages(client, {"limit": 2})
+
+        ids = [item["id"] for page in pages for item in page]
+        assert len(ids) == len(set(ids)) == 5
+
+    async def test_filters_apply_across_pages(
+        self, seeded_agents: list[Agent], client: AsyncClient
+    ):
+        pages = await self._pages(client, {"limit": 1, "type": AgentType.SALES.value})
+
+        assert [page[0]["name"] for page in pages] == ["Alpha Sales", "Delta Sales"]
+
+    async def test_unpaginated_list_is_capped(
+        self, seeded_agents: list[Agent], client: AsyncClient, monkeypatch: MonkeyPatch
+    ):
+        monkeypatch.setattr(settings, "agents_list_max_size", 2)
+
+        response = await client.get(LIST_ENDPOINT)
+
+        assert len(response.json()) == 2
+        assert "x-next-cursor" in response.headers
+
+    async def test_field_projection(
+        self, seeded_agents: list[Agent], client: AsyncClient
+    ):
+        pages = await self._pages(client, {"limit": 3, "fields": "name"})
+
+        items = [item for page in pages for item in page]
+        assert len(items) == 4
+        assert all(item.keys() == {"name"} for item in items)
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"cursor": "not-a-cursor"},
+            {"fields": "name,secret"},
+            {"fields": ","},
+        ],
+    )
+    async def test_bad_paging_params(self, client: AsyncClient, params: dict):
+        response = await client.get(LIST_ENDPOINT, params=params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("limit", [0, settings.agents_page_max_size + 1])
+    async def test_limit_bounds(self, client: AsyncClient, limit: int):
+        response = await client.get(LIST_ENDPOINT, params={"limit": limit})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,80 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.cache import agent_cache
+from app.agent.crud import get_agent_snapshot
+from app.agent.enums import AgentType
+from app.agent.tests.utils import create_agent
+
+RETRIEVE_ENDPOINT = "/agents/{agent_id}"
+
+
+class TestAgentCache:
+    """Read-through caching of agent snapshots."""
+
+    async def test_second_read_is_a_hit(self, db: AsyncSession):
+        agent = await create_agent(db)
+
+        first = await get_agent_snapshot(db, agent.id)
+        second = await get_agent_snapshot(db, agent.id)
+
+        assert first is second
+        assert agent_cache.stats()["hits"] == 1
+        assert agent_cache.stats()["misses"] == 1
+
+    async def test_snapshots_are_immutable(self, db: AsyncSession):
+        agent = await create_agent(db)
+        snapshot = await get_agent_snapshot(db, agent.id)
+
+        with pytest.raises(ValidationError):
+            snapshot.name = "Renamed"
+
+    async def test_unknown_ids_are_negatively_cached(self, db: AsyncSession):
+        agent_id = uuid4()
+
+        assert await get_agent_snapshot(db, agent_id) is None
+        assert await get_agent_snapshot(db, agent_id) is None
+
+        stats = agent_cache.stats()
+        assert stats["misses"] == 1
+        assert stats["negative_hits"] == 1
+
+    async def test_load_racing_a_write_is_not_cached(self, db: AsyncSession):
+        agent = await create_agent(db)
+        epoch = agent_cache.epoch()
+
+        agent_cache.invalidate(uuid4())  # any write in between
+        agent_cache.store(agent.id, None, epoch)
+
+        assert not agent_cache.is_missing(agent.id)
+
+
+class TestAgentCacheAPI:
+    """Routes read through the cache; creation writes through it."""
+
+    async def test_created_agent_is_served_from_cache(self, client: AsyncClient):
+        response = await client.post(
+            "/agents", json={"name": "Cached", "type": AgentType.SUPPORT}
+        )
+        agent_id = response.json()["id"]
+
+        response = await client.get(RETRIEVE_ENDPOINT.format(agent_id=agent_id))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == "Cached"
+        assert agent_cache.stats()["hits"] == 1
+        assert agent_cache.stats()["misses"] == 0
+
+    async def test_404_flood_hits_database_once(self, client: AsyncClient):
+        url = RETRIEVE_ENDPOINT.format(agent_id=uuid4())
+
+        for _ in range(3):
+            response = await client.get(url)
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        assert agent_cache.stats()["misses"] == 1
+        assert agent_cache.stats()["negative_hits"] == 2
@@ -0,0 +1,162 @@
+from uuid import UUID, uuid4
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import crud
+from app.agent.enums import MatchType
+from app.agent.schemas import KnowledgeEntryCreate
+from app.agent.services.answer_cache import (
+    AnswerCache,
+    InMemoryAnswerBackend,
+    SharedAnswerBackend,
+    answer_cache,
+)
+from app.agent.services.knowledge import knowledge_cache
+from app.agent.services.qa import _QA_PAIRS, Match, QAIndex
+from app.agent.tests.utils import create_agent
+
+ASK_ENDPOINT = "/agents/{agent_id}/ask"
+KNOWLEDGE_ENDPOINT = "/agents/{agent_id}/knowledge"
+
+
+class FakeStore:
+    """Dict-backed stand-in for a shared store such as Redis (TTL ignored)."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self.data[key] = value
+
+    async def incr(self, key: str) -> int:
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value)
+        return value
+
+
+class CountingMatcher:
+    def __init__(self) -> None:
+        self.index = QAIndex(_QA_PAIRS)
+        self.calls: list[list[str]] = []
+
+    async def __call__(self, questions: list[str]) -> list[Match]:
+        self.calls.append(questions)
+        return self.index.match_many(questions)
+
+
+class TestAnswerCache:
+    """Hits, misses and invalidation of the cache in front of the matcher."""
+
+    async def test_normalised_repeats_hit(self) -> None:
+        cache = AnswerCache(InMemoryAnswerBackend(max_items=10, ttl=None))
+        matcher = CountingMatcher()
+        agent_id = uuid4()
+
+        await cache.resolve(agent_id, ["Check-in time?"], matcher)
+        [match] = await cache.resolve(agent_id, ["check in TIME"], matcher)
+
+        assert match.answer == _QA_PAIRS["check-in"]
+        assert matcher.calls == [["checkintime"]]
+        assert cache.stats() == {"hits": 1, "misses": 1}
+
+    async def test_batch_only_computes_distinct_misses(self) -> None:
+        cache = AnswerCache(InMemoryAnswerBackend(max_items=10, ttl=None))
+        matcher = CountingMatcher()
+        agent_id = uuid4()
+        await cache.resolve(agent_id, ["pets"], matcher)
+
+        matches = await cache.resolve(
+            agent_id, ["Pets?", "parking", "PARKING"], matcher
+        )
+
+        assert [m.type for m in matches] == [MatchType.EXACT] * 3
+        assert matcher.calls[-1] == ["parking"]
+
+    async def test_invalidate_is_per_agent(self) -> None:
+        cache = AnswerCache(InMemoryAnswerBackend(max_items=10, ttl=None))
+        matcher = CountingMatcher()
+        agent_a, agent_b = uuid4(), uuid4()
+        for agent_id in (agent_a, agent_b):
+            await cache.resolve(agent_id, ["pets"], matcher)
+
+        await cache.invalidate(agent_a)
+        await cache.resolve(agent_a, ["pets"], matcher)
+        await cache.resolve(agent_b, ["pets"], matcher)
+
+        assert cache.stats() == {"hits": 1, "misses": 3}
+
+    async def test_shared_backend_spans_workers(self) -> None:
+        store = FakeStore()
+        worker_1 = AnswerCache(SharedAnswerBackend(store, ttl=60))
+        worker_2 = AnswerCache(SharedAnswerBackend(store, ttl=60))
+        matcher = CountingMatcher()
+        agent_id = uuid4()
+
+        await worker_1.resolve(agent_id, ["breakfast?"], matcher)
+        [match] = await worker_2.resolve(agent_id, ["Breakfast"], matcher)
+        assert match == Match(_QA_PAIRS["breakfast"], MatchType.EXACT, 1.0)
+        assert worker_2.stats()["hits"] == 1
+
+        await worker_2.invalidate(agent_id)
+        await worker_1.resolve(agent_id, ["breakfast"], matcher)
+        assert worker_1.stats()["misses"] == 2
+
+    async def test_disabled_cache_always_computes(self) -> None:
+        cache = AnswerCache(
+            InMemoryAnswerBackend(max_items=10, ttl=None), enabled=False
+        )
+        matcher = CountingMatcher()
+
+        for _ in range(2):
+            await cache.resolve(uuid4(), ["pets"], matcher)
+
+        assert len(matcher.calls) == 2
+
+
+class TestAnswerCacheAPI:
+    """/ask goes through the cache and knowledge writes invalidate it."""
+
+    async def _ask(self, client: AsyncClient, agent_id: UUID, question: str) -> str:
+        response = await client.post(
+            ASK_ENDPOINT.format(agent_id=agent_id), json={"question": question}
+        )
+        return response.json()["answer"]
+
+    async def test_knowledge_write_invalidates(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db)
+        url = KNOWLEDGE_ENDPOINT.format(agent_id=agent.id)
+        await client.post(url, json={"question": "wifi", "answer": "Free."})
+
+        assert await self._ask(client, agent.id, "wifi?") == "Free."
+        assert await self._ask(client, agent.id, "WiFi") == "Free."
+        assert answer_cache.stats() == {"hits": 1, "misses": 1}
+
+        entry_id = (await client.get(url)).json()[0]["id"]
+        await client.put(
+            f"{url}/{entry_id}", json={"question": "wifi", "answer": "Paid."}
+        )
+
+        assert await self._ask(client, agent.id, "wifi") == "Paid."
+
+    async def test_reloaded_knowledge_base_invalidates(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db)
+        url = KNOWLEDGE_ENDPOINT.format(agent_id=agent.id)
+        created = await client.post(url, json={"question": "wifi", "answer": "Free."})
+        assert await self._ask(client, agent.id, "wifi?") == "Free."
+
+        # edited by another worker: this one's caches never heard of it
+        entry = await crud.get_knowledge_entry(db, agent.id, UUID(created.json()["id"]))
+        edit = KnowledgeEntryCreate(question="wifi", answer="Paid.")
+        await crud.update_knowledge_entry(db, entry, edit)
+        assert await self._ask(client, agent.id, "wifi?") == "Free."
+
+        knowledge_cache.clear()  # its knowledge base expires
+        assert await self._ask(client, agent.id, "wifi?") == "Paid."
@@ -0,0 +1,158 @@
+import json
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from pytest import MonkeyPatch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.routes import _ANSWER_PAYLOADS
+from app.agent.services.qa import _FALLBACK, _QA_PAIRS
+from app.agent.tests.utils import create_agent
+from app.core.config import get_settings
+from app.core.executor import matcher_executor
+
+ASK_ENDPOINT = "/agents/{agent_id}/ask"
+BATCH_ENDPOINT = "/agents/{agent_id}/ask:batch"
+KNOWLEDGE_ENDPOINT = "/agents/{agent_id}/knowledge"
+
+
+class TestAskAPI:
+    """Routing of /ask between the built-in and per-agent knowledge bases."""
+
+    async def test_hotel_bot_uses_builtin_pairs(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db, name="Hotel Q&A Bot")
+
+        response = await client.post(
+            ASK_ENDPOINT.format(agent_id=agent.id), json={"question": "Parking?"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"answer": _QA_PAIRS["parking"]}
+
+    async def test_builtin_answers_are_pre_encoded(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db, name="Hotel Q&A Bot")
+
+        for question in ("Parking?", "Spa?"):
+            response = await client.post(
+                ASK_ENDPOINT.format(agent_id=agent.id), json={"question": question}
+            )
+            assert response.headers["content-type"] == "application/json"
+            assert response.content in _ANSWER_PAYLOADS.values()
+
+        assert all(
+            json.loads(payload) == {"answer": answer}
+            for answer, payload in _ANSWER_PAYLOADS.items()
+        )
+
+    async def test_agent_without_entries_is_rejected(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db)
+
+        response = await client.post(
+            ASK_ENDPOINT.format(agent_id=agent.id), json={"question": "Parking?"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_unknown_agent(self, client: AsyncClient):
+        response = await client.post(
+            ASK_ENDPOINT.format(agent_id=uuid4()), json={"question": "Parking?"}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_saturated_matcher_sheds_load(
+        self, client: AsyncClient, db: AsyncSession, monkeypatch: MonkeyPatch
+    ):
+        agent = await create_agent(db, name="Hotel Q&A Bot")
+        monkeypatch.setattr(matcher_executor, "max_pending", 0)
+
+        response = await client.post(
+            ASK_ENDPOINT.format(agent_id=agent.id), json={"question": "Parking?"}
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert "retry-after" in response.headers
+
+    async def test_agent_answers_from_own_entries(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db)
+        await client.post(
+            KNOWLEDGE_ENDPOINT.format(agent_id=agent.id),
+            json={"question": "pricing", "answer": "From 10 EUR per seat."},
+        )
+
+        response = await client.post(
+            ASK_ENDPOINT.format(agent_id=agent.id), json={"question": "Your prcing?"}
+        )
+        assert response.json() == {"answer": "From 10 EUR per seat."}
+
+        response = await client.post(
+            ASK_ENDPOINT.format(agent_id=agent.id),
+            json={"question": "Is breakfast free?"},
+        )
+        assert response.json() == {"answer": _FALLBACK}
+
+
+class TestAskBatchAPI:
+    """Batch answering keeps order and reports how each answer was found."""
+
+    async def test_answers_in_input_order(self, client: AsyncClient, db: AsyncSession):
+        agent = await create_agent(db, name="Hotel Q&A Bot")
+        questions = [
+            "parking",
+            "What time is check-in?",
+            "brkfast?",
+            "Spa?",
+            "PARKING!",
+        ]
+
+        response = await client.post(
+            BATCH_ENDPOINT.format(agent_id=agent.id), json={"questions": questions}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        results = response.json()["results"]
+        assert [r["question"] for r in results] == questions
+        assert [r["match"] for r in results] == [
+            "exact",
+            "substring",
+            "fuzzy",
+            "fallback",
+            "exact",
+        ]
+        assert results[0]["answer"] == results[4]["answer"] == _QA_PAIRS["parking"]
+        assert results[3] == {
+            "question": "Spa?",
+            "answer": _FALLBACK,
+            "match": "fallback",
+            "score": 0.0,
+        }
+        assert 0.56 <= results[2]["score"] < 1.0
+
+    @pytest.mark.parametrize(
+        "questions", [[], ["q"] * (get_settings().ask_batch_max_questions + 1)]
+    )
+    async def test_batch_size_is_bounded(
+        self, client: AsyncClient, db: AsyncSession, questions: list[str]
+    ):
+        agent = await create_agent(db, name="Hotel Q&A Bot")
+
+        response = await client.post(
+            BATCH_ENDPOINT.format(agent_id=agent.id), json={"questions": questions}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_agent_without_entries_is_rejected(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db)
+
+        response = await client.post(
+            BATCH_ENDPOINT.format(agent_id=agent.id), json={"questions": ["wifi?"]}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
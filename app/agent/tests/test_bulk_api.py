@@ -0,0 +1,94 @@
+import json
+
+from fastapi import status
+from httpx import AsyncClient
+from pytest import MonkeyPatch
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.enums import AgentType
+from app.agent.models import Agent
+from app.agent.routes import settings
+
+BULK_ENDPOINT = "/agents:bulk"
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def _agents(count: int) -> list[dict]:
+    return [{"name": f"Agent {i:03d}", "type": AgentType.SALES} for i in range(count)]
+
+
+async def _count(db: AsyncSession) -> int:
+    return await db.scalar(select(func.count()).select_from(Agent))
+
+
+class TestBulkCreateAPI:
+    async def test_json_array_across_chunks(
+        self, client: AsyncClient, db: AsyncSession, monkeypatch: MonkeyPatch
+    ):
+        monkeypatch.setattr(settings, "agents_bulk_chunk_size", 3)
+
+        response = await client.post(BULK_ENDPOINT, json=_agents(7))
+        assert response.status_code == status.HTTP_200_OK
+
+        body = response.json()
+        assert (body["created"], body["failed"]) == (7, 0)
+        assert [r["index"] for r in body["results"]] == list(range(7))
+
+        listed = {a["id"]: a["name"] for a in (await client.get("/agents")).json()}
+        for i, result in enumerate(body["results"]):
+            assert listed[result["id"]] == f"Agent {i:03d}"
+
+    async def test_ndjson_reports_invalid_rows(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        lines = [
+            json.dumps({"name": "Good", "type": "Support"}),
+            json.dumps({"name": "", "type": "Support"}),
+            "",
+            "{not json",
+            json.dumps({"name": "Also good", "type": "Marketing"}),
+        ]
+        response = await client.post(
+            BULK_ENDPOINT, content="\n".join(lines) + "\n", headers=NDJSON
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        body = response.json()
+        assert (body["created"], body["failed"]) == (2, 2)
+        assert [bool(r["id"]) for r in body["results"]] == [True, False, False, True]
+        assert body["results"][1]["errors"][0].startswith("name:")
+        assert await _count(db) == 2
+
+    async def test_ndjson_split_across_chunks(self, client: AsyncClient):
+        payload = "".join(json.dumps(a) + "\n" for a in _agents(20)).encode()
+
+        async def stream():
+            for i in range(0, len(payload), 7):  # cut lines mid-record
+                yield payload[i : i + 7]
+
+        response = await client.post(BULK_ENDPOINT, content=stream(), headers=NDJSON)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["created"] == 20
+
+    async def test_too_many_rows_inserts_nothing(
+        self, client: AsyncClient, db: AsyncSession, monkeypatch: MonkeyPatch
+    ):
+        monkeypatch.setattr(settings, "agents_bulk_chunk_size", 2)
+        monkeypatch.setattr(settings, "agents_bulk_max_rows", 5)
+
+        response = await client.post(BULK_ENDPOINT, json=_agents(6))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert await _count(db) == 0
+
+    async def test_body_must_be_array(self, client: AsyncClient):
+        response = await client.post(BULK_ENDPOINT, json={"name": "Solo"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_created_agents_are_retrievable(self, client: AsyncClient):
+        response = await client.post(BULK_ENDPOINT, json=_agents(1))
+        [result] = response.json()["results"]
+
+        response = await client.get(f"/agents/{result['id']}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == "Agent 000"
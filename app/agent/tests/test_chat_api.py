@@ -0,0 +1,198 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+from fastapi import WebSocketDisconnect, status
+from httpx import AsyncClient
+from pytest import MonkeyPatch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.chat import ChatSession
+from app.agent.routes import settings
+from app.agent.services.qa import _QA_PAIRS, Match
+from app.agent.tests.utils import create_agent
+from app.main import app
+
+CHAT_ENDPOINT = "/agents/{agent_id}/chat"
+
+
+class _WebSocketClient:
+    """
+    Talks to the app over the ASGI WebSocket interface on the test's own
+    event loop (the sync TestClient would run the app, and thus the test
+    database session, on another loop).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.inbox: asyncio.Queue[dict] = asyncio.Queue()
+        self.outbox: asyncio.Queue[dict] = asyncio.Queue()
+        scope = {
+            "type": "websocket",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "subprotocols": [],
+        }
+        self.inbox.put_nowait({"type": "websocket.connect"})
+        self.task = asyncio.create_task(app(scope, self.inbox.get, self.outbox.put))
+
+    async def next(self) -> dict:
+        return await asyncio.wait_for(self.outbox.get(), 5)
+
+    async def ask(self, question: str, id_: int | None = None) -> None:
+        frame = json.dumps({"id": id_, "question": question})
+        await self.inbox.put({"type": "websocket.receive", "text": frame})
+
+    async def reply(self) -> dict:
+        message = await self.next()
+        assert message["type"] == "websocket.send"
+        return json.loads(message["text"])
+
+    async def disconnect(self) -> None:
+        await self.inbox.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self.task, 5)
+
+
+class TestChatAPI:
+    async def test_pipelined_questions_are_answered_in_order(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db, name="Hotel Q&A Bot")
+        ws = _WebSocketClient(CHAT_ENDPOINT.format(agent_id=agent.id))
+        assert (await ws.next())["type"] == "websocket.accept"
+
+        for i, question in enumerate(["Parking?", "check-in", "Parking?"]):
+            await ws.ask(question, i)
+        replies = [await ws.reply() for _ in range(3)]
+        await ws.disconnect()
+
+        assert [r["id"] for r in replies] == [0, 1, 2]
+        assert replies[0]["answer"] == _QA_PAIRS["parking"]
+        assert replies[1] == {
+            "id": 1,
+            "answer": _QA_PAIRS["check-in"],
+            "match": "exact",
+            "score": 1.0,
+        }
+
+    async def test_invalid_frames_get_an_error_reply(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db, name="Hotel Q&A Bot")
+        ws = _WebSocketClient(CHAT_ENDPOINT.format(agent_id=agent.id))
+        await ws.next()
+
+        await ws.inbox.put({"type": "websocket.receive", "text": "not json"})
+        await ws.ask("")
+        await ws.ask("Parking?")
+
+        assert "error" in await ws.reply()
+        assert "question" in (await ws.reply())["error"]
+        assert (await ws.reply())["answer"] == _QA_PAIRS["parking"]
+        await ws.disconnect()
+
+    async def test_knowledge_edits_apply_to_open_connections(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db)
+        url = f"/agents/{agent.id}/knowledge"
+        await client.post(url, json={"question": "spa", "answer": "No spa."})
+        ws = _WebSocketClient(CHAT_ENDPOINT.format(agent_id=agent.id))
+        await ws.next()
+
+        await ws.ask("spa")
+        assert (await ws.reply())["answer"] == "No spa."
+
+        entry_id = (await client.get(url)).json()[0]["id"]
+        edit = {"question": "spa", "answer": "Spa!"}
+        await client.put(f"{url}/{entry_id}", json=edit)
+        await ws.ask("spa")
+        assert (await ws.reply())["answer"] == "Spa!"
+        await ws.disconnect()
+
+    @pytest.mark.parametrize("name", [None, "Plain Agent"])
+    async def test_refuses_agents_that_cannot_answer(
+        self, client: AsyncClient, db: AsyncSession, name: str | None
+    ):
+        agent_id = (await create_agent(db, name=name)).id if name else uuid4()
+        ws = _WebSocketClient(CHAT_ENDPOINT.format(agent_id=agent_id))
+
+        message = await ws.next()
+        assert message["type"] == "websocket.close"
+        assert message["code"] == status.WS_1008_POLICY_VIOLATION
+
+    async def test_idle_connections_are_closed(
+        self, client: AsyncClient, db: AsyncSession, monkeypatch: MonkeyPatch
+    ):
+        monkeypatch.setattr(settings, "chat_idle_timeout_seconds", 0.05)
+        agent = await create_agent(db, name="Hotel Q&A Bot")
+        ws = _WebSocketClient(CHAT_ENDPOINT.format(agent_id=agent.id))
+        await ws.next()
+
+        message = await ws.next()
+        assert message["type"] == "websocket.close"
+        assert message["reason"] == "Idle timeout"
+
+
+class TestChatSessionFlowControl:
+    async def test_reads_pause_while_the_queue_is_full(self):
+        inbox: asyncio.Queue[dict] = asyncio.Queue()
+        for i in range(10):
+            frame = json.dumps({"id": i, "question": "Parking?"})
+            inbox.put_nowait({"type": "websocket.receive", "text": frame})
+        release = asyncio.Event()
+        sent = []
+
+        class _Socket:
+            async def receive(self) -> dict:
+                return await inbox.get()
+
+            async def send_text(self, text: str) -> None:
+                sent.append(text)
+
+        async def answer(questions: list[str]) -> list[Match]:
+            await release.wait()
+            return [Match("Yes", "exact", 1.0) for _ in questions]
+
+        session = ChatSession(_Socket(), answer, max_pending=2, idle_timeout=5)
+        task = asyncio.create_task(session.run())
+        await asyncio.sleep(0.05)
+
+        # a batch being answered, a full queue and one frame waiting to enter it
+        assert 10 - inbox.qsize() <= 2 + 2 + 1
+
+        release.set()
+        await asyncio.sleep(0.05)
+        inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(task, 5)
+        assert [json.loads(text)["id"] for text in sent] == list(range(10))
+
+    async def test_reader_ends_when_the_client_leaves_with_a_full_queue(self):
+        inbox: asyncio.Queue[dict] = asyncio.Queue()
+        for i in range(10):
+            frame = json.dumps({"id": i, "question": "Parking?"})
+            inbox.put_nowait({"type": "websocket.receive", "text": frame})
+
+        class _Socket:
+            async def receive(self) -> dict:
+                return await inbox.get()
+
+            async def send_text(self, text: str) -> None:
+                raise WebSocketDisconnect(1001)
+
+        async def answer(questions: list[str]) -> list[Match]:
+            await asyncio.sleep(0.01)  # the reader refills the queue meanwhile
+            return [Match("Yes", "exact", 1.0) for _ in questions]
+
+        session = ChatSession(_Socket(), answer, max_pending=2, idle_timeout=5)
+        await asyncio.wait_for(session.run(), 5)
+
+        readers = [
+            task
+            for task in asyncio.all_tasks()
+            if task.get_coro().__qualname__ == "ChatSession._read"
+        ]
+        assert readers == []
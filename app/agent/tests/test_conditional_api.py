@@ -0,0 +1,91 @@
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.cache import agent_cache
+from app.agent.models import Agent
+from app.agent.tests.utils import create_agent
+
+RETRIEVE_ENDPOINT = "/agents/{agent_id}"
+LIST_ENDPOINT = "/agents"
+
+
+async def _rename(db: AsyncSession, agent: Agent, name: str) -> None:
+    agent.name = name
+    await db.commit()
+    agent_cache.invalidate(agent.id)
+
+
+class TestConditionalRetrieve:
+    async def test_etag_round_trip(self, client: AsyncClient, db: AsyncSession):
+        agent = await create_agent(db)
+        url = RETRIEVE_ENDPOINT.format(agent_id=agent.id)
+
+        response = await client.get(url)
+        etag = response.headers["etag"]
+        assert response.json()["version"] == 1
+        assert response.headers["last-modified"].endswith("GMT")
+
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        await _rename(db, agent, "Renamed")
+
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["version"] == 2
+        assert response.headers["etag"] != etag
+
+    async def test_if_modified_since(self, client: AsyncClient, db: AsyncSession):
+        agent = await create_agent(db)
+        url = RETRIEVE_ENDPOINT.format(agent_id=agent.id)
+        last_modified = (await client.get(url)).headers["last-modified"]
+
+        response = await client.get(url, headers={"If-Modified-Since": last_modified})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        response = await client.get(
+            url, headers={"If-Modified-Since": "Thu, 01 Jan 2015 00:00:00 GMT"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+
+class TestConditionalList:
+    async def test_etag_tracks_page_contents(
+        self, client: AsyncClient, db: AsyncSession, seeded_agents
+    ):
+        response = await client.get(LIST_ENDPOINT)
+        etag = response.headers["etag"]
+
+        response = await client.get(LIST_ENDPOINT, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # a different representation of the same rows
+        response = await client.get(
+            LIST_ENDPOINT, params={"fields": "id"}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        await _rename(db, seeded_agents[0], "Alpha Sales II")
+        response = await client.get(LIST_ENDPOINT, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+
+        await create_agent(db, name="Zeta")
+        response = await client.get(LIST_ENDPOINT, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+
+    async def test_not_modified_keeps_next_cursor(
+        self, client: AsyncClient, seeded_agents
+    ):
+        response = await client.get(LIST_ENDPOINT, params={"limit": 2})
+
+        response = await client.get(
+            LIST_ENDPOINT,
+            params={"limit": 2},
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["x-next-cursor"]
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from pytest import MonkeyPatch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.enums import AgentStatus, AgentType
+from app.agent.routes import settings
+from app.agent.tests.utils import create_agent
+
+EXPORT_ENDPOINT = "/agents/export"
+
+
+@pytest.fixture
+async def agents(db: AsyncSession):
+    return [
+        await create_agent(db, name=f"Agent {i}", status=status_)
+        for i, status_ in enumerate(
+            [AgentStatus.ACTIVE, AgentStatus.INACTIVE, AgentStatus.ACTIVE] * 2
+        )
+    ]
+
+
+class TestExportAgentsAPI:
+    async def test_streams_ndjson_in_name_order(
+        self, client: AsyncClient, agents, monkeypatch: MonkeyPatch
+    ):
+        monkeypatch.setattr(settings, "agents_export_batch_size", 4)
+
+        response = await client.get(
+            EXPORT_ENDPOINT, headers={"Accept-Encoding": "identity"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert "content-encoding" not in response.headers
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["name"] for line in lines] == [f"Agent {i}" for i in range(6)]
+        assert lines[0].pop("updated_at")
+        assert lines[0] == {
+            "id": str(agents[0].id),
+            "name": "Agent 0",
+            "type": AgentType.SALES,
+            "status": AgentStatus.ACTIVE,
+            "description": "Test-Agent-Description",
+            "version": 1,
+        }
+
+    async def test_gzip_and_filters(self, client: AsyncClient, agents):
+        response = await client.get(
+            EXPORT_ENDPOINT,
+            params={"status": AgentStatus.INACTIVE},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.headers["content-encoding"] == "gzip"
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["name"] for line in lines] == ["Agent 1", "Agent 4"]
+
+    async def test_empty_table(self, client: AsyncClient):
+        response = await client.get(EXPORT_ENDPOINT)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text == ""
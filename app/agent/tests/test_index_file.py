@@ -0,0 +1,219 @@
+import fcntl
+import os
+import pickle
+import random
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+from httpx import AsyncClient
+from pytest import MonkeyPatch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import crud
+from app.agent.services import index_file
+from app.agent.services.answer_cache import AnswerCache, InMemoryAnswerBackend
+from app.agent.services.answering import matcher
+from app.agent.services.index_file import IndexStore, open_index, write_index
+from app.agent.services.knowledge import KnowledgeCache, knowledge_cache
+from app.agent.services.qa import _QA_PAIRS, QAIndex
+from app.agent.tests.utils import create_agent
+from app.core.executor import OffloadExecutor
+from benchmarks.bench_retrieval import _knowledge_base, _questions
+
+KNOWLEDGE_ENDPOINT = "/agents/{agent_id}/knowledge"
+
+
+def _pairs(size: int) -> dict[str, str]:
+    pairs = dict(_QA_PAIRS) if size <= len(_QA_PAIRS) else {}
+    pairs.update(_knowledge_base(size, random.Random(size)))
+    pairs["Frühstück & straße"] = "Unicode keys work too."
+    return pairs
+
+
+class TestIndexFile:
+    @pytest.mark.parametrize("size", [0, 300, 2_000])  # both fuzzy strategies
+    def test_mapped_index_matches_like_the_compiled_one(
+        self, tmp_path: Path, size: int
+    ) -> None:
+        pairs = _pairs(size)
+        compiled = QAIndex(pairs)
+        write_index(compiled, tmp_path / "kb.qaix", generation=1)
+        mapped, file = open_index(tmp_path / "kb.qaix")
+
+        questions = _questions(pairs, 200, random.Random(0)) + [
+            "",
+            "???",
+            "x" * 300,
+            "Parking?",
+            "frühstück",
+            "strasse",
+        ]
+        assert len(mapped) == len(compiled)
+        assert [mapped.match(q) for q in questions] == [
+            compiled.match(q) for q in questions
+        ]
+        assert file.generation == 1
+
+    def test_rejects_other_formats(self, tmp_path: Path) -> None:
+        (tmp_path / "kb.qaix").write_bytes(b"not an index file at all")
+        with pytest.raises(ValueError):
+            open_index(tmp_path / "kb.qaix")
+
+    async def test_process_workers_map_the_file(self, tmp_path: Path) -> None:
+        write_index(QAIndex(_QA_PAIRS), tmp_path / "kb.qaix", generation=1)
+        mapped, _ = open_index(tmp_path / "kb.qaix")
+        assert pickle.loads(pickle.dumps(mapped)).answer("parking?")
+
+        executor = OffloadExecutor("process", workers=1)
+        try:
+            result = await executor.run(mapped.answer, "parking?")
+        finally:
+            executor.shutdown()
+        assert result == _QA_PAIRS["parking"]
+
+
+class TestIndexStore:
+    def test_generations_and_expiry(self, tmp_path: Path) -> None:
+        store = IndexStore(tmp_path, max_age=60)
+        agent_id = uuid4()
+        assert store.open(agent_id) is None
+
+        _, first = store.save(agent_id, QAIndex(_QA_PAIRS))
+        _, second = store.save(agent_id, QAIndex(_QA_PAIRS))
+        assert (first.generation, second.generation) == (1, 2)
+        assert not first.current() and second.current()
+        assert store.open(agent_id)[1].generation == 2
+
+        store.expire(agent_id)
+        assert not second.current()
+        assert store.open(agent_id) is None
+
+    def test_save_after_an_expiry_writes_nothing(self, tmp_path: Path) -> None:
+        store, other_worker = IndexStore(tmp_path), IndexStore(tmp_path)
+        agent_id = uuid4()
+        store.save(agent_id, QAIndex(_QA_PAIRS))
+
+        version = store.version(agent_id)  # then loads the entries ...
+        other_worker.expire(agent_id)  # ... while an edit lands elsewhere
+        assert store.save(agent_id, QAIndex({"stale": "Stale."}), version) is None
+        assert store.open(agent_id) is None
+
+        version = store.version(agent_id)
+        assert store.save(agent_id, QAIndex(_QA_PAIRS), version)[1].generation == 2
+
+    def test_lock_is_free_while_the_file_is_written(
+        self, tmp_path: Path, monkeypatch: MonkeyPatch
+    ) -> None:
+        store = IndexStore(tmp_path)
+        agent_id = uuid4()
+        sections = index_file._sections
+
+        def slow_sections(index: QAIndex):
+            # e.g. `version()` on the event loop while a worker thread writes
+            fd = os.open(tmp_path / f".{agent_id}.lock", os.O_RDWR | os.O_CREAT)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)  # raises if held
+            finally:
+                os.close(fd)
+            return sections(index)
+
+        monkeypatch.setattr(index_file, "_sections", slow_sections)
+        store.save(agent_id, QAIndex(_QA_PAIRS))
+        assert store.save(agent_id, QAIndex(_QA_PAIRS), version=-1) is None
+        assert store.open(agent_id)[1].generation == 1
+        assert [p.name for p in tmp_path.iterdir() if p.suffix != ".lock"] == [
+            store.path(agent_id).name
+        ]  # the discarded write left no temporary file behind
+
+    @pytest.mark.parametrize("size", [0, 40, 4_000])
+    def test_truncated_files_are_rebuilt(self, tmp_path: Path, size: int) -> None:
+        store = IndexStore(tmp_path)
+        agent_id = uuid4()
+        store.save(agent_id, QAIndex(_QA_PAIRS))
+        with open(store.path(agent_id), "r+b") as f:
+            f.truncate(size)
+
+        assert store.open(agent_id) is None
+
+    def test_old_files_are_not_opened(self, tmp_path: Path) -> None:
+        store = IndexStore(tmp_path, max_age=60)
+        agent_id = uuid4()
+        store.save(agent_id, QAIndex(_QA_PAIRS))
+        os.utime(store.path(agent_id), (1, 1))
+
+        assert store.open(agent_id) is None
+
+
+class TestSharedKnowledgeCache:
+    async def test_workers_share_and_reload_the_file(
+        self,
+        client: AsyncClient,
+        db: AsyncSession,
+        tmp_path: Path,
+        monkeypatch: MonkeyPatch,
+    ):
+        store = IndexStore(tmp_path)
+        monkeypatch.setattr(knowledge_cache, "_files", store)
+        other_worker = KnowledgeCache(max_bytes=1 << 20, files=store)
+        agent = await create_agent(db)
+        url = KNOWLEDGE_ENDPOINT.format(agent_id=agent.id)
+        await client.post(url, json={"question": "spa", "answer": "No spa."})
+        ask = f"/agents/{agent.id}/ask"
+
+        response = await client.post(ask, json={"question": "spa?"})
+        assert response.json() == {"answer": "No spa."}
+        assert store.path(agent.id).exists()
+
+        kb = await other_worker.get(db, agent.id)
+        assert kb.file is not None and kb.file.generation == 1
+        assert kb.index.answer("spa?") == "No spa."
+
+        entry_id = (await client.get(url)).json()[0]["id"]
+        edit = {"question": "spa", "answer": "Spa!"}
+        await client.put(f"{url}/{entry_id}", json=edit)
+        response = await client.post(ask, json={"question": "spa?"})
+        assert response.json() == {"answer": "Spa!"}
+
+        kb = await other_worker.get(db, agent.id)
+        assert kb.file.generation == 2
+        assert kb.index.answer("spa?") == "Spa!"
+
+    async def test_remapped_file_invalidates_answers(
+        self, db: AsyncSession, tmp_path: Path
+    ):
+        store = IndexStore(tmp_path)
+        answers = AnswerCache(InMemoryAnswerBackend(max_items=10, ttl=None))
+        worker = KnowledgeCache(max_bytes=1 << 20, files=store, answers=answers)
+        agent_id = uuid4()
+        store.save(agent_id, QAIndex({"spa": "No spa."}))
+
+        async def ask() -> str:
+            kb = await worker.get(db, agent_id)
+            [match] = await answers.resolve(agent_id, ["spa?"], matcher(kb.index))
+            return match.answer
+
+        assert await ask() == "No spa."
+        store.save(agent_id, QAIndex({"spa": "Spa!"}))  # rebuilt by another worker
+        assert await ask() == "Spa!"
+
+    async def test_stale_load_does_not_overwrite_an_edit(
+        self, db: AsyncSession, tmp_path: Path, monkeypatch: MonkeyPatch
+    ):
+        store = IndexStore(tmp_path)
+        worker = KnowledgeCache(max_bytes=1 << 20, files=store)
+        agent = await create_agent(db)
+        load = crud.get_knowledge_entries
+
+        async def edited_meanwhile(db: AsyncSession, agent_id: UUID):
+            rows = await load(db, agent_id)
+            store.expire(agent_id)  # another worker's edit, after this read
+            return rows
+
+        monkeypatch.setattr(crud, "get_knowledge_entries", edited_meanwhile)
+        kb = await worker.get(db, agent.id)
+        assert kb.file is None and store.open(agent.id) is None
+
+        monkeypatch.setattr(crud, "get_knowledge_entries", load)
+        kb = await worker.get(db, agent.id)  # not cached: loads again
+        assert kb.file is not None and kb.file.current()
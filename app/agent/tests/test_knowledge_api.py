@@ -0,0 +1,105 @@
+from uuid import uuid4
+
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.services.knowledge import knowledge_cache
+from app.agent.services.qa import _FALLBACK
+from app.agent.tests.utils import create_agent
+
+ASK_ENDPOINT = "/agents/{agent_id}/ask"
+KNOWLEDGE_ENDPOINT = "/agents/{agent_id}/knowledge"
+ENTRY_ENDPOINT = "/agents/{agent_id}/knowledge/{entry_id}"
+
+
+class TestKnowledgeAPI:
+    """CRUD for knowledge entries and the cached per-agent index."""
+
+    async def test_create_and_list(self, client: AsyncClient, db: AsyncSession):
+        agent = await create_agent(db)
+        url = KNOWLEDGE_ENDPOINT.format(agent_id=agent.id)
+
+        for question in ("wifi", "gym"):
+            response = await client.post(
+                url, json={"question": question, "answer": f"{question} answer"}
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+
+        response = await client.get(url)
+        assert [e["question"] for e in response.json()] == ["wifi", "gym"]
+
+    async def test_duplicate_question_conflicts(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db)
+        url = KNOWLEDGE_ENDPOINT.format(agent_id=agent.id)
+        payload = {"question": "wifi", "answer": "Free."}
+
+        await client.post(url, json=payload)
+        response = await client.post(url, json=payload)
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    async def test_question_without_words_is_rejected(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db)
+        url = KNOWLEDGE_ENDPOINT.format(agent_id=agent.id)
+        created = await client.post(url, json={"question": "wifi", "answer": "Free."})
+        entry_url = ENTRY_ENDPOINT.format(
+            agent_id=agent.id, entry_id=created.json()["id"]
+        )
+
+        for question in ("???", "-- !"):
+            payload = {"question": question, "answer": "Catch-all"}
+            response = await client.post(url, json=payload)
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+            response = await client.put(entry_url, json=payload)
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = await client.post(
+            ASK_ENDPOINT.format(agent_id=agent.id),
+            json={"question": "What time is breakfast?"},
+        )
+        assert response.json() == {"answer": _FALLBACK}
+
+    async def test_unknown_agent(self, client: AsyncClient):
+        response = await client.post(
+            KNOWLEDGE_ENDPOINT.format(agent_id=uuid4()),
+            json={"question": "wifi", "answer": "Free."},
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_writes_update_cached_index_without_reload(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db)
+        ask = ASK_ENDPOINT.format(agent_id=agent.id)
+        created = await client.post(
+            KNOWLEDGE_ENDPOINT.format(agent_id=agent.id),
+            json={"question": "wifi", "answer": "Free."},
+        )
+        entry_url = ENTRY_ENDPOINT.format(
+            agent_id=agent.id, entry_id=created.json()["id"]
+        )
+
+        await client.post(ask, json={"question": "wifi?"})  # warms the cache
+        misses = knowledge_cache.stats()["misses"]
+
+        await client.put(entry_url, json={"question": "wifi", "answer": "5 EUR/day."})
+        response = await client.post(ask, json={"question": "wifi?"})
+        assert response.json() == {"answer": "5 EUR/day."}
+
+        await client.post(
+            KNOWLEDGE_ENDPOINT.format(agent_id=agent.id),
+            json={"question": "gym", "answer": "Open 24/7."},
+        )
+        response = await client.post(ask, json={"question": "gym?"})
+        assert response.json() == {"answer": "Open 24/7."}
+
+        response = await client.delete(entry_url)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        response = await client.post(ask, json={"question": "wifi?"})
+        assert response.json() == {"answer": _FALLBACK}
+
+        assert knowledge_cache.stats()["misses"] == misses
@@ -0,0 +1,32 @@
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.services.answering import MATCHES
+from app.agent.tests.utils import create_agent
+from app.core.metrics import REQUEST_SECONDS
+
+
+class TestMetricsAPI:
+    async def test_exposes_request_and_matcher_metrics(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        agent = await create_agent(db, name="Hotel Q&A Bot")
+        route = ("POST", "/agents/{agent_id}/ask", "200")
+        requests, exact = REQUEST_SECONDS.count(*route), MATCHES.value("exact")
+
+        await client.post(f"/agents/{agent.id}/ask", json={"question": "Parking"})
+
+        assert REQUEST_SECONDS.count(*route) == requests + 1
+        assert MATCHES.value("exact") == exact + 1
+
+        response = await client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            'http_request_duration_seconds_count{method="POST",'
+            'route="/agents/{agent_id}/ask",status="200"}'
+        ) in response.text
+        assert 'matcher_matches_total{type="exact"}' in response.text
+        assert 'cache{cache="answer",stat="hits"}' in response.text
+        assert 'matcher_executor{stat="submitted"}' in response.text
@@ -0,0 +1,39 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.agent.pagination import Cursor, decode_cursor, encode_cursor, parse_fields
+
+
+class TestCursor:
+    """Opaque keyset cursors survive a round-trip through the URL."""
+
+    @pytest.mark.parametrize("rank", [None, 0.0, 0.3333333432674408])
+    def test_round_trip(self, rank: float | None) -> None:
+        cursor = Cursor("Ünïcode / name?&", uuid4(), rank)
+
+        encoded = encode_cursor(cursor)
+
+        assert encoded.replace("-", "").replace("_", "").isalnum()
+        assert decode_cursor(encoded) == cursor
+
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            "",
+            "!!",
+            "WyJhIl0",  # ["a"]
+            "bnVsbA",  # null
+            "WyJhIiwxXQ",  # ["a",1]: the id is not a string
+            "WyJhIix7fV0",  # ["a",{}]
+        ],
+    )
+    def test_garbage_is_rejected(self, raw: str) -> None:
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor(raw)
+        assert exc_info.value.status_code == 400
+
+
+def test_parse_fields_dedupes_and_strips() -> None:
+    assert parse_fields(" name, id,name ", ["id", "name"]) == ["name", "id"]
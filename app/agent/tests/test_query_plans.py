@@ -0,0 +1,118 @@
+"""
+EXPLAIN-based checks that list queries are served by the composite indexes.
+
+SQLite runs on every test run. Set ``TEST_POSTGRES_URL`` (an asyncpg DSN of
+a throwaway database) to also check the Postgres planner on 50k rows.
+"""
+
+import os
+import random
+from typing import AsyncGenerator
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Select, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.agent.crud import agents_page_query
+from app.agent.enums import AgentStatus, AgentType
+from app.agent.models import Agent
+from app.agent.pagination import Cursor
+from app.db.base import Base
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+# (filters, index expected to serve them)
+QUERY_SHAPES = [
+    ({}, "ix_agents_name"),
+    ({"type_": AgentType.SALES}, "ix_agents_type_name"),
+    ({"status": AgentStatus.ACTIVE}, "ix_agents_status_name"),
+    (
+        {"type_": AgentType.SUPPORT, "status": AgentStatus.INACTIVE},
+        "ix_agents_type_status_name",
+    ),
+    (
+        {
+            "type_": AgentType.SALES,
+            "status": AgentStatus.ACTIVE,
+            "after": Cursor("Agent 0500", uuid4()),
+        },
+        "ix_agents_type_status_name",
+    ),
+]
+
+
+def _rows(count: int) -> list[dict]:
+    rnd = random.Random(3)
+    return [
+        {
+            "id": uuid4(),
+            "name": f"Agent {rnd.randrange(count):04d}",
+            "type": rnd.choice(list(AgentType)),
+            "status": rnd.choice(list(AgentStatus)),
+            "description": "seeded",
+        }
+        for _ in range(count)
+    ]
+
+
+async def _plan(db: AsyncSession, stmt: Select) -> str:
+    dialect = db.get_bind().dialect
+    sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    conn = await db.connection()
+
+    if dialect.name == "sqlite":
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+        return "\n".join(row[-1] for row in result)
+
+    result = await conn.exec_driver_sql(f"EXPLAIN {sql}")
+    return "\n".join(row[0] for row in result)
+
+
+class TestSQLitePlans:
+    @pytest.fixture
+    async def seeded(self, db: AsyncSession) -> AsyncSession:
+        await db.execute(insert(Agent), _rows(1_000))
+        await db.commit()
+        await (await db.connection()).exec_driver_sql("ANALYZE")
+        return db
+
+    @pytest.mark.parametrize("filters,index", QUERY_SHAPES)
+    async def test_list_query_uses_index_without_sort(
+        self, seeded: AsyncSession, filters: dict, index: str
+    ):
+        plan = await _plan(seeded, agents_page_query("sqlite", limit=50, **filters))
+
+        assert f"INDEX {index}" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+class TestPostgresPlans:
+    @pytest_asyncio.fixture
+    async def seeded(self) -> AsyncGenerator[AsyncSession, None]:
+        engine = create_async_engine(POSTGRES_URL)
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(Agent), _rows(50_000))
+            await conn.exec_driver_sql("ANALYZE agents")
+
+        async with AsyncSession(engine) as session:
+            yield session
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+    @pytest.mark.parametrize("filters,index", QUERY_SHAPES)
+    async def test_list_query_uses_index_without_sort(
+        self, seeded: AsyncSession, filters: dict, index: str
+    ):
+        plan = await _plan(seeded, agents_page_query("postgresql", limit=50, **filters))
+        nodes = [line.strip().removeprefix("->").strip() for line in plan.splitlines()]
+
+        assert any(index in node for node in nodes), plan
+        assert not any(node.startswith(("Seq Scan", "Sort")) for node in nodes), plan
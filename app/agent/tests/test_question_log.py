@@ -0,0 +1,165 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from pytest import MonkeyPatch
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.enums import MatchType
+from app.agent.models import QuestionLog
+from app.agent.services.qa import Match
+from app.agent.services.question_log import QuestionLogWriter, question_log
+from app.agent.tests.utils import create_agent
+
+ASK_ENDPOINT = "/agents/{agent_id}/ask"
+BATCH_ENDPOINT = "/agents/{agent_id}/ask:batch"
+UNANSWERED_ENDPOINT = "/agents/{agent_id}/questions/unanswered"
+
+FALLBACK = Match("Sorry", MatchType.FALLBACK, 0.0)
+
+
+def _sessions(db: AsyncSession):
+    @asynccontextmanager
+    async def session() -> AsyncIterator[AsyncSession]:
+        yield db
+
+    return session
+
+
+async def _count(db: AsyncSession) -> int:
+    result = await db.execute(select(func.count()).select_from(QuestionLog))
+    return result.scalar_one()
+
+
+class TestQuestionLogWriter:
+    async def test_flushes_in_batches(self, db: AsyncSession):
+        agent = await create_agent(db)
+        writer = QuestionLogWriter(_sessions(db), batch_size=2)
+
+        writer.record(agent.id, ["a?", "b?", "c?"], [FALLBACK] * 3)
+        assert await _count(db) == 0  # nothing written on the request path
+
+        assert await writer.flush() == 3
+        assert await _count(db) == 3
+        assert writer.stats.written == 3
+        row = (await db.execute(select(QuestionLog).limit(1))).scalar_one()
+        assert (row.q_norm, row.match) == ("a", MatchType.FALLBACK)
+
+    async def test_drops_instead_of_blocking_when_full(self, db: AsyncSession):
+        agent = await create_agent(db)
+        writer = QuestionLogWriter(_sessions(db), max_pending=2)
+
+        writer.record(agent.id, ["a?", "b?", "c?"], [FALLBACK] * 3)
+
+        assert (writer.stats.pending, writer.stats.dropped) == (2, 1)
+
+    async def test_background_flush_and_stop(self, db: AsyncSession):
+        agent = await create_agent(db)
+        writer = QuestionLogWriter(_sessions(db), batch_size=2, flush_interval=60)
+        writer.start()
+
+        writer.record(agent.id, ["a?", "b?"], [FALLBACK] * 2)  # a full batch
+        writer.record(agent.id, ["c?"], [FALLBACK])
+        await writer.stop()  # flushes the rest
+
+        assert await _count(db) == 3
+        assert writer.stats.pending == 0
+
+    async def test_failed_batches_are_counted(self):
+        @asynccontextmanager
+        async def broken() -> AsyncIterator[AsyncSession]:
+            raise ConnectionError("database is down")
+            yield
+
+        writer = QuestionLogWriter(broken)
+        writer.record(uuid4(), ["a?"], [FALLBACK])
+
+        assert await writer.flush() == 0
+        assert writer.stats.failed == 1
+
+    async def test_failed_flush_is_logged_once(self, caplog: pytest.LogCaptureFixture):
+        @asynccontextmanager
+        async def broken() -> AsyncIterator[AsyncSession]:
+            raise ConnectionError("database is down")
+            yield
+
+        writer = QuestionLogWriter(broken, batch_size=2)
+        writer.record(uuid4(), ["a?", "b?", "c?"], [FALLBACK] * 3)
+
+        assert await writer.flush() == 0
+        [record] = caplog.records
+        assert record.getMessage() == "Question log: lost 3 rows"
+        assert isinstance(record.exc_info[1], ConnectionError)
+
+    async def test_prunes_rows_older_than_the_retention(self, db: AsyncSession):
+        agent = await create_agent(db)
+        writer = QuestionLogWriter(_sessions(db), retention=3600)
+        writer.record(agent.id, ["old?", "new?"], [FALLBACK] * 2)
+        writer._pending[0]["asked_at"] -= timedelta(hours=2)
+        await writer.flush()
+
+        assert await writer.prune() == 1
+        assert await _count(db) == 1
+        assert writer.stats.pruned == 1
+        assert await QuestionLogWriter(_sessions(db)).prune() == 0  # keeps all
+
+    def test_restarts_in_a_new_event_loop(self):
+        writer = QuestionLogWriter(_sessions(None), flush_interval=60)
+
+        async def lifespan() -> None:
+            writer.start()
+            await writer.stop()
+
+        async def abandoned() -> None:
+            writer.start()  # the loop closes without stop()
+
+        # one app lifespan per event loop, as in tests or a restarted server
+        asyncio.run(lifespan())
+        asyncio.run(abandoned())
+        asyncio.run(lifespan())
+
+
+class TestUnansweredQuestionsAPI:
+    @pytest.fixture(autouse=True)
+    def _log_to_test_db(self, db: AsyncSession, monkeypatch: MonkeyPatch) -> None:
+        monkeypatch.setattr(question_log, "sessions", _sessions(db))
+
+    async def test_top_fallback_questions(self, client: AsyncClient, db: AsyncSession):
+        agent = await create_agent(db, name="Hotel Q&A Bot")
+        questions = ["Is there a spa?", "is there a SPA", "Rent skis at reception?"]
+        questions.append("Parking")
+
+        await client.post(
+            BATCH_ENDPOINT.format(agent_id=agent.id), json={"questions": questions}
+        )
+        await client.post(
+            ASK_ENDPOINT.format(agent_id=agent.id), json={"question": "Rent skis?"}
+        )
+        await question_log.flush()
+
+        response = await client.get(UNANSWERED_ENDPOINT.format(agent_id=agent.id))
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert [(q["q_norm"], q["count"]) for q in body] == [
+            ("isthereaspa", 2),
+            ("rentskis", 1),
+            ("rentskisatreception", 1),
+        ]
+        assert body[0]["example"] in questions[:2]
+
+        response = await client.get(
+            UNANSWERED_ENDPOINT.format(agent_id=agent.id), params={"limit": 1}
+        )
+        assert len(response.json()) == 1
+
+    async def test_unknown_agent(self, client: AsyncClient):
+        response = await client.get(
+            UNANSWERED_ENDPOINT.format(agent_id="00000000-0000-0000-0000-000000000000")
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -1,7 +1,17 @@
 import pytest
 from pytest import MonkeyPatch
 
-from app.agent.services.qa import _FALLBACK, _QA_PAIRS, _norm, answer
+from app.agent.enums import MatchType
+from app.agent.services.qa import (
+    _FALLBACK,
+    _MIN_FUZZ_RATIO,
+    _QA_PAIRS,
+    QAIndex,
+    _norm,
+    _ratio,
+    answer,
+)
+from app.agent.services.retrieval import BM25Index, grams
 
 
 class TestAnswerFunction:
@@ -62,3 +72,114 @@ class TestAnswerFunction:
             "app.agent.services.qa._MIN_FUZZ_RATIO", 0.99
         )  # impossible bar
         assert answer("cheeckin time?") == _FALLBACK
+
+
+class TestQAIndex:
+    """QAIndex must agree with the naive scan it replaces."""
+
+    @staticmethod
+    def _naive(pairs: dict[str, str], question: str) -> str:
+        q_norm = _norm(question)
+        for k, v in pairs.items():
+            if _norm(k) in q_norm or q_norm in _norm(k):
+                return v
+        best_key = max(pairs, key=lambda k: _ratio(q_norm, _norm(k)))
+        if _ratio(q_norm, _norm(best_key)) >= _MIN_FUZZ_RATIO:
+            return pairs[best_key]
+        return _FALLBACK
+
+    @pytest.mark.parametrize(
+        "question",
+        [
+            "What time is check-in?",
+            "checkout",
+            "in",  # question contained in a key
+            "cheeckin time please",
+            "brkfast options?",
+            "Do you have a spa?",
+            "???",  # normalises to "" -> first key, like the naive scan
+            "x" * 300,
+        ],
+    )
+    def test_matches_naive_scan(self, question: str) -> None:
+        assert QAIndex(_QA_PAIRS).answer(question) == self._naive(_QA_PAIRS, question)
+
+    def test_lowest_insertion_index_wins(self) -> None:
+        """Several keys occur in the question: the first declared one is used."""
+        index = QAIndex({"stay": "a", "long stay": "b", "long": "c"})
+        assert index.answer("long stay offers?") == "a"
+
+    def test_fuzzy_ties_keep_insertion_order(self) -> None:
+        index = QAIndex({"abcx": "first", "abcy": "second"})
+        assert index.answer("abcz") == "first"
+
+    def test_empty_index_falls_back(self) -> None:
+        assert QAIndex({}).answer("check-in") == _FALLBACK
+
+    @pytest.mark.parametrize("question", ["chek-in time", "breakfst", "x" * 300])
+    def test_warm_index_answers_the_same(self, question: str) -> None:
+        warm = QAIndex(_QA_PAIRS)
+        warm.warm()
+        assert warm.answer(question) == QAIndex(_QA_PAIRS).answer(question)
+
+
+class TestBM25Index:
+    """Trigram BM25 retrieval used to shortlist fuzzy candidates."""
+
+    def test_grams(self) -> None:
+        assert grams("parking") == ["par", "ark", "rki", "kin", "ing"]
+        assert grams("in") == ["in"]
+        assert grams("") == []
+
+    def test_typo_ranks_intended_key_first(self) -> None:
+        index = BM25Index([_norm(k) for k in _QA_PAIRS])
+        keys = list(_QA_PAIRS)
+
+        assert keys[index.top_k("cheeckin", 1)[0]] == "check-in"
+        assert keys[index.top_k("brekfast", 1)[0]] == "breakfast"
+
+    def test_top_k_is_bounded_and_sorted(self) -> None:
+        index = BM25Index(["parking", "parkingfee", "park", "coffee"])
+        scores = index.scores("parking")
+
+        top = index.top_k("parking", 2)
+        assert len(top) == 2
+        assert scores[top[0]] >= scores[top[1]]
+        assert 3 not in scores  # no shared trigram with "coffee"
+
+    def test_large_index_uses_shortlist(self, monkeypatch: MonkeyPatch) -> None:
+        """Above the shortlist threshold typos still resolve via BM25 candidates."""
+        monkeypatch.setattr("app.agent.services.qa._SHORTLIST_MIN_KEYS", 0)
+        assert (
+            QAIndex(_QA_PAIRS).answer("cheeckin time please") == _QA_PAIRS["check-in"]
+        )
+
+
+class TestMatch:
+    """match() / match_many() report how an answer was found."""
+
+    @pytest.mark.parametrize(
+        "question,match_type",
+        [
+            ("Parking", MatchType.EXACT),
+            ("Is there parking?", MatchType.SUBSTRING),
+            ("parkin price?", MatchType.FUZZY),
+            ("Do you have a spa?", MatchType.FALLBACK),
+        ],
+    )
+    def test_match_type(self, question: str, match_type: MatchType) -> None:
+        match = QAIndex(_QA_PAIRS).match(question)
+
+        assert match.type == match_type
+        assert match.answer == answer(question)
+        assert 0.0 <= match.score <= 1.0
+
+    def test_match_many_keeps_order_and_dedupes(self) -> None:
+        results = QAIndex(_QA_PAIRS).match_many(["Pets?", "check-in", "PETS!"])
+
+        assert [r.answer for r in results] == [
+            _QA_PAIRS["pets"],
+            _QA_PAIRS["check-in"],
+            _QA_PAIRS["pets"],
+        ]
+        assert results[0] is results[2]  # "pets" was scored once
@@ -0,0 +1,116 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from pytest import MonkeyPatch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import main
+from app.agent.enums import MatchType
+from app.agent.services.answer_cache import answer_cache
+from app.agent.services.qa import Match
+from app.agent.services.question_log import QuestionLogWriter
+from app.agent.tests.utils import create_agent
+from app.agent.warmup import preload_hot_questions
+
+
+def _sessions(db: AsyncSession):
+    @asynccontextmanager
+    async def session() -> AsyncIterator[AsyncSession]:
+        yield db
+
+    return session
+
+
+async def _wait_ready(client: AsyncClient) -> int:
+    for _ in range(200):
+        response = await client.get("/ready")
+        if response.status_code == status.HTTP_200_OK:
+            break
+        await asyncio.sleep(0.01)
+    return response.status_code
+
+
+class TestPreloadHotQuestions:
+    async def test_answers_land_in_the_answer_cache(
+        self, client: AsyncClient, db: AsyncSession
+    ):
+        bot = await create_agent(db, name="Hotel Q&A Bot")
+        plain = await create_agent(db, name="Plain Agent")  # can't answer: skipped
+        log = QuestionLogWriter(_sessions(db))
+        exact = Match("Yes", MatchType.EXACT, 1.0)
+        log.record(bot.id, ["Parking?", "parking", "Check-in?"], [exact] * 3)
+        log.record(plain.id, ["Parking?"], [exact])
+        log.record(uuid4(), ["Parking?"], [exact])  # deleted agent: skipped
+        await log.flush()
+
+        since = datetime.now(timezone.utc) - timedelta(hours=1)
+        answered = await preload_hot_questions(_sessions(db), since=since, limit=10)
+
+        assert answered == 2
+        misses = answer_cache.misses
+        response = await client.post(
+            f"/agents/{bot.id}/ask", json={"question": "Parking?"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert answer_cache.misses == misses
+
+    async def test_only_recent_questions(self, db: AsyncSession):
+        bot = await create_agent(db, name="Hotel Q&A Bot")
+        log = QuestionLogWriter(_sessions(db))
+        log.record(bot.id, ["Parking?"], [Match("Yes", MatchType.EXACT, 1.0)])
+        await log.flush()
+
+        since = datetime.now(timezone.utc) + timedelta(minutes=1)
+        assert await preload_hot_questions(_sessions(db), since=since, limit=10) == 0
+
+
+class TestReadiness:
+    async def test_ready_once_warmed_up(
+        self, client: AsyncClient, monkeypatch: MonkeyPatch
+    ):
+        monkeypatch.setattr(main.settings, "warmup_pool_connections", 0)
+        monkeypatch.setattr(main.settings, "warmup_hot_questions", 0)
+
+        async with main.lifespan(main.app):
+            assert (await client.get("/health")).status_code == status.HTTP_200_OK
+            assert await _wait_ready(client) == status.HTTP_200_OK
+
+            response = await client.get("/ready")
+            assert response.json() == {"status": "ready"}
+            assert response.headers["cache-control"] == "no-store"
+
+        response = await client.get("/ready")  # draining
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    async def test_not_ready_while_the_database_is_unreachable(
+        self,
+        client: AsyncClient,
+        monkeypatch: MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        attempts = 0
+
+        async def unreachable(engine, connections: int) -> int:
+            nonlocal attempts
+            attempts += 1
+            raise OSError("connection refused")
+
+        monkeypatch.setattr(main, "warm_pool", unreachable)
+        monkeypatch.setattr(main.settings, "warmup_retry_seconds", 0.01)
+
+        async with main.lifespan(main.app):
+            await asyncio.sleep(0.1)
+            response = await client.get("/ready")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json() == {"status": "starting"}
+        assert attempts > 1
+        failures = [r for r in caplog.records if r.name == "app.main"]
+        assert len(failures) == attempts  # each one logged, with its cause
+        assert isinstance(failures[0].exc_info[1], OSError)
@@ -21,3 +21,13 @@ QuestionStr = Annotated[
         description="Question to ask the agent (1-300 chars)",
     ),
 ]
+
+AnswerStr = Annotated[
+    str,
+    Field(
+        min_length=1,
+        max_length=2000,
+        strip_whitespace=True,
+        description="Answer returned when the question matches (1-2000 chars)",
+    ),
+]
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import AsyncContextManager, Callable
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import crud
+from app.agent.services.answer_cache import answer_cache
+from app.agent.services.answering import get_index, matcher
+
+
+async def preload_hot_questions(
+    sessions: Callable[[], AsyncContextManager[AsyncSession]],
+    *,
+    since: datetime,
+    limit: int,
+) -> int:
+    """
+    Answer the *limit* most asked questions since *since* (from the question
+    log, so they survive restarts), which loads their agents, knowledge
+    base indexes and answers into the in-process caches the same way `/ask`
+    would. Agents deleted since, or that can no longer answer, are skipped.
+    Returns the number of questions answered.
+    """
+    async with sessions() as db:
+        rows = await crud.get_hot_questions(db, since=since, limit=limit)
+        by_agent: dict[UUID, list[str]] = {}
+        for row in rows:
+            by_agent.setdefault(row["agent_id"], []).append(row["q_norm"])
+
+        answered = 0
+        for agent_id, questions in by_agent.items():
+            try:
+                index = await get_index(db, agent_id)
+            except HTTPException:
+                continue
+            await answer_cache.resolve(agent_id, questions, matcher(index))
+            answered += len(questions)
+    return answered
@@ -0,0 +1,334 @@
+import asyncio
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Mapping, Protocol
+
+import orjson
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import LRUCache
+from app.core.config import Settings
+from app.core.metrics import ROUTE_LABEL, registry
+
+REJECTED = registry.counter(
+    "http_requests_rejected_total",
+    "Requests shed before reaching their endpoint, by reason.",
+    ("route", "reason"),
+)
+
+
+class ConcurrencyLimit:
+    """
+    Adaptive in-flight limit for one route (AIMD, as in TCP congestion control).
+
+    Every response that comes back within *target_latency* while the limit
+    is at least half used raises it by ``1 / limit``, about one slot per
+    "round" of requests. A slower response or a 5xx multiplies it by
+    *backoff*, at most once per round: only requests that started after the
+    previous decrease can trigger the next one, so a burst of slow
+    responses to the same overload shrinks the limit once, not once each.
+    """
+
+    def __init__(
+        self,
+        target_latency: float,
+        *,
+        initial: int = 32,
+        minimum: int = 1,
+        maximum: int = 256,
+        backoff: float = 0.9,
+    ) -> None:
+        self.target_latency = target_latency
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.reset()
+
+    def reset(self) -> None:
+        self.limit = float(self.initial)
+        self.in_flight = 0
+        self._decreased_at = -math.inf
+
+    def acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, started: float, finished: float, failed: bool = False) -> None:
+        """Return a slot taken at *started* (``time.perf_counter()``) and adapt."""
+        in_use = self.in_flight
+        self.in_flight -= 1
+        if failed or finished - started > self.target_latency:
+            if started >= self._decreased_at:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self._decreased_at = finished
+        elif in_use * 2 >= self.limit:  # don't grow a limit nobody is using
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+
+@dataclass(frozen=True)
+class Rate:
+    per_second: float
+    burst: int
+
+
+class RateLimitBackend(Protocol):
+    """
+    Token buckets behind `Admission`, one per key.
+
+    `take()` removes a token from *key*'s bucket (refilled at *rate* tokens
+    per second, holding at most *burst*) and returns 0, or, when the bucket
+    is empty, leaves it untouched and returns the seconds until a token is
+    available. A backend shared between workers (e.g. a Redis script doing
+    the same arithmetic) makes the limits per client rather than per
+    client and worker.
+    """
+
+    async def take(self, key: str, rate: float, burst: int) -> float: ...
+
+
+class InMemoryRateLimitBackend:
+    """
+    Per-process buckets in an LRU of *max_clients*; an evicted client comes
+    back with a full bucket.
+    """
+
+    def __init__(
+        self, *, max_clients: int, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._buckets: LRUCache[str, tuple[float, float]] = LRUCache(
+            max_items=max_clients, clock=clock
+        )
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = self._clock()
+        tokens, updated = self._buckets.get(key) or (float(burst), now)
+        tokens = min(float(burst), tokens + (now - updated) * rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / rate
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+
+class Admission:
+    """
+    Per-route load-shedding policies for `AdmissionMiddleware`, keyed like
+    the Cache-Control table by `"METHOD /path/{template}"`: adaptive
+    concurrency *limits* and per-client *rates*. Routes in neither table
+    are never touched. WebSocket routes only take rates, keyed `"WS ..."`
+    for the connections and `"FRAME ..."` for the frames received on them.
+
+    Clients are told apart by the peer address or, behind *trusted_hops*
+    proxies that each append to *client_header* (e.g. `X-Forwarded-For`),
+    by the address the outermost of them saw: the *trusted_hops*-th entry
+    from the right. Entries left of it come from the client and could be
+    anything. Swap `buckets` at startup to share the rate limits between
+    workers.
+    """
+
+    def __init__(
+        self,
+        *,
+        limits: Mapping[str, ConcurrencyLimit],
+        rates: Mapping[str, Rate],
+        buckets: RateLimitBackend,
+        client_header: str | None = None,
+        trusted_hops: int = 1,
+        retry_after: int = 1,
+        enabled: bool = True,
+    ) -> None:
+        self.limits = limits
+        self.rates = rates
+        self.buckets = buckets
+        self.client_header = client_header.lower().encode() if client_header else None
+        self.trusted_hops = max(1, trusted_hops)
+        self.retry_after = retry_after
+        self.enabled = enabled
+
+        self._routes: list[tuple[str, re.Pattern[str], str]] = []
+        for route in {*limits, *rates}:
+            method, path = route.split(" ", 1)
+            self._routes.append((method, compile_path(path)[0], route))
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "Admission":
+        limits = (
+            {
+                route: ConcurrencyLimit(
+                    target,
+                    initial=settings.admission_initial_limit,
+                    minimum=settings.admission_min_limit,
+                    maximum=settings.admission_max_limit,
+                    backoff=settings.admission_backoff,
+                )
+                for route, target in settings.admission_target_latency.items()
+            }
+            if settings.admission_enabled
+            else {}
+        )
+        rates = (
+            {route: Rate(*rate) for route, rate in settings.rate_limits.items()}
+            if settings.rate_limit_enabled
+            else {}
+        )
+        buckets = InMemoryRateLimitBackend(max_clients=settings.rate_limit_max_clients)
+        return cls(
+            limits=limits,
+            rates=rates,
+            buckets=buckets,
+            client_header=settings.rate_limit_client_header,
+            trusted_hops=settings.rate_limit_trusted_hops,
+            retry_after=settings.admission_retry_after_seconds,
+        )
+
+    def route(self, scope: Scope, method: str | None = None) -> str | None:
+        """The policy key for a request; it is resolved before routing runs."""
+        if method is None:
+            method = scope["method"] if scope["type"] == "http" else "WS"
+        for route_method, pattern, route in self._routes:
+            if route_method == method and pattern.match(scope["path"]):
+                return route
+        return None
+
+    def client(self, scope: Scope) -> str:
+        if self.client_header is not None:
+            forwarded = [
+                address.strip()
+                for name, value in scope["headers"]
+                if name == self.client_header
+                for address in value.decode("latin-1").split(",")
+            ]
+            if len(forwarded) >= self.trusted_hops:
+                return forwarded[-self.trusted_hops]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def take(self, route: str, scope: Scope) -> float:
+        """A token from the client's *route* bucket: 0, or seconds to wait."""
+        rate = self.rates.get(route)
+        if rate is None:
+            return 0.0
+        key = f"{route}|{self.client(scope)}"
+        return await self.buckets.take(key, rate.per_second, rate.burst)
+
+    def reset(self) -> None:
+        """Forget learnt limits and client buckets (tests)."""
+        for limit in self.limits.values():
+            limit.reset()
+        if isinstance(self.buckets, InMemoryRateLimitBackend):
+            self.buckets.clear()
+
+
+async def _reject(send: Send, status: int, detail: str, retry_after: float) -> None:
+    body = orjson.dumps({"detail": detail})
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    Sheds load before it queues up: a client over its route's rate gets 429,
+    a route at its concurrency limit 503, both at once and with Retry-After,
+    so admitted requests keep their latency under overload.
+
+    A WebSocket client over its connection rate is refused with close code
+    1013 before the handshake (an HTTP 403 to the client); frames beyond the
+    frame rate are read only once a token is available, so a client asking
+    faster than that is held back by TCP flow control, like a full chat
+    queue. Concurrency limits don't apply to WebSockets.
+    """
+
+    def __init__(self, app: ASGIApp, *, admission: Admission) -> None:
+        self.app = app
+        self.admission = admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        admission = self.admission
+        if scope["type"] == "websocket" and admission.enabled:
+            await self._websocket(scope, receive, send)
+            return
+        if scope["type"] != "http" or not admission.enabled:
+            await self.app(scope, receive, send)
+            return
+        route = admission.route(scope)
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+        # a request shed here never reaches routing: label its timings anyway
+        scope[ROUTE_LABEL] = route.split(" ", 1)[1]
+
+        wait = await admission.take(route, scope)
+        if wait > 0:
+            REJECTED.inc(route, "rate_limit")
+            await _reject(send, 429, "Too many requests", wait)
+            return
+
+        limit = admission.limits.get(route)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        if not limit.acquire():
+            REJECTED.inc(route, "concurrency")
+            retry_after = admission.retry_after
+            await _reject(send, 503, "Server is busy, retry later", retry_after)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            limit.release(started, time.perf_counter(), failed=status >= 500)
+
+    async def _websocket(self, scope: Scope, receive: Receive, send: Send) -> None:
+        admission = self.admission
+        route = admission.route(scope)
+        if route is not None and await admission.take(route, scope) > 0:
+            REJECTED.inc(route, "rate_limit")
+            close = {"type": "websocket.close", "code": 1013}  # try again later
+            await send({**close, "reason": "Too many connections"})
+            return
+
+        frames = admission.route(scope, "FRAME")
+        if frames is None or frames not in admission.rates:
+            await self.app(scope, receive, send)
+            return
+
+        async def paced_receive() -> Message:
+            message = await receive()
+            if message["type"] == "websocket.receive":
+                while (wait := await admission.take(frames, scope)) > 0:
+                    await asyncio.sleep(wait)
+            return message
+
+        await self.app(scope, paced_receive, send)
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, NamedTuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Slot(NamedTuple):
+    value: object
+    cost: int
+    expires_at: float
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe in-process LRU map.
+
+    Bounded by item count and/or total *cost* (e.g. estimated bytes);
+    entries optionally expire *ttl* seconds after being stored. Hit, miss
+    and eviction counters are kept for observability.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_items: int | None = None,
+        max_cost: int | None = None,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_items = max_items
+        self.max_cost = max_cost
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[K, _Slot] = OrderedDict()
+        self._cost = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def cost(self) -> int:
+        return self._cost
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        with self._lock:
+            slot = self._data.get(key)
+            if slot is None:
+                self.misses += 1
+                return default
+            if slot.expires_at <= self._clock():
+                self._drop(key)
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return slot.value  # type: ignore[return-value]
+
+    def set(self, key: K, value: V, cost: int = 1) -> None:
+        expires_at = float("inf") if self.ttl is None else self._clock() + self.ttl
+
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            if self.max_cost is not None and cost > self.max_cost:
+                return  # would evict everything and still not fit
+
+            self._data[key] = _Slot(value, cost, expires_at)
+            self._cost += cost
+            self._evict()
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            slot = self._drop(key)
+            return None if slot is None else slot.value  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._cost = 0
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._data),
+            "cost": self._cost,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _drop(self, key: K) -> _Slot | None:
+        slot = self._data.pop(key, None)
+        if slot is not None:
+            self._cost -= slot.cost
+        return slot
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_items is not None and len(self._data) > self.max_items)
+            or (self.max_cost is not None and self._cost > self.max_cost)
+        ):
+            _, slot = self._data.popitem(last=False)
+            self._cost -= slot.cost
+            self.evictions += 1
@@ -0,0 +1,34 @@
+from typing import Mapping
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class CacheControlMiddleware:
+    """
+    Sets `Cache-Control` on successful responses from a per-route policy
+    table keyed by `"METHOD /path/{template}"`. Endpoints that set the
+    header themselves win.
+    """
+
+    def __init__(self, app: ASGIApp, *, policies: Mapping[str, str]) -> None:
+        self.app = app
+        self.policies = policies
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_policy(message: Message) -> None:
+            if message["type"] == "http.response.start" and (
+                200 <= message["status"] < 300 or message["status"] == 304
+            ):
+                route = scope.get("route")
+                policy = route and self.policies.get(f"{scope['method']} {route.path}")
+                headers = MutableHeaders(scope=message)
+                if policy and "cache-control" not in headers:
+                    headers["Cache-Control"] = policy
+            await send(message)
+
+        await self.app(scope, receive, send_with_policy)
@@ -0,0 +1,225 @@
+import importlib
+import zlib
+from types import ModuleType
+from typing import Callable, Iterable, NamedTuple, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class Stream(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """Everything compressed so far, decodable by the client right away."""
+
+    def finish(self) -> bytes: ...
+
+
+class _Gzip:
+    def __init__(self, level: int) -> None:
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data)
+
+    def flush(self) -> bytes:
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class _Brotli:
+    def __init__(self, brotli: ModuleType, quality: int) -> None:
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class _Zstd:
+    def __init__(self, zstandard: ModuleType, level: int) -> None:
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._c = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+class Codec(NamedTuple):
+    name: str
+    stream: Callable[[], Stream]
+
+
+def _optional(name: str) -> ModuleType | None:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def available_codecs(
+    preference: Iterable[str] = ("zstd", "br", "gzip"),
+    *,
+    gzip_level: int = 6,
+    brotli_quality: int = 4,
+    zstd_level: int = 3,
+) -> list[Codec]:
+    """
+    Codecs in server preference order, skipping those not installed. The
+    optional codec modules are only imported when asked for.
+    """
+    preference = list(preference)
+    factories: dict[str, Callable[[], Stream]] = {"gzip": lambda: _Gzip(gzip_level)}
+    if "br" in preference and (brotli := _optional("brotli")):
+        factories["br"] = lambda: _Brotli(brotli, brotli_quality)
+    if "zstd" in preference and (zstandard := _optional("zstandard")):
+        factories["zstd"] = lambda: _Zstd(zstandard, zstd_level)
+
+    return [Codec(name, factories[name]) for name in preference if name in factories]
+
+
+def negotiate(accept_encoding: str, codecs: list[Codec]) -> Codec | None:
+    """
+    The codec the client prefers by `Accept-Encoding` q-value; ties go to
+    the server's order. `q=0` excludes a coding, `*` stands for the rest.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        if not (name := name.strip()):
+            continue
+        q = params.strip().removeprefix("q=")
+        try:
+            weights[name] = float(q) if q else 1.0
+        except ValueError:
+            weights[name] = 0.0
+
+    best, best_q = None, 0.0
+    for codec in codecs:
+        q = weights.get(codec.name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = codec, q
+    return best
+
+
+_COMPRESSIBLE = ("application/json", "application/x-ndjson", "text/")
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best codec the client accepts.
+
+    A complete body smaller than *minimum_size* is sent as is. Streamed
+    bodies (`more_body`) are compressed chunk by chunk and flushed after
+    each one, so a `StreamingResponse` is never buffered. Responses that
+    already carry a `Content-Encoding` are left alone.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, codecs: list[Codec], minimum_size: int = 1024
+    ) -> None:
+        self.app = app
+        self.codecs = codecs
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        codec = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.codecs)
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _Responder(send, codec, self.minimum_size))
+
+
+class _Responder:
+    """The `send` of one response: decides on its first body message."""
+
+    def __init__(self, send: Send, codec: Codec, minimum_size: int) -> None:
+        self._send = send
+        self._codec = codec
+        self._minimum_size = minimum_size
+        self._start: Message | None = None
+        self._stream: Stream | None = None
+        self._passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more: bool = message.get("more_body", False)
+
+        if self._stream is None:
+            assert self._start is not None
+            headers = MutableHeaders(scope=self._start)
+            if not self._should_compress(self._start["status"], headers, body, more):
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send(message)
+                return
+
+            self._stream = self._codec.stream()
+            chunk = self._encode(body, more)
+            headers["Content-Encoding"] = self._codec.name
+            if more:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(chunk))
+            await self._send(self._start)
+        else:
+            chunk = self._encode(body, more)
+
+        await self._send(
+            {"type": "http.response.body", "body": chunk, "more_body": more}
+        )
+
+    def _should_compress(
+        self, status: int, headers: MutableHeaders, body: bytes, more: bool
+    ) -> bool:
+        # a strong ETag promises byte-identical bodies, which now depend on the
+        # codec; weaken it on every negotiated response (incl. 304s) to stay
+        # consistent whether or not this particular body gets compressed
+        if status == 304:
+            _weaken_etag(headers)
+            return False
+        if "content-encoding" in headers:
+            return False
+        if not headers.get("content-type", "").startswith(_COMPRESSIBLE):
+            return False
+
+        headers.add_vary_header("Accept-Encoding")
+        _weaken_etag(headers)
+        return more or len(body) >= self._minimum_size
+
+    def _encode(self, body: bytes, more: bool) -> bytes:
+        assert self._stream is not None
+        chunk = self._stream.compress(body)
+        return chunk + (self._stream.flush() if more else self._stream.finish())
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
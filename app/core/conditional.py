@@ -0,0 +1,50 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping
+
+from fastapi import Response, status
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag over *parts* (values with a stable `repr`: ids, versions, ...)."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    """`Last-Modified` form of *value*; naive datetimes are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_fresh(
+    headers: Mapping[str, str], etag: str, last_modified: datetime | None = None
+) -> bool:
+    """
+    Whether the client's cached copy is current, so a 304 can be sent.
+
+    `If-None-Match` (weak comparison, `*` matches anything) wins over
+    `If-Modified-Since`, as RFC 9110 requires.
+    """
+    if (if_none_match := headers.get("if-none-match")) is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if last_modified is None or (since := headers.get("if-modified-since")) is None:
+        return False
+    try:
+        since_dt = parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
+
+    if since_dt.tzinfo is None:
+        since_dt = since_dt.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since_dt
+
+
+def not_modified(headers: Mapping[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(headers))
@@ -1,4 +1,6 @@
 from functools import lru_cache
+from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -13,6 +15,119 @@ class Settings(BaseSettings):
     postgres_host: str = "db"
     postgres_port: int = 5432
 
+    # Engine / connection pool, per worker process
+    db_pool_size: int = 5
+    db_max_overflow: int = 10  # extra connections opened under bursts
+    db_pool_timeout_seconds: float = 30.0  # wait for a free connection
+    db_pool_recycle_seconds: int = -1  # replace connections older than this
+    db_pool_pre_ping: bool = False  # test each connection on checkout
+    db_statement_cache_size: int = 100  # asyncpg prepared statements per connection
+    # Behind PgBouncer in transaction mode: no prepared statement reuse
+    db_pgbouncer: bool = False
+
+    # Read replicas (asyncpg DSNs) for read-only endpoints; empty = primary only
+    database_replica_urls: list[str] = []
+    db_replica_eject_seconds: float = 30.0  # skip a failing replica this long
+    # reads stay on the primary this long after a write, for clients that keep
+    # cookies; a read that fails on a replica is retried once on the primary
+    db_read_your_writes_seconds: int = 5
+
+    # GET /agents paging
+    agents_page_max_size: int = 500  # upper bound for ?limit=
+    agents_list_max_size: int = 1000  # rows returned when no limit is given
+
+    # POST /agents:bulk
+    agents_bulk_max_rows: int = 50_000
+    agents_bulk_chunk_size: int = 1000  # rows per multi-row INSERT
+
+    # GET /agents/export
+    agents_export_batch_size: int = 1000  # rows fetched (and sent) per chunk
+
+    # Agent rows cached as AgentRead snapshots (in-process LRU)
+    agent_cache_max_items: int = 10_000
+    agent_cache_ttl_seconds: float = 60.0
+    agent_cache_negative_max_items: int = 10_000
+    agent_cache_negative_ttl_seconds: float = 5.0
+
+    # Per-agent knowledge base indexes (in-process LRU)
+    kb_cache_max_bytes: int = 64 * 1024 * 1024
+    kb_cache_ttl_seconds: float = 300.0
+    # memory-mapped index files shared by the workers of a host (e.g. on /dev/shm)
+    kb_index_dir: Path | None = None
+
+    # Answers cached per (agent, normalised question). In memory, an edit only
+    # invalidates the worker that made it; the others drop the agent's answers
+    # when they reload its knowledge base, at most kb_cache_ttl_seconds later
+    answer_cache_enabled: bool = True
+    answer_cache_max_items: int = 10_000
+    answer_cache_ttl_seconds: float = 300.0
+
+    # Off-loop execution of CPU-bound answer matching. "process" pickles the
+    # whole knowledge base into the pool with every question unless
+    # kb_index_dir is set, so only use it together with that
+    matcher_executor: Literal["thread", "process", "inline"] = "thread"
+    matcher_workers: int = 4
+    matcher_max_pending: int = 64  # running + queued; beyond this /ask sheds load
+    matcher_retry_after_seconds: int = 1
+    ask_batch_max_questions: int = 100
+
+    # Write-behind log of asked questions (unanswered-question report)
+    question_log_enabled: bool = True
+    question_log_max_pending: int = 10_000  # rows buffered; more are dropped
+    question_log_batch_size: int = 500  # rows per multi-row INSERT
+    question_log_flush_seconds: float = 1.0
+    # rows older than this are deleted (hourly); 0 keeps them forever. The
+    # report and warm-up only read recent rows
+    question_log_retention_days: float = 30.0
+
+    # WS /agents/{agent_id}/chat
+    chat_max_pending: int = 32  # queued questions per connection before reads pause
+    chat_idle_timeout_seconds: float = 300.0
+
+    # Load shedding in front of the endpoints. Adaptive (AIMD) in-flight limits
+    # per route, driven by latency against a target; beyond them -> 503
+    admission_enabled: bool = True
+    admission_target_latency: dict[str, float] = {  # seconds
+        "POST /agents/{agent_id}/ask": 0.25,
+        "POST /agents/{agent_id}/ask:batch": 1.0,
+        "GET /agents": 0.5,
+    }
+    admission_initial_limit: int = 32
+    admission_min_limit: int = 2
+    admission_max_limit: int = 256
+    admission_backoff: float = 0.9  # limit multiplier on a slow or failed response
+    admission_retry_after_seconds: int = 1
+    # Per-client token buckets: route -> (requests per second, burst); over -> 429.
+    # "WS" routes count WebSocket connections (over -> close 1013), "FRAME"
+    # routes the frames received on them (over -> read no faster than the rate)
+    rate_limit_enabled: bool = True
+    rate_limits: dict[str, tuple[float, int]] = {
+        "POST /agents/{agent_id}/ask": (10.0, 20),
+        "POST /agents/{agent_id}/ask:batch": (2.0, 5),
+        "POST /agents:bulk": (1.0, 3),
+        "WS /agents/{agent_id}/chat": (1.0, 5),
+        "FRAME /agents/{agent_id}/chat": (10.0, 20),  # questions, as for /ask
+    }
+    rate_limit_client_header: str | None = None  # e.g. X-Forwarded-For behind a proxy
+    rate_limit_trusted_hops: int = 1  # proxies appending to that header
+    rate_limit_max_clients: int = 100_000  # buckets kept per worker (LRU)
+
+    # Response compression (br / zstd only when brotli / zstandard are installed)
+    compression_codings: list[str] = ["zstd", "br", "gzip"]  # server preference
+    compression_min_size: int = 1024  # smaller complete bodies are sent as is
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+
+    # Request timing, DB and matcher instrumentation, served on /metrics
+    metrics_enabled: bool = True
+
+    # Start-up warm-up; /ready answers 503 until it has finished
+    warmup_pool_connections: int = 5  # per engine, at most db_pool_size
+    warmup_hot_questions: int = 1000  # most asked lately, answered ahead; 0 = off
+    warmup_hot_window_hours: float = 24.0
+    warmup_retry_seconds: float = 2.0  # while the primary database is unreachable
+
     @property
     def database_url(self) -> str:  # async DSN
         return (
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Literal, TypeVar
+
+from app.core.config import Settings, get_settings
+from app.core.metrics import Labels, registry
+from app.exceptions import ServiceUnavailable
+
+T = TypeVar("T")
+
+ExecutorKind = Literal["thread", "process", "inline"]
+
+
+def _timed(fn: Callable[..., T], *args: Any) -> tuple[float, T]:
+    """Runs inside the worker; reports its own run time so queue wait can be derived."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+@dataclass
+class ExecutorStats:
+    submitted: int = 0
+    rejected: int = 0
+    completed: int = 0
+    in_flight: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    run_seconds_total: float = 0.0
+
+    def observe(self, wait: float, run: float) -> None:
+        self.completed += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        self.run_seconds_total += run
+
+
+class OffloadExecutor:
+    """
+    Runs CPU-bound callables off the event loop with bounded admission.
+
+    At most *max_pending* calls may be running or queued at once; further
+    calls fail fast with `ServiceUnavailable` (503 + Retry-After) instead of
+    growing an unbounded backlog. `"inline"` runs on the loop (tests, tiny
+    deployments); `"process"` needs picklable callables and arguments.
+    """
+
+    def __init__(
+        self,
+        kind: ExecutorKind = "thread",
+        *,
+        workers: int = 4,
+        max_pending: int = 64,
+        retry_after: int = 1,
+    ) -> None:
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.stats = ExecutorStats()
+        self._pool: Executor | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "OffloadExecutor":
+        return cls(
+            settings.matcher_executor,
+            workers=settings.matcher_workers,
+            max_pending=settings.matcher_max_pending,
+            retry_after=settings.matcher_retry_after_seconds,
+        )
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="matcher"
+                )
+        return self._pool
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.kind == "inline":
+            self.stats.submitted += 1
+            run, result = _timed(fn, *args)
+            self.stats.observe(0.0, run)
+            return result
+
+        if self.stats.in_flight >= self.max_pending:
+            self.stats.rejected += 1
+            raise ServiceUnavailable("Server is busy, retry later", self.retry_after)
+
+        self.stats.submitted += 1
+        self.stats.in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            run, result = await loop.run_in_executor(
+                self._get_pool(), _timed, fn, *args
+            )
+        finally:
+            self.stats.in_flight -= 1
+
+        self.stats.observe(max(0.0, time.perf_counter() - start - run), run)
+        return result
+
+    async def warm(self, fn: Callable[..., Any], *args: Any) -> None:
+        """
+        Start the workers ahead of traffic by running *fn* once per worker,
+        so the first requests don't pay for thread or process start-up (and,
+        for processes, importing the app and unpickling *fn*).
+        """
+        if self.kind == "inline":
+            fn(*args)
+            return
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        await asyncio.gather(
+            *(loop.run_in_executor(pool, fn, *args) for _ in range(self.workers))
+        )
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+matcher_executor = OffloadExecutor.from_settings(get_settings())
+
+
+def _executor_gauges() -> dict[Labels, float]:
+    return {(stat,): value for stat, value in vars(matcher_executor.stats).items()}
+
+
+registry.gauge(
+    "matcher_executor",
+    "Off-loop matcher admission, queue wait and run time totals.",
+    ("stat",),
+    _executor_gauges,
+)
@@ -0,0 +1,263 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterator, Mapping, Sequence, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+Labels = tuple[str, ...]
+M = TypeVar("M", bound="Metric")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _sample(name: str, names: Labels, values: Labels, value: float) -> str:
+    if not names:
+        return f"{name} {value!r}"
+    pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(names, values))
+    return f"{name}{{{pairs}}} {value!r}"
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Labels = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self.samples()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Labels = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        for values, value in list(self._values.items()):
+            yield _sample(self.name, self.labels, values, value)
+
+
+class _Series:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * (buckets + 1)  # last slot: above every bound (+Inf)
+        self.sum = 0.0
+
+
+class Histogram(Metric):
+    """
+    Fixed-bucket histogram per label set.
+
+    `observe()` is a bisect plus two additions; buckets are only made
+    cumulative when rendered.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Labels = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self._series: dict[Labels, _Series] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _Series(len(self.buckets))
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return 0 if series is None else sum(series.counts)
+
+    def total(self, *labels: str) -> float:
+        series = self._series.get(labels)
+        return 0.0 if series is None else series.sum
+
+    def samples(self) -> Iterator[str]:
+        names = (*self.labels, "le")
+        for values, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series.counts):
+                cumulative += count
+                le = (*values, str(bound))
+                yield _sample(f"{self.name}_bucket", names, le, cumulative)
+            yield _sample(f"{self.name}_count", self.labels, values, cumulative)
+            yield _sample(f"{self.name}_sum", self.labels, values, series.sum)
+
+
+class Gauge(Metric):
+    """Values read from *collect* at scrape time (pool occupancy, cache stats)."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Labels,
+        collect: Callable[[], Mapping[Labels, float]],
+    ) -> None:
+        super().__init__(name, help, labels)
+        self._collect = collect
+
+    def samples(self) -> Iterator[str]:
+        for values, value in self._collect().items():
+            yield _sample(self.name, self.labels, values, float(value))
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Labels = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Labels = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        labels: Labels,
+        collect: Callable[[], Mapping[Labels, float]],
+    ) -> Gauge:
+        return self.register(Gauge(name, help, labels, collect))
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+# One registry per worker process. Metrics are only written from the event
+# loop thread, so the unlocked read-modify-writes above cannot interleave.
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending its last body chunk.",
+    ("method", "route", "status"),
+)
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "Database queries issued per request.",
+    ("route",),
+    COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = registry.histogram(
+    "http_request_db_seconds",
+    "Time spent in database queries per request.",
+    ("route",),
+)
+
+
+@dataclass(slots=True)
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request() -> RequestStats | None:
+    """Counters of the request being served, if any (background work has none)."""
+    return _request_stats.get()
+
+
+# scope key: the route template to record for a request that is answered
+# before it is routed
+ROUTE_LABEL = "metrics.route"
+
+
+class TimingMiddleware:
+    """
+    Records latency, DB query count and DB time per route template.
+
+    Requests that match no route are grouped under `"unmatched"` so stray
+    paths cannot grow the label set, unless a middleware answered before
+    routing and set `ROUTE_LABEL` (e.g. load shedding, by its policy's
+    route). Streamed bodies are timed until their
+    last chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+
+            route = scope.get("route")
+            if route is not None:
+                path = route.path
+            else:
+                path = scope.get(ROUTE_LABEL, "unmatched")
+            REQUEST_SECONDS.observe(elapsed, scope["method"], path, str(status))
+            REQUEST_DB_QUERIES.observe(stats.db_queries, path)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, path)
@@ -0,0 +1,67 @@
+from app.core.cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLRUCache:
+    """Bounds, expiry and counters of the in-process LRU."""
+
+    def test_evicts_least_recently_used_item(self) -> None:
+        cache: LRUCache[str, int] = LRUCache(max_items=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now the oldest
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_cost_cap(self) -> None:
+        cache: LRUCache[str, str] = LRUCache(max_cost=10)
+        cache.set("a", "x", cost=6)
+        cache.set("b", "y", cost=6)
+
+        assert len(cache) == 1
+        assert cache.cost == 6
+        assert cache.get("b") == "y"
+
+    def test_oversized_item_is_not_stored(self) -> None:
+        cache: LRUCache[str, str] = LRUCache(max_cost=10)
+        cache.set("a", "x", cost=4)
+        cache.set("huge", "y", cost=11)
+
+        assert cache.get("huge") is None
+        assert cache.get("a") == "x"
+
+    def test_ttl_expiry(self) -> None:
+        clock = FakeClock()
+        cache: LRUCache[str, int] = LRUCache(ttl=5, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_hit_miss_counters(self) -> None:
+        cache: LRUCache[str, int] = LRUCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("missing")
+
+        assert cache.stats() == {
+            "size": 1,
+            "cost": 1,
+            "hits": 1,
+            "misses": 1,
+            "evictions": 0,
+        }
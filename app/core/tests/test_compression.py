@@ -0,0 +1,189 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.core.cache_control import CacheControlMiddleware
+from app.core.compression import CompressionMiddleware, available_codecs, negotiate
+
+BODY = b'{"name":"Agent"}' * 200  # 3200 bytes
+CHUNKS = [b'{"line":%d}\n' % i * 50 for i in range(3)]
+
+
+def _app(cache_policies: dict[str, str]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big() -> Response:
+        return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small() -> Response:
+        return Response(b"{}", media_type="application/json")
+
+    @app.get("/png")
+    async def png() -> Response:
+        return Response(BODY, media_type="image/png")
+
+    @app.get("/encoded")
+    async def encoded() -> Response:
+        return Response(
+            gzip.compress(BODY),
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def chunks():
+            for chunk in CHUNKS:
+                yield chunk
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @app.get("/own-policy")
+    async def own_policy() -> Response:
+        return Response(b"{}", headers={"Cache-Control": "max-age=60"})
+
+    app.add_middleware(CacheControlMiddleware, policies=cache_policies)
+    app.add_middleware(CompressionMiddleware, codecs=available_codecs())
+    return app
+
+
+@pytest.fixture
+async def client():
+    policies = {"GET /big": "private, no-cache", "GET /own-policy": "no-store"}
+    transport = ASGITransport(app=_app(policies))
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+class TestNegotiate:
+    CODECS = available_codecs(("gzip",))
+
+    @pytest.mark.parametrize(
+        "accept,expected",
+        [
+            ("gzip", "gzip"),
+            ("deflate, gzip;q=0.5", "gzip"),
+            ("*", "gzip"),
+            ("gzip;q=0", None),
+            ("*;q=0", None),
+            ("identity", None),
+            ("", None),
+        ],
+    )
+    def test_gzip(self, accept: str, expected: str | None) -> None:
+        codec = negotiate(accept, self.CODECS)
+        assert (codec and codec.name) == expected
+
+    def test_q_values_beat_server_order(self) -> None:
+        pytest.importorskip("brotli")
+        codecs = available_codecs(("br", "gzip"))
+
+        assert negotiate("gzip, br", codecs).name == "br"  # tie: server order
+        assert negotiate("gzip, br;q=0.5", codecs).name == "gzip"
+
+    def test_skips_missing_codecs(self) -> None:
+        assert [c.name for c in available_codecs(("lzma", "gzip"))] == ["gzip"]
+
+
+class TestCompressionMiddleware:
+    async def test_compresses_complete_body(self, client: AsyncClient) -> None:
+        response = await client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(BODY)
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"v1"'
+        assert response.content == BODY
+
+    async def test_small_bodies_pass_through(self, client: AsyncClient) -> None:
+        response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == b"{}"
+
+    @pytest.mark.parametrize("path", ["/png", "/encoded"])
+    async def test_leaves_other_responses_alone(
+        self, client: AsyncClient, path: str
+    ) -> None:
+        response = await client.get(path, headers={"Accept-Encoding": "br, gzip"})
+
+        assert response.headers.get("content-encoding") in (None, "gzip")
+        assert "vary" not in response.headers
+        assert response.content == BODY
+
+    async def test_identity(self, client: AsyncClient) -> None:
+        response = await client.get("/big", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"v1"'
+        assert response.content == BODY
+
+    async def test_streams_chunk_by_chunk(self) -> None:
+        # ASGITransport buffers bodies, so drive the middleware's messages directly
+        app = CompressionMiddleware(
+            StreamingResponse(iter(CHUNKS), media_type="application/x-ndjson"),
+            codecs=available_codecs(("gzip",)),
+        )
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "headers": [(b"accept-encoding", b"gzip")],
+        }
+        sent = []
+        connected = asyncio.Event()  # never set: the client stays connected
+
+        async def receive():
+            await connected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+
+        start, *bodies = sent
+        headers = dict(start["headers"])
+        assert headers[b"content-encoding"] == b"gzip"
+        assert b"content-length" not in headers
+
+        decoder = zlib.decompressobj(31)
+        decoded = [decoder.decompress(m["body"]) for m in bodies]
+        # every chunk is flushed: decodable without waiting for the rest
+        assert decoded[: len(CHUNKS)] == CHUNKS
+        assert decoder.eof and not bodies[-1]["more_body"]
+
+    @pytest.mark.parametrize("coding,module", [("br", "brotli"), ("zstd", "zstandard")])
+    async def test_optional_codecs(
+        self, client: AsyncClient, coding: str, module: str
+    ) -> None:
+        pytest.importorskip(module)
+        response = await client.get("/big", headers={"Accept-Encoding": coding})
+
+        assert response.headers["content-encoding"] == coding
+        assert response.content == BODY
+
+
+class TestCacheControlMiddleware:
+    async def test_policy_by_route(self, client: AsyncClient) -> None:
+        response = await client.get("/big")
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        response = await client.get("/small")
+        assert "cache-control" not in response.headers
+
+    async def test_endpoint_header_wins(self, client: AsyncClient) -> None:
+        response = await client.get("/own-policy")
+        assert response.headers["cache-control"] == "max-age=60"
+
+    async def test_errors_get_no_policy(self, client: AsyncClient) -> None:
+        response = await client.post("/big")
+        assert response.status_code == 405
+        assert "cache-control" not in response.headers
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.conditional import http_date, is_fresh, make_etag
+
+ETAG = make_etag("agent", 1)
+UPDATED = datetime(2026, 10, 17, 9, 30, 15, 250_000, tzinfo=timezone.utc)
+
+
+class TestConditional:
+    def test_etag_is_stable_and_strong(self) -> None:
+        assert make_etag("agent", 1) == ETAG != make_etag("agent", 2)
+        assert ETAG.startswith('"') and ETAG.endswith('"')
+
+    def test_http_date(self) -> None:
+        assert http_date(UPDATED) == "Sat, 17 Oct 2026 09:30:15 GMT"
+        assert http_date(UPDATED.replace(tzinfo=None)) == http_date(UPDATED)
+
+    @pytest.mark.parametrize(
+        "headers,fresh",
+        [
+            ({}, False),
+            ({"if-none-match": ETAG}, True),
+            ({"if-none-match": f'"other", W/{ETAG}'}, True),
+            ({"if-none-match": "*"}, True),
+            ({"if-none-match": '"other"'}, False),
+            ({"if-modified-since": "Sat, 17 Oct 2026 09:30:15 GMT"}, True),
+            ({"if-modified-since": "Sat, 17 Oct 2026 09:30:14 GMT"}, False),
+            ({"if-modified-since": "yesterday"}, False),
+            # If-None-Match wins over If-Modified-Since
+            (
+                {
+                    "if-none-match": '"other"',
+                    "if-modified-since": "Sat, 17 Oct 2026 09:30:15 GMT",
+                },
+                False,
+            ),
+        ],
+    )
+    def test_is_fresh(self, headers: dict[str, str], fresh: bool) -> None:
+        assert is_fresh(headers, ETAG, UPDATED) is fresh
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.agent.services.qa import _QA_PAIRS, QAIndex
+from app.core.executor import OffloadExecutor
+from app.exceptions import ServiceUnavailable
+
+
+class TestOffloadExecutor:
+    """Off-loop execution, admission bounds and wait-time stats."""
+
+    @pytest.mark.parametrize("kind", ["inline", "thread", "process"])
+    async def test_runs_matcher(self, kind: str) -> None:
+        executor = OffloadExecutor(kind, workers=1)
+        try:
+            result = await executor.run(QAIndex(_QA_PAIRS).answer, "parking?")
+        finally:
+            executor.shutdown()
+
+        assert result == _QA_PAIRS["parking"]
+        assert executor.stats.completed == 1
+        assert executor.stats.in_flight == 0
+
+    async def test_warm_starts_every_worker(self) -> None:
+        executor = OffloadExecutor("thread", workers=3)
+        started = threading.Barrier(3, timeout=5)  # passes only with 3 live threads
+        try:
+            await executor.warm(started.wait)
+        finally:
+            executor.shutdown()
+
+        assert executor.stats.submitted == 0
+
+    async def test_thread_mode_leaves_loop_responsive(self) -> None:
+        executor = OffloadExecutor("thread", workers=1)
+        release = threading.Event()
+        try:
+            task = asyncio.create_task(executor.run(release.wait, 5))
+            await asyncio.sleep(
+                0.01
+            )  # the loop still schedules while the worker blocks
+            assert not task.done()
+
+            release.set()
+            assert await task is True
+        finally:
+            executor.shutdown()
+
+    async def test_rejects_when_saturated(self) -> None:
+        executor = OffloadExecutor("thread", workers=1, max_pending=1, retry_after=3)
+        release = threading.Event()
+        try:
+            task = asyncio.create_task(executor.run(release.wait, 5))
+            await asyncio.sleep(0)
+
+            with pytest.raises(ServiceUnavailable) as exc_info:
+                await executor.run(len, "x")
+
+            release.set()
+            await task
+        finally:
+            executor.shutdown()
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers == {"Retry-After": "3"}
+        assert executor.stats.rejected == 1
+
+    async def test_records_queue_wait(self) -> None:
+        executor = OffloadExecutor("thread", workers=1)
+        release = threading.Event()
+        try:
+            first = asyncio.create_task(executor.run(release.wait, 5))
+            second = asyncio.create_task(executor.run(len, "queued"))
+            await asyncio.sleep(0.02)
+            release.set()
+            await asyncio.gather(first, second)
+        finally:
+            executor.shutdown()
+
+        # the second call sat behind the first one in the single-worker queue
+        assert executor.stats.wait_seconds_max >= 0.01
@@ -1,4 +1,4 @@
-from app.agent.models import Agent
+from app.agent.models import Agent, KnowledgeEntry
 from app.db.database import Base
 
-__all__ = ["Base", "Agent"]
+__all__ = ["Base", "Agent", "KnowledgeEntry"]
@@ -1,20 +1,157 @@
-from typing import AsyncGenerator
+from typing import Any, AsyncContextManager, AsyncGenerator, Awaitable, Callable
+from uuid import uuid4
 
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
+from starlette.requests import HTTPConnection
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+
+from .metrics import instrument_engine
+from .pool import InstrumentedPool
+from .replicas import CONNECTION_ERRORS, PRIMARY_COOKIE, ReplicaSet
+from .session import lazy_session
 
 settings = get_settings()
 
 
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(settings: Settings) -> dict[str, Any]:
+    """`create_async_engine` keyword arguments for the configured pool and driver."""
+    if settings.db_pgbouncer:
+        # transaction pooling hands each transaction to any server connection,
+        # so named prepared statements must neither be cached nor collide
+        connect_args: dict[str, Any] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    else:
+        connect_args = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+
+    return {
+        "echo": False,
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
 Base = declarative_base()
-engine = create_async_engine(settings.database_url, echo=False)
+engine = create_async_engine(settings.database_url, **engine_options(settings))
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+replica_engines = [
+    create_async_engine(url, **engine_options(settings))
+    for url in settings.database_replica_urls
+]
+if settings.metrics_enabled:
+    instrument_engine(engine, "primary")
+    for i, replica_engine in enumerate(replica_engines):
+        instrument_engine(replica_engine, f"replica{i}")
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+replicas = ReplicaSet(
+    [
+        async_sessionmaker(e, class_=AsyncSession, expire_on_commit=False)
+        for e in replica_engines
+    ],
+    eject_seconds=settings.db_replica_eject_seconds,
+)
+
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# request scope keys: a replica served this request / it must use the primary
+_ON_REPLICA = "db.replica"
+_ON_PRIMARY = "db.primary"
+
+
+async def get_db(
+    request: Request, response: Response
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session on the primary; use it for anything that writes."""
+    if replicas and request.method not in _SAFE_METHODS:
+        # replicas lag behind: keep this client's reads on the primary a while.
+        # Only clients that send cookies back get this; others may read their
+        # writes from a replica that hasn't caught up yet
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            "1",
+            max_age=settings.db_read_your_writes_seconds,
+            httponly=True,
+            samesite="lax",
+        )
+
+    async with lazy_session(AsyncSessionLocal) as session:
         yield session
+
+
+def read_session(conn: HTTPConnection) -> AsyncContextManager[AsyncSession]:
+    """
+    Session for read-only work: the next healthy replica, or the primary
+    when none is configured or healthy, the client has just written (it
+    sent `PRIMARY_COOKIE` back) or the request is retried after its
+    replica failed (see `ReplicaFallbackRoute`).
+    """
+    if (
+        conn.cookies.get(PRIMARY_COOKIE)
+        or _ON_PRIMARY in conn.scope
+        or (index := replicas.pick()) is None
+    ):
+        return lazy_session(AsyncSessionLocal)
+
+    conn.scope[_ON_REPLICA] = True
+    return replicas.session(index)
+
+
+class ReplicaFallbackRoute(APIRoute):
+    """
+    Route that runs a request again, once and on the primary, when a read
+    replica fails it with a connection error; by then the replica has been
+    ejected, so the request that found the failure still gets its answer.
+    Nothing is retried once the response has started (streamed bodies).
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+
+        async def retry_on_primary(request: Request) -> Response:
+            try:
+                return await handler(request)
+            except CONNECTION_ERRORS:
+                if not request.scope.pop(_ON_REPLICA, False):
+                    raise
+            request.scope[_ON_PRIMARY] = True
+            return await handler(request)
+
+        return retry_on_primary
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with read_session(request) as session:
+        yield session
+
+
+def get_read_session_factory(
+    conn: HTTPConnection,
+) -> Callable[[], AsyncContextManager[AsyncSession]]:
+    """
+    Read sessions (see `read_session`) for responses that outlive the request
+    handler: dependencies with `yield` are torn down before a streaming body
+    is sent, so the session must be opened inside the body generator instead.
+    Also used by WebSocket endpoints, which should not hold a session open.
+    """
+    return lambda: read_session(conn)
@@ -1,8 +1,16 @@
-from typing import Annotated
+from typing import Annotated, AsyncContextManager, Callable
 
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .database import get_db
+from .database import (
+    get_db,
+    get_read_db,
+    get_read_session_factory,
+)
 
 AsyncSessionDependency = Annotated[AsyncSession, Depends(get_db)]
+ReadSessionDependency = Annotated[AsyncSession, Depends(get_read_db)]
+ReadSessionFactoryDependency = Annotated[
+    Callable[[], AsyncContextManager[AsyncSession]], Depends(get_read_session_factory)
+]
@@ -0,0 +1,55 @@
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import Labels, current_request, registry
+
+from .pool import pool_stats
+
+QUERY_SECONDS = registry.histogram(
+    "db_query_seconds", "Database query execution time.", ("engine",)
+)
+
+_engines: dict[str, AsyncEngine] = {}
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Times every statement *engine* executes and charges it to the current
+    request (see `TimingMiddleware`). Its pool occupancy is reported under
+    the same *name*.
+    """
+    _engines[name] = engine
+
+    # cursor events fire for each round-trip, including every executemany batch
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _stop(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        elapsed = time.perf_counter() - conn.info.pop("query_started")
+        QUERY_SECONDS.observe(elapsed, name)
+
+        stats = current_request()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+
+
+def _pool_gauges() -> dict[Labels, float]:
+    return {
+        (name, stat): value
+        for name, engine in _engines.items()
+        for stat, value in pool_stats(engine.pool).items()
+    }
+
+
+registry.gauge(
+    "db_pool",
+    "Connection pool occupancy and checkout stats.",
+    ("engine", "stat"),
+    _pool_gauges,
+)
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def observe(self, wait: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    `AsyncAdaptedQueuePool` that records how long each checkout waited.
+
+    Connect events only fire once a connection has been handed out, so the
+    wait (including time blocked on a full pool) is measured around the
+    pool's own `_do_get`.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+
+        self.stats.observe(time.perf_counter() - start)
+        return conn
+
+
+def pool_stats(pool: Pool) -> dict[str, float]:
+    """Live occupancy of *pool* plus checkout counters (when instrumented)."""
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {}
+
+    stats: dict[str, float] = {
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+    }
+    if isinstance(pool, InstrumentedPool):
+        stats.update(vars(pool.stats))
+    return stats
+
+
+async def warm_pool(engine: AsyncEngine, connections: int) -> int:
+    """
+    Open up to *connections* pooled connections at once (capped at the pool
+    size, since overflow connections are closed on return) and check each
+    with a `SELECT 1`, so early requests don't pay for connection setup.
+    Returns how many were opened.
+    """
+    pool = engine.pool
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        connections = min(connections, pool.size())
+
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(connections)))
+    return connections
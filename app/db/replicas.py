@@ -0,0 +1,68 @@
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Sequence
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .session import lazy_session
+
+# set after a write so the client's next reads see it despite replica lag
+PRIMARY_COOKIE = "db_primary"
+
+# what an unreachable or restarting server looks like from the driver
+CONNECTION_ERRORS = (OSError, exc.OperationalError, exc.InterfaceError)
+
+
+class ReplicaSet:
+    """
+    Round-robin over read replicas with passive health checks.
+
+    A replica whose session fails with a connection error is ejected for
+    *eject_seconds*, then tried again; while every replica is ejected,
+    `pick()` returns `None` and reads go to the primary.
+    """
+
+    def __init__(
+        self,
+        factories: Sequence[async_sessionmaker[AsyncSession]],
+        *,
+        eject_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._factories = list(factories)
+        self._ejected_until = [0.0] * len(self._factories)
+        self._next = itertools.cycle(range(len(self._factories)))
+        self._eject_seconds = eject_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def pick(self) -> int | None:
+        now = self._clock()
+        with self._lock:
+            for _ in self._factories:
+                index = next(self._next)
+                if self._ejected_until[index] <= now:
+                    return index
+        return None
+
+    def eject(self, index: int) -> None:
+        self._ejected_until[index] = self._clock() + self._eject_seconds
+
+    def healthy(self) -> int:
+        now = self._clock()
+        return sum(until <= now for until in self._ejected_until)
+
+    @asynccontextmanager
+    async def session(self, index: int) -> AsyncIterator[AsyncSession]:
+        async with lazy_session(self._factories[index]) as session:
+            try:
+                yield session
+            except CONNECTION_ERRORS:
+                self.eject(index)
+                raise
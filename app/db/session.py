@@ -0,0 +1,23 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@asynccontextmanager
+async def lazy_session(
+    factory: Callable[[], AsyncSession],
+) -> AsyncIterator[AsyncSession]:
+    """
+    A session from *factory* that costs nothing unless it is used.
+
+    Sessions only check out a connection on their first query; this also
+    skips `close()` (a greenlet round-trip) when no query ever ran, so a
+    request answered from memory never touches the pool.
+    """
+    session = factory()
+    try:
+        yield session
+    finally:
+        if session.in_transaction() or session.identity_map:
+            await session.close()
@@ -0,0 +1,37 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.metrics import RequestStats, _request_stats
+from app.db.metrics import QUERY_SECONDS, instrument_engine
+
+
+class TestInstrumentEngine:
+    async def test_queries_are_charged_to_the_request(self) -> None:
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        instrument_engine(engine, "test")
+        before = QUERY_SECONDS.count("test")
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+        finally:
+            _request_stats.reset(token)
+            await engine.dispose()
+
+        assert stats.db_queries == 2
+        assert stats.db_seconds > 0
+        assert QUERY_SECONDS.count("test") == before + 2
+
+    async def test_queries_outside_requests_are_still_timed(self) -> None:
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        instrument_engine(engine, "background")
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        finally:
+            await engine.dispose()
+
+        assert QUERY_SECONDS.count("background") == 1
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import Settings
+from app.db.database import engine_options
+from app.db.pool import InstrumentedPool, pool_stats, warm_pool
+
+
+class TestEngineOptions:
+    def test_pool_settings_are_passed_through(self) -> None:
+        options = engine_options(
+            Settings(db_pool_size=20, db_max_overflow=0, db_pool_pre_ping=True)
+        )
+
+        assert options["poolclass"] is InstrumentedPool
+        assert options["pool_size"] == 20
+        assert options["max_overflow"] == 0
+        assert options["pool_pre_ping"] is True
+        assert options["connect_args"]["statement_cache_size"] == 100
+
+    def test_pgbouncer_mode_disables_statement_caching(self) -> None:
+        connect_args = engine_options(Settings(db_pgbouncer=True))["connect_args"]
+
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        name = connect_args["prepared_statement_name_func"]
+        assert name() != name()
+
+
+class TestInstrumentedPool:
+    """Checkout wait, occupancy and timeout accounting on a real pool."""
+
+    async def test_stats(self, tmp_path: Path) -> None:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedPool,
+            pool_size=1,
+            max_overflow=1,
+            pool_timeout=0.05,
+        )
+        try:
+            async with engine.connect() as first, engine.connect() as second:
+                await first.execute(text("SELECT 1"))
+                await second.execute(text("SELECT 1"))
+                stats = pool_stats(engine.pool)
+                assert (stats["in_use"], stats["overflow"]) == (2, 1)
+
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+
+            stats = pool_stats(engine.pool)
+            assert stats["in_use"] == 0
+            assert stats["checkouts"] == 2
+            assert stats["timeouts"] == 1
+            assert stats["wait_seconds_max"] >= 0
+        finally:
+            await engine.dispose()
+
+    def test_non_queue_pools_report_nothing(self) -> None:
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+
+        assert pool_stats(engine.pool) == {}
+
+
+class TestWarmPool:
+    async def test_opens_connections_up_to_the_pool_size(self, tmp_path: Path) -> None:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}",
+            poolclass=InstrumentedPool,
+            pool_size=3,
+            max_overflow=5,
+        )
+        try:
+            assert await warm_pool(engine, 10) == 3
+
+            stats = pool_stats(engine.pool)
+            assert stats["idle"] == 3
+            assert stats["in_use"] == 0
+        finally:
+            await engine.dispose()
@@ -0,0 +1,135 @@
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+import pytest
+import pytest_asyncio
+from pytest import MonkeyPatch
+from sqlalchemy import exc, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.agent.enums import AgentType
+from app.agent.models import Agent
+from app.db import database
+from app.db.base import Base
+from app.db.replicas import PRIMARY_COOKIE, ReplicaSet
+from app.main import app
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestReplicaSet:
+    def test_round_robin_with_ejection(self) -> None:
+        clock = FakeClock()
+        factories: list = [None, None, None]  # never opened here
+        replicas = ReplicaSet(factories, eject_seconds=10, clock=clock)
+
+        assert [replicas.pick() for _ in range(4)] == [0, 1, 2, 0]
+
+        replicas.eject(2)
+        assert [replicas.pick() for _ in range(4)] == [1, 0, 1, 0]
+        assert replicas.healthy() == 2
+
+        clock.now = 10
+        assert sorted(replicas.pick() for _ in range(3)) == [0, 1, 2]
+
+    def test_all_ejected_means_primary(self) -> None:
+        factories: list = [None]
+        replicas = ReplicaSet(factories, eject_seconds=10, clock=FakeClock())
+        replicas.eject(0)
+
+        assert replicas.pick() is None
+        assert not ReplicaSet([])
+
+    async def test_connection_error_ejects(self, tmp_path: Path) -> None:
+        missing = tmp_path / "missing" / "r.db"
+        engine = create_async_engine(f"sqlite+aiosqlite:///{missing}")
+        replicas = ReplicaSet([async_sessionmaker(engine)], clock=FakeClock())
+
+        with pytest.raises(exc.OperationalError):
+            async with replicas.session(0) as session:
+                await session.execute(text("SELECT 1"))
+
+        assert replicas.pick() is None
+        await engine.dispose()
+
+
+async def _engine(path: Path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+class TestReadRouting:
+    """Primary + one replica as two SQLite files, through the real dependencies."""
+
+    @pytest_asyncio.fixture
+    async def client(
+        self, tmp_path: Path, monkeypatch: MonkeyPatch
+    ) -> AsyncIterator[httpx.AsyncClient]:
+        primary = await _engine(tmp_path / "primary.db")
+        replica = await _engine(tmp_path / "replica.db")
+        async with replica.begin() as conn:
+            await conn.execute(
+                insert(Agent).values(name="On replica", type=AgentType.SALES)
+            )
+
+        monkeypatch.setattr(
+            database,
+            "AsyncSessionLocal",
+            async_sessionmaker(primary, class_=AsyncSession),
+        )
+        monkeypatch.setattr(
+            database,
+            "replicas",
+            ReplicaSet([async_sessionmaker(replica, class_=AsyncSession)]),
+        )
+
+        async with httpx.AsyncClient(
+            base_url="http://test", transport=httpx.ASGITransport(app)
+        ) as client:
+            yield client
+
+        await primary.dispose()
+        await replica.dispose()
+
+    async def test_reads_go_to_replica(self, client: httpx.AsyncClient) -> None:
+        response = await client.get("/agents")
+
+        assert [a["name"] for a in response.json()] == ["On replica"]
+
+    async def test_read_your_writes(self, client: httpx.AsyncClient) -> None:
+        response = await client.post("/agents", json={"name": "New", "type": "Sales"})
+        assert response.cookies[PRIMARY_COOKIE]
+
+        response = await client.get("/agents")
+        assert [a["name"] for a in response.json()] == ["New"]
+
+        client.cookies.clear()  # cookie expired / another client
+        response = await client.get("/agents")
+        assert [a["name"] for a in response.json()] == ["On replica"]
+
+    async def test_failing_replica_is_ejected(
+        self, client: httpx.AsyncClient, tmp_path: Path, monkeypatch: MonkeyPatch
+    ) -> None:
+        gone = tmp_path / "gone" / "r.db"
+        broken = create_async_engine(f"sqlite+aiosqlite:///{gone}")
+        monkeypatch.setattr(
+            database, "replicas", ReplicaSet([async_sessionmaker(broken)])
+        )
+
+        response = await client.get("/agents")  # retried on the primary
+        assert response.status_code == 200
+        assert response.json() == []
+        assert database.replicas.healthy() == 0
+
+        response = await client.get("/agents")  # straight to the primary
+        assert response.json() == []
+        await broken.dispose()
@@ -0,0 +1,91 @@
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+import pytest
+import pytest_asyncio
+from pytest import MonkeyPatch
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.agent.cache import agent_cache
+from app.agent.services.knowledge import knowledge_cache
+from app.db import database
+from app.db.base import Base
+from app.db.pool import InstrumentedPool
+from app.db.session import lazy_session
+from app.main import app
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path: Path) -> AsyncIterator[AsyncEngine]:
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'lazy.db'}", poolclass=InstrumentedPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+def _checkouts(engine: AsyncEngine) -> int:
+    return engine.pool.stats.checkouts
+
+
+class TestLazySession:
+    async def test_unused_session_never_checks_out(self, engine: AsyncEngine):
+        before = _checkouts(engine)
+        async with lazy_session(async_sessionmaker(engine)):
+            pass
+
+        assert _checkouts(engine) == before
+
+    async def test_used_session_returns_its_connection(self, engine: AsyncEngine):
+        with pytest.raises(ZeroDivisionError):
+            async with lazy_session(async_sessionmaker(engine)) as session:
+                await session.execute(text("SELECT 1"))
+                1 / 0
+
+        assert engine.pool.checkedout() == 0
+
+
+class TestAskWithoutCheckout:
+    """`/ask` through the real session dependencies."""
+
+    @pytest_asyncio.fixture
+    async def client(
+        self, engine: AsyncEngine, monkeypatch: MonkeyPatch
+    ) -> AsyncIterator[httpx.AsyncClient]:
+        monkeypatch.setattr(
+            database,
+            "AsyncSessionLocal",
+            async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        )
+        agent_cache.clear()
+        knowledge_cache.clear()
+
+        async with httpx.AsyncClient(
+            base_url="http://test", transport=httpx.ASGITransport(app)
+        ) as client:
+            yield client
+
+    async def test_warm_agent_needs_no_connection(
+        self, client: httpx.AsyncClient, engine: AsyncEngine
+    ):
+        response = await client.post(
+            "/agents", json={"name": "Hotel Q&A Bot", "type": "Support"}
+        )
+        url = f"/agents/{response.json()['id']}/ask"
+        await client.post(url, json={"question": "warm up"})  # loads the knowledge base
+
+        before = _checkouts(engine)
+        for question in ("Parking?", "Is breakfast free?", "Pool hours?"):
+            response = await client.post(url, json={"question": question})
+            assert response.status_code == 200
+
+        assert _checkouts(engine) == before
@@ -1,24 +1,187 @@
+import asyncio
+import contextlib
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
+from app.agent.cache import agent_cache
 from app.agent.routes import router as agent_router
+from app.agent.services.answer_cache import answer_cache
+from app.agent.services.knowledge import knowledge_cache
+from app.agent.services.qa import DEFAULT_INDEX
+from app.agent.services.question_log import question_log
+from app.agent.warmup import preload_hot_questions
+from app.core.admission import Admission, AdmissionMiddleware
+from app.core.cache_control import CacheControlMiddleware
+from app.core.compression import CompressionMiddleware, available_codecs
 from app.core.config import get_settings
+from app.core.executor import matcher_executor
+from app.core.metrics import CONTENT_TYPE, Labels, TimingMiddleware, registry
+from app.db.database import AsyncSessionLocal, engine, replica_engines
+from app.db.pool import warm_pool
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Cache-Control by route; the agent reads revalidate cheaply through ETags
+CACHE_CONTROL = {
+    "GET /agents": "private, no-cache",
+    "GET /agents/{agent_id}": "private, no-cache",
+    "GET /agents/export": "no-store",
+    "GET /health": "no-store",
+    "GET /metrics": "no-store",
+    "GET /ready": "no-store",
+}
+
+# Load shedding for the CPU-heavy and scanning routes (see the ADMISSION_* and
+# RATE_LIMIT* settings)
+admission = Admission.from_settings(settings)
+
+_CACHES = {"agent": agent_cache, "knowledge": knowledge_cache, "answer": answer_cache}
+
+
+def _cache_gauges() -> dict[Labels, float]:
+    return {
+        (name, stat): value
+        for name, cache in _CACHES.items()
+        for stat, value in cache.stats().items()
+    }
+
+
+registry.gauge(
+    "cache",
+    "In-process cache size and hit/miss counts.",
+    ("cache", "stat"),
+    _cache_gauges,
+)
+
+
+registry.gauge(
+    "question_log",
+    "Write-behind question log: buffered, written, dropped and failed rows.",
+    ("stat",),
+    lambda: {(stat,): value for stat, value in vars(question_log.stats).items()},
+)
 
+registry.gauge(
+    "admission",
+    "Adaptive concurrency limit and requests in flight per route.",
+    ("route", "stat"),
+    lambda: {
+        (route, stat): value
+        for route, limit in admission.limits.items()
+        for stat, value in (("limit", limit.limit), ("in_flight", limit.in_flight))
+    },
+)
+
+_startup = {"ready": 0.0, "warmup_seconds": 0.0}
+
+registry.gauge(
+    "startup",
+    "Whether the start-up warm-up has finished, and how long it took.",
+    ("stat",),
+    lambda: {(stat,): value for stat, value in _startup.items()},
+)
 
-app = FastAPI(title=settings.app_name)
+
+async def _warm_up(app: FastAPI) -> None:
+    """Everything `/ready` waits for (see the WARMUP_* settings)."""
+    start = time.perf_counter()
+    DEFAULT_INDEX.warm()
+    await matcher_executor.warm(DEFAULT_INDEX.match, "check-in")
+
+    connections = settings.warmup_pool_connections
+    while True:  # not ready to serve until the primary is reachable
+        try:
+            await warm_pool(engine, connections)
+            break
+        except Exception:
+            logger.exception(
+                "Warm-up: primary database unreachable, retrying in %ss",
+                settings.warmup_retry_seconds,
+            )
+            await asyncio.sleep(settings.warmup_retry_seconds)
+    for replica_engine in replica_engines:  # reads fall back to the primary
+        with contextlib.suppress(Exception):
+            await warm_pool(replica_engine, connections)
+
+    if settings.warmup_hot_questions > 0:
+        window = timedelta(hours=settings.warmup_hot_window_hours)
+        with contextlib.suppress(Exception):  # an optimisation only
+            await preload_hot_questions(
+                AsyncSessionLocal,
+                since=datetime.now(timezone.utc) - window,
+                limit=settings.warmup_hot_questions,
+            )
+
+    _startup.update(ready=1.0, warmup_seconds=time.perf_counter() - start)
+    app.state.ready = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # /health answers from the start; /ready once the warm-up has run
+    app.state.ready = False
+    question_log.start()
+    warm_up = asyncio.create_task(_warm_up(app))
+    yield
+    app.state.ready = False  # draining
+    warm_up.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await warm_up
+    await question_log.stop()
+    matcher_executor.shutdown()
+
+
+app = FastAPI(
+    title=settings.app_name, lifespan=lifespan, default_response_class=ORJSONResponse
+)
 
 app.include_router(agent_router)
+app.add_middleware(CacheControlMiddleware, policies=CACHE_CONTROL)
+app.add_middleware(
+    CompressionMiddleware,
+    codecs=available_codecs(
+        settings.compression_codings,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        zstd_level=settings.compression_zstd_level,
+    ),
+    minimum_size=settings.compression_min_size,
+)
+app.add_middleware(AdmissionMiddleware, admission=admission)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+if settings.metrics_enabled:
+    app.add_middleware(TimingMiddleware)
 
 
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def ready() -> ORJSONResponse:
+    """Readiness probe: 503 until the start-up warm-up has finished."""
+    if not getattr(app.state, "ready", False):
+        return ORJSONResponse({"status": "starting"}, status_code=503)
+    return ORJSONResponse({"status": "ready"})
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Prometheus scrape target; counters are per worker process."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
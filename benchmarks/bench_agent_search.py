@@ -0,0 +1,118 @@
+"""
+`GET /agents?q=` search latency with and without the pg_trgm GIN indexes.
+
+Seeds the `agents` table of a migrated Postgres database up to `--rows`
+agents (1M by default, via COPY), then times the list query for a few
+search terms twice: as planned (trigram bitmap index scans) and with
+index scans disabled, which is what the plain `ILIKE '%term%'` got before.
+
+Usage:
+    alembic upgrade head
+    python -m benchmarks.bench_agent_search [--rows 1000000] [--dsn postgresql://...]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+import asyncpg
+
+from app.core.config import get_settings
+
+_WORDS = [
+    "alpha", "beta", "gamma", "delta", "hotel", "concierge", "booking", "sales",
+    "support", "marketing", "lead", "upsell", "spa", "parking", "breakfast",
+    "chalet", "arosa", "summit", "glacier", "lounge", "pilot", "nova", "orbit",
+]  # fmt: skip
+_TYPES = ["SALES", "SUPPORT", "MARKETING"]
+_STATUSES = ["ACTIVE", "INACTIVE"]
+
+_QUERY = """
+    SELECT id, name, type, status, description
+    FROM agents
+    WHERE name ILIKE $1 OR description ILIKE $1
+    ORDER BY greatest(
+        word_similarity($2, name), word_similarity($2, coalesce(description, ''))
+    ) DESC, name, id
+    LIMIT 50
+"""
+
+
+def _records(count: int, rnd: random.Random):
+    for _ in range(count):
+        words = rnd.sample(_WORDS, 3)
+        yield (
+            uuid.uuid4(),
+            f"{words[0].title()} {words[1].title()} {rnd.randrange(10**6)}",
+            rnd.choice(_TYPES),
+            rnd.choice(_STATUSES),
+            f"{' '.join(rnd.sample(_WORDS, 6))} #{rnd.randrange(10**9):x}",
+        )
+
+
+async def _seed(conn: asyncpg.Connection, rows: int, batch: int = 50_000) -> None:
+    existing = await conn.fetchval("SELECT count(*) FROM agents")
+    rnd = random.Random(7)
+    missing = rows - existing
+    while missing > 0:
+        chunk = min(batch, missing)
+        await conn.copy_records_to_table(
+            "agents",
+            records=list(_records(chunk, rnd)),
+            columns=["id", "name", "type", "status", "description"],
+        )
+        missing -= chunk
+        print(f"  seeded {rows - missing:,}/{rows:,}", end="\r")
+    await conn.execute("ANALYZE agents")
+
+
+async def _time(conn: asyncpg.Connection, term: str, repeat: int) -> tuple[float, str]:
+    pattern = f"%{term.lower()}%"
+    plan: str = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {_QUERY}", pattern, term)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await conn.fetch(_QUERY, pattern, term)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    scan = "index" if "Index Scan" in plan else "seq"
+    return statistics.median(samples), scan
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dsn", default=get_settings().database_url_sync)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--terms", nargs="+", default=["concierge", "glacier lo", "4711"]
+    )
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        print(f"seeding agents up to {args.rows:,} rows ...")
+        await _seed(conn, args.rows)
+
+        print(f"\n{'term':>14} | {'trigram GIN':>18} | {'seq scan':>18}")
+        for term in args.terms:
+            indexed_ms, indexed_scan = await _time(conn, term, args.repeat)
+            async with conn.transaction():
+                await conn.execute("SET LOCAL enable_bitmapscan = off")
+                await conn.execute("SET LOCAL enable_indexscan = off")
+                seq_ms, seq_scan = await _time(conn, term, args.repeat)
+
+            print(
+                f"{term:>14} | {indexed_ms:9.1f} ms ({indexed_scan:>5}) "
+                f"| {seq_ms:9.1f} ms ({seq_scan:>5})"
+            )
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Agent creation throughput: `POST /agents` once per agent vs `POST /agents:bulk`.
+
+Drives the ASGI app in-process (no network), so the numbers are the
+request handling + database cost per agent. Runs against the configured
+Postgres database by default (run `alembic upgrade head` first); the rows
+it creates are deleted afterwards. `--sqlite` uses a throwaway SQLite
+file instead.
+
+Usage:
+    python -m benchmarks.bench_bulk_insert [--rows 20000] [--single-rows 2000] [--sqlite]
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.agent.models import Agent
+from app.core.config import get_settings
+from app.db.base import Base
+from app.db.database import get_db
+from app.main import app
+
+_TAG = "bench-bulk"
+
+
+def _agents(count: int) -> list[dict]:
+    return [
+        {"name": f"Bench {i}", "type": "Sales", "description": _TAG}
+        for i in range(count)
+    ]
+
+
+async def _single(client: httpx.AsyncClient, agents: list[dict]) -> float:
+    start = time.perf_counter()
+    for agent in agents:
+        (await client.post("/agents", json=agent)).raise_for_status()
+    return time.perf_counter() - start
+
+
+async def _bulk_json(client: httpx.AsyncClient, agents: list[dict]) -> float:
+    start = time.perf_counter()
+    (await client.post("/agents:bulk", json=agents)).raise_for_status()
+    return time.perf_counter() - start
+
+
+async def _bulk_ndjson(client: httpx.AsyncClient, agents: list[dict]) -> float:
+    body = "".join(json.dumps(a) + "\n" for a in agents).encode()
+    start = time.perf_counter()
+    response = await client.post(
+        "/agents:bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--single-rows", type=int, default=2_000)
+    parser.add_argument("--sqlite", action="store_true")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        path = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    else:
+        engine = create_async_engine(get_settings().database_url)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _get_db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _get_db
+    transport = httpx.ASGITransport(app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            print(f"{'path':>16} | {'rows':>7} | {'seconds':>8} | {'rows/s':>9}")
+            for label, fn, rows in [
+                ("POST /agents", _single, args.single_rows),
+                ("bulk JSON", _bulk_json, args.rows),
+                ("bulk NDJSON", _bulk_ndjson, args.rows),
+            ]:
+                seconds = await fn(client, _agents(rows))
+                print(
+                    f"{label:>16} | {rows:>7} | {seconds:8.2f} | {rows / seconds:9,.0f}"
+                )
+    finally:
+        app.dependency_overrides.clear()
+        async with engine.begin() as conn:
+            await conn.execute(delete(Agent).where(Agent.description == _TAG))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Questions answered per second by one worker: `POST /ask` vs `WS /chat`.
+
+Both run in-process against the ASGI app (no network) on a throwaway
+SQLite database, so the difference is the per-message cost of each path:
+HTTP parsing, validation, a session and the agent lookup per request,
+versus one JSON frame on an already authorised connection. The WebSocket
+client keeps `--window` questions in flight (pipelining).
+
+Usage:
+    python -m benchmarks.bench_chat [--messages 5000] [--window 1 8 32]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.enums import AgentType
+from app.agent.models import Agent
+from app.db.database import get_db, get_read_db, get_read_session_factory
+from app.main import admission, app
+from benchmarks.load_test import _QUESTIONS, _TAG, _database
+
+
+async def _http(agent_id: str, messages: int) -> float:
+    transport = httpx.ASGITransport(app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        start = time.perf_counter()
+        for i in range(messages):
+            question = {"question": _QUESTIONS[i % len(_QUESTIONS)]}
+            response = await c.post(f"/agents/{agent_id}/ask", json=question)
+            response.raise_for_status()
+        return messages / (time.perf_counter() - start)
+
+
+async def _websocket(agent_id: str, messages: int, window: int) -> float:
+    path = f"/agents/{agent_id}/chat"
+    inbox: asyncio.Queue[dict] = asyncio.Queue()
+    outbox: asyncio.Queue[dict] = asyncio.Queue()
+    scope = {
+        "type": "websocket",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "subprotocols": [],
+    }
+    inbox.put_nowait({"type": "websocket.connect"})
+    server = asyncio.create_task(app(scope, inbox.get, outbox.put))
+    assert (await outbox.get())["type"] == "websocket.accept"
+
+    def frame(i: int) -> dict:
+        text = json.dumps({"id": i, "question": _QUESTIONS[i % len(_QUESTIONS)]})
+        return {"type": "websocket.receive", "text": text}
+
+    start = time.perf_counter()
+    sent = 0
+    for _ in range(min(window, messages)):
+        inbox.put_nowait(frame(sent))
+        sent += 1
+    for _ in range(messages):
+        assert "answer" in json.loads((await outbox.get())["text"])
+        if sent < messages:
+            inbox.put_nowait(frame(sent))
+            sent += 1
+    rate = messages / (time.perf_counter() - start)
+
+    inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+    await server
+    return rate
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--window", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    async with _database(postgres=False) as sessions:
+        async with sessions() as db:
+            agent = Agent(
+                name="Hotel Q&A Bot", type=AgentType.SUPPORT, description=_TAG
+            )
+            db.add(agent)
+            await db.commit()
+            agent_id = str(agent.id)
+
+        async def _get_db():
+            async with sessions() as session:
+                yield session
+
+        @asynccontextmanager
+        async def _session() -> AsyncIterator[AsyncSession]:
+            async with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = _get_db
+        app.dependency_overrides[get_read_db] = _get_db
+        app.dependency_overrides[get_read_session_factory] = lambda: _session
+        admission.enabled = False  # one client well past its rate limits
+        try:
+            http = await _http(agent_id, args.messages)
+            print(f"{'path':>18} | {'msg/s':>8} | vs HTTP")
+            print(f"{'POST /ask':>18} | {http:8,.0f} | {1:6.1f}x")
+            for window in args.window:
+                ws = await _websocket(agent_id, args.messages, window)
+                label = f"WS /chat (w={window})"
+                print(f"{label:>18} | {ws:8,.0f} | {ws / http:6.1f}x")
+        finally:
+            app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Payload size and CPU cost per compression codec and level.
+
+Encodes a `GET /agents` page the way the route does (orjson over the
+column values) and compresses it once per codec/level, the same way
+`CompressionMiddleware` does for a complete body. brotli and zstd rows are
+skipped when the modules are not installed.
+
+Usage:
+    python -m benchmarks.bench_compression [--agents 1000] [--seconds 0.5]
+"""
+
+import argparse
+import time
+import uuid
+from typing import Callable
+
+import orjson
+
+from app.agent.enums import AgentStatus, AgentType
+from app.core.compression import available_codecs
+
+LEVELS = {
+    "gzip": [1, 6, 9],
+    "br": [1, 4, 6, 11],
+    "zstd": [1, 3, 9, 19],
+}
+
+
+def _rate(fn: Callable[[], bytes], size: int, seconds: float) -> float:
+    """Input MB compressed per CPU second."""
+    done, deadline = 0, time.process_time() + seconds
+    start = time.process_time()
+    while time.process_time() < deadline:
+        fn()
+        done += size
+    return done / (time.process_time() - start) / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    payload = orjson.dumps(
+        [
+            {
+                "id": uuid.uuid4(),
+                "name": f"Agent {i:05d}",
+                "type": AgentType.SALES,
+                "status": AgentStatus.ACTIVE,
+                "description": "Handles enterprise leads in the DACH region",
+                "version": 1,
+            }
+            for i in range(args.agents)
+        ]
+    )
+    print(f"GET /agents page of {args.agents}: {len(payload)} bytes uncompressed\n")
+    print(
+        f"{'codec':>6} | {'level':>5} | {'bytes':>9} | {'ratio':>6} | {'MB/s CPU':>8}"
+    )
+
+    for name, levels in LEVELS.items():
+        for level in levels:
+            codecs = available_codecs(
+                (name,), gzip_level=level, brotli_quality=level, zstd_level=level
+            )
+            if not codecs:
+                print(f"{name:>6} | {'-':>5} | not installed")
+                break
+
+            def compress(codec=codecs[0]) -> bytes:
+                stream = codec.stream()
+                return stream.compress(payload) + stream.finish()
+
+            size = len(compress())
+            rate = _rate(compress, len(payload), args.seconds)
+            ratio = len(payload) / size
+            print(f"{name:>6} | {level:5d} | {size:9d} | {ratio:5.1f}x | {rate:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
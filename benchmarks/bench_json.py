@@ -0,0 +1,94 @@
+"""
+Response encoding throughput: FastAPI's default path vs the direct one.
+
+"before" is what FastAPI does for a `response_model` route: validate the
+return value against the model, `jsonable_encoder` it and `json.dumps`.
+"after" is what the routes do now: `orjson` over the column values for
+agent lists, and a dict lookup of pre-encoded bytes for built-in answers.
+
+Usage:
+    python -m benchmarks.bench_json [--agents 1000] [--seconds 1]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+import orjson
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.agent.crud import AGENT_FIELDS
+from app.agent.enums import AgentStatus, AgentType
+from app.agent.models import Agent
+from app.agent.routes import _ANSWER_PAYLOADS
+from app.agent.schemas import AgentRead, AskQuestionResponse
+from app.agent.services.qa import BUILTIN_ANSWERS
+
+
+def _json_dumps(content: Any) -> bytes:  # starlette's JSONResponse.render
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode()
+
+
+async def _throughput(fn: Callable[[], Awaitable[bytes]], seconds: float) -> float:
+    """Encoded bytes per second."""
+    encoded, deadline = 0, time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        encoded += len(await fn())
+    return encoded / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    agents = [
+        Agent(
+            id=uuid.uuid4(),
+            name=f"Agent {i:05d}",
+            type=AgentType.SALES,
+            status=AgentStatus.ACTIVE,
+            description="Handles enterprise leads in the DACH region",
+        )
+        for i in range(args.agents)
+    ]
+    rows = [{f: getattr(a, f) for f in AGENT_FIELDS} for a in agents]
+    list_field = create_response_field("list_agents", list[AgentRead])
+    ask_field = create_response_field("ask", AskQuestionResponse)
+    answer = BUILTIN_ANSWERS[0]
+
+    async def list_before() -> bytes:
+        content = await serialize_response(field=list_field, response_content=agents)
+        return _json_dumps(content)
+
+    async def list_after() -> bytes:
+        return orjson.dumps([{f: row[f] for f in AGENT_FIELDS} for row in rows])
+
+    async def ask_before() -> bytes:
+        response = AskQuestionResponse(answer=answer)
+        content = await serialize_response(field=ask_field, response_content=response)
+        return _json_dumps(content)
+
+    async def ask_after() -> bytes:
+        return _ANSWER_PAYLOADS.get(answer) or orjson.dumps({"answer": answer})
+
+    print(f"{'payload':>22} | {'before MB/s':>11} | {'after MB/s':>10} | speed-up")
+    for label, before, after in [
+        (f"GET /agents ({args.agents})", list_before, list_after),
+        ("POST /ask (built-in)", ask_before, ask_after),
+    ]:
+        b = await _throughput(before, args.seconds) / 1e6
+        a = await _throughput(after, args.seconds) / 1e6
+        print(f"{label:>22} | {b:11.1f} | {a:10.1f} | {a / b:6.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
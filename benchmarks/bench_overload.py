@@ -0,0 +1,134 @@
+"""
+Goodput of `POST /ask` past saturation, with and without admission control.
+
+Measures the worker's capacity with a closed loop first, then offers
+open-loop arrivals (requests start on schedule whether or not earlier
+ones have finished, like independent users) at multiples of it. Goodput
+counts the answers that arrived within `--deadline`; rejected requests
+(503 / 429) are quick but not good. Without load shedding every request
+queues behind the others, so past capacity latency grows with the queue
+and goodput collapses; with the adaptive limit it should stay near
+capacity. In-process against a throwaway SQLite database; per-client
+rate limits are off (one load generator stands in for many clients).
+
+Usage:
+    python -m benchmarks.bench_overload [--seconds 3] [--load 0.5 1 2 4]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent.enums import AgentType
+from app.agent.models import Agent
+from app.db.database import get_db, get_read_db, get_read_session_factory
+from app.main import admission, app
+from benchmarks.load_test import _QUESTIONS, _TAG, _database
+
+
+async def _capacity(client: httpx.AsyncClient, url: str, seconds: float) -> float:
+    done = 0
+    end = time.perf_counter() + seconds
+
+    async def loop(i: int) -> None:
+        nonlocal done
+        while time.perf_counter() < end:
+            question = {"question": _QUESTIONS[i % len(_QUESTIONS)]}
+            (await client.post(url, json=question)).raise_for_status()
+            done += 1
+            i += 1
+
+    await asyncio.gather(*(loop(i) for i in range(16)))
+    return done / seconds
+
+
+async def _offer(
+    client: httpx.AsyncClient, url: str, rate: float, seconds: float, deadline: float
+) -> dict[str, float]:
+    async def one(i: int) -> tuple[int, float]:
+        start = time.perf_counter()
+        question = {"question": _QUESTIONS[i % len(_QUESTIONS)]}
+        response = await client.post(url, json=question)
+        return response.status_code, time.perf_counter() - start
+
+    tasks = []
+    start = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        # schedule against the clock so slow iterations don't lower the rate
+        await asyncio.sleep(max(0.0, start + i / rate - time.perf_counter()))
+        tasks.append(asyncio.create_task(one(i)))
+    results = await asyncio.gather(*tasks)
+
+    ok = sorted(latency for status, latency in results if status == 200)
+    return {
+        "goodput": sum(latency <= deadline for latency in ok) / seconds,
+        "shed": sum(status in (429, 503) for status, _ in results) / len(results),
+        "p99_ms": (statistics.quantiles(ok, n=100)[98] if len(ok) > 1 else 0) * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=3.0, help="per load level")
+    parser.add_argument("--load", type=float, nargs="+", default=[0.5, 1, 2, 4])
+    parser.add_argument("--deadline", type=float, default=0.25, help="seconds")
+    args = parser.parse_args()
+
+    async with _database(postgres=False) as sessions:
+        async with sessions() as db:
+            agent = Agent(
+                name="Hotel Q&A Bot", type=AgentType.SUPPORT, description=_TAG
+            )
+            db.add(agent)
+            await db.commit()
+            url = f"/agents/{agent.id}/ask"
+
+        async def _get_db():
+            async with sessions() as session:
+                yield session
+
+        @asynccontextmanager
+        async def _session() -> AsyncIterator[AsyncSession]:
+            async with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = _get_db
+        app.dependency_overrides[get_read_db] = _get_db
+        app.dependency_overrides[get_read_session_factory] = lambda: _session
+        admission.rates = {}
+        transport = httpx.ASGITransport(app)
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", timeout=None
+            ) as client:
+                admission.enabled = False
+                capacity = await _capacity(client, url, args.seconds)
+                print(f"capacity {capacity:,.0f} req/s, deadline {args.deadline}s")
+                print(
+                    f"{'offered':>8} | {'admission':>9} | {'goodput/s':>9} | "
+                    f"{'shed':>5} | {'p99 ms':>8}"
+                )
+                for load in args.load:
+                    for enabled in (False, True):
+                        admission.enabled = enabled
+                        admission.reset()
+                        r = await _offer(
+                            client, url, load * capacity, args.seconds, args.deadline
+                        )
+                        print(
+                            f"{load:7.1f}x | {'on' if enabled else 'off':>9} | "
+                            f"{r['goodput']:9,.0f} | {r['shed']:5.0%} | "
+                            f"{r['p99_ms']:8.1f}"
+                        )
+        finally:
+            app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Latency of the Q&A matcher versus knowledge-base size.
+
+Compares the naive linear `SequenceMatcher` scan with `QAIndex`
+(Aho-Corasick substring pass + BM25 shortlist for the fuzzy pass) on
+synthetic knowledge bases.
+
+Usage:
+    python -m benchmarks.bench_retrieval [--sizes 100 10000 100000] [--queries 50]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable
+
+from app.agent.services.qa import _FALLBACK, QAIndex, _norm, _ratio
+
+_SYLLABLES = [
+    "ka", "lo", "mi", "ne", "ro", "su", "ta", "vi", "ze", "pa",
+    "do", "gu", "he", "ji", "bo", "fa", "ri", "se", "tu", "wy",
+]  # fmt: skip
+
+
+def _word(rnd: random.Random) -> str:
+    return "".join(rnd.choice(_SYLLABLES) for _ in range(rnd.randint(2, 4)))
+
+
+def _knowledge_base(size: int, rnd: random.Random) -> dict[str, str]:
+    pairs: dict[str, str] = {}
+    while len(pairs) < size:
+        key = " ".join(_word(rnd) for _ in range(rnd.randint(1, 3)))
+        pairs[key] = f"Answer #{len(pairs)}"
+    return pairs
+
+
+def _typo(word: str, rnd: random.Random) -> str:
+    pos = rnd.randrange(len(word))
+    return word[:pos] + word[pos + 1 :]
+
+
+def _questions(pairs: dict[str, str], count: int, rnd: random.Random) -> list[str]:
+    keys = list(pairs)
+    questions = []
+    for i in range(count):
+        key = rnd.choice(keys)
+        if i % 2:
+            questions.append(f"{_typo(key, rnd)}?")
+        else:
+            questions.append(f"do you have {key}?")
+    return questions
+
+
+def _naive(pairs: dict[str, str]) -> Callable[[str], str]:
+    def answer(question: str) -> str:
+        q_norm = _norm(question)
+        for k, v in pairs.items():
+            k_norm = _norm(k)
+            if k_norm in q_norm or q_norm in k_norm:
+                return v
+        best_key = max(pairs, key=lambda k: _ratio(q_norm, _norm(k)))
+        if _ratio(q_norm, _norm(best_key)) >= 0.56:
+            return pairs[best_key]
+        return _FALLBACK
+
+    return answer
+
+
+def _latencies_ms(fn: Callable[[str], str], questions: list[str]) -> list[float]:
+    samples = []
+    for question in questions:
+        start = time.perf_counter()
+        fn(question)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _row(label: str, samples: list[float]) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return (
+        f"{label:>10} | p50 {statistics.median(samples):10.3f} ms | p95 {p95:10.3f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument(
+        "--naive-max",
+        type=int,
+        default=10_000,
+        help="skip the naive scan above this size (it takes seconds per query)",
+    )
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    for size in args.sizes:
+        pairs = _knowledge_base(size, rnd)
+        questions = _questions(pairs, args.queries, rnd)
+
+        start = time.perf_counter()
+        index = QAIndex(pairs)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n== {size} entries (index build {build_ms:.0f} ms)")
+        print(_row("QAIndex", _latencies_ms(index.answer, questions)))
+        if size <= args.naive_max:
+            print(_row("naive", _latencies_ms(_naive(pairs), questions)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Memory and latency of one large knowledge base at 1, 4 and 16 workers:
+a private `QAIndex` compiled in every worker versus one index file that
+all workers memory-map (`KB_INDEX_DIR`).
+
+Each worker is a fresh process (spawned, so nothing is inherited
+copy-on-write). Once every worker holds its index, each reports its RSS,
+PSS (shared pages split between the processes mapping them) and private
+memory from /proc/self/smaps_rollup, then times `match()` on the same
+questions. Total PSS is what the workers really cost the host together.
+Linux only.
+
+Usage:
+    python -m benchmarks.bench_shared_index [--keys 100000] [--workers 1 4 16]
+"""
+
+import argparse
+import multiprocessing
+import random
+import statistics
+import tempfile
+import time
+from multiprocessing.queues import Queue
+from multiprocessing.synchronize import Barrier
+from pathlib import Path
+
+from app.agent.services.index_file import open_index, write_index
+from app.agent.services.qa import QAIndex
+from benchmarks.bench_retrieval import _knowledge_base, _questions
+
+
+def _memory_kb() -> dict[str, int]:
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[name] = int(value.split()[0])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def _worker(
+    mode: str,
+    keys: int,
+    path: str,
+    questions: list[str],
+    ready: Barrier,
+    results: Queue,
+) -> None:
+    if mode == "private":
+        index = QAIndex(_knowledge_base(keys, random.Random(42)))
+    else:
+        index, _ = open_index(Path(path))
+    for question in questions:  # warm: page in the mapping, build matchers
+        index.match(question)
+
+    ready.wait()  # every worker holds its index: PSS splits the shared pages
+    memory = _memory_kb()
+    ready.wait()
+
+    latencies = []
+    for question in questions:
+        start = time.perf_counter()
+        index.match(question)
+        latencies.append(time.perf_counter() - start)
+    results.put((memory, latencies))
+
+
+def _run(
+    mode: str, workers: int, keys: int, path: str, questions: list[str]
+) -> dict[str, float]:
+    ctx = multiprocessing.get_context("spawn")
+    ready, results = ctx.Barrier(workers), ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(mode, keys, path, questions, ready, results))
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    reports = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    latencies = sorted(lat for _, lats in reports for lat in lats)
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "pss_mb": sum(m["pss"] for m, _ in reports) / 1024,
+        "rss_mb": statistics.mean(m["rss"] for m, _ in reports) / 1024,
+        "private_mb": statistics.mean(m["private"] for m, _ in reports) / 1024,
+        "p50_us": percentiles[49] * 1e6,
+        "p99_us": percentiles[98] * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--questions", type=int, default=500)
+    args = parser.parse_args()
+
+    pairs = _knowledge_base(args.keys, random.Random(42))
+    questions = _questions(pairs, args.questions, random.Random(7))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "kb.qaix")
+        write_index(QAIndex(pairs), Path(path), generation=1)
+        del pairs
+        size_mb = Path(path).stat().st_size / 2**20
+        print(f"{args.keys:,} keys, index file {size_mb:.1f} MB")
+        print(
+            f"{'mode':>8} | {'workers':>7} | {'total PSS MB':>12} | "
+            f"{'RSS MB/worker':>13} | {'private MB/worker':>17} | "
+            f"{'p50 us':>7} | {'p99 us':>7}"
+        )
+        for workers in args.workers:
+            for mode in ("private", "mapped"):
+                r = _run(mode, workers, args.keys, path, questions)
+                print(
+                    f"{mode:>8} | {workers:>7} | {r['pss_mb']:12.1f} | "
+                    f"{r['rss_mb']:13.1f} | {r['private_mb']:17.1f} | "
+                    f"{r['p50_us']:7.1f} | {r['p99_us']:7.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
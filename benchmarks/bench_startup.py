@@ -0,0 +1,114 @@
+"""
+Cold start to ready: a fresh interpreter imports `app.main`, runs the
+lifespan and waits until `/ready` would answer 200.
+
+Each run is a new process (nothing cached in memory), timed from spawn to
+ready and split into interpreter start, `import app.main` and the warm-up.
+The warm-up opens pooled connections to the configured Postgres database
+and preloads hot questions from its question log; `--no-db` skips both to
+time the import and matcher / executor warm-up alone. `--imports N` also
+lists the N slowest top-level imports (`python -X importtime`), to audit
+what the start-up path pulls in.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--no-db] [--imports 15]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+_CHILD = """
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def main():
+    async with app.router.lifespan_context(app):
+        while not app.state.ready:
+            await asyncio.sleep(0.001)
+        ready = time.perf_counter()
+        phases = {"import": imported - start, "warmup": ready - imported}
+        print(json.dumps(phases), flush=True)
+
+asyncio.run(main())
+"""
+
+
+def _run(env: dict[str, str]) -> tuple[float, dict[str, float]]:
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", _CHILD],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    line = proc.stdout.readline()  # printed once ready, before shutdown
+    total = time.perf_counter() - start
+    _, stderr = proc.communicate()
+    if proc.returncode or not line:
+        sys.exit(f"child failed:\n{stderr}")
+    return total, json.loads(line)
+
+
+def _slowest_imports(env: dict[str, str], n: int) -> list[tuple[int, str]]:
+    """Top-level (not nested) imports by cumulative microseconds."""
+    child = [sys.executable, "-X", "importtime", "-c", "import app.main"]
+    importtime = subprocess.run(child, capture_output=True, text=True, env=env)
+    found = []
+    for line in importtime.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not name.startswith("  "):  # nested imports are indented further
+            found.append((int(cumulative), name.strip()))
+    return sorted(found, reverse=True)[:n]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-db", action="store_true", help="skip DB warm-up steps")
+    parser.add_argument("--imports", type=int, default=0, help="list the N slowest")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.no_db:
+        env.update(
+            WARMUP_POOL_CONNECTIONS="0",
+            WARMUP_HOT_QUESTIONS="0",
+            QUESTION_LOG_ENABLED="false",
+        )
+
+    totals, phases = [], []
+    for _ in range(args.runs):
+        total, phase = _run(env)
+        totals.append(total)
+        phases.append(phase)
+
+    def median_ms(values: list[float]) -> float:
+        return statistics.median(values) * 1000
+
+    imports = median_ms([p["import"] for p in phases])
+    warmup = median_ms([p["warmup"] for p in phases])
+    total = median_ms(totals)
+    print(f"median of {args.runs} runs")
+    print(f"{'interpreter start':>18} | {total - imports - warmup:8.1f} ms")
+    print(f"{'import app.main':>18} | {imports:8.1f} ms")
+    print(f"{'warm-up':>18} | {warmup:8.1f} ms")
+    print(f"{'spawn to ready':>18} | {total:8.1f} ms")
+
+    if args.imports:
+        print("\nslowest top-level imports (cumulative)")
+        for micros, name in _slowest_imports(env, args.imports):
+            print(f"{micros / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
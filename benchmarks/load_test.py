@@ -0,0 +1,219 @@
+"""
+In-process load test: throughput and p50/p95/p99 for the main endpoints.
+
+Drives the ASGI app through `httpx.ASGITransport` (no network, like the
+test client) with `--concurrency` concurrent clients, against a throwaway
+SQLite file by default or the configured Postgres database with
+`--postgres` (run `alembic upgrade head` first; the rows it creates are
+deleted afterwards).
+
+Results can be saved as a JSON baseline and later runs compared against
+it; a scenario regresses when its p95 grows or its throughput drops by
+more than `--tolerance`, and the run then exits non-zero. Baselines are
+machine specific: record one per machine / CI runner.
+
+Usage:
+    python -m benchmarks.load_test [--requests 2000] [--concurrency 16] [--postgres]
+    python -m benchmarks.load_test --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load_test --baseline benchmarks/baseline.json [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.agent.enums import AgentType
+from app.agent.models import Agent
+from app.core.config import get_settings
+from app.db.base import Base
+from app.db.database import get_db, get_read_db, get_read_session_factory
+from app.main import admission, app
+
+_TAG = "bench-load"
+_QUESTIONS = [
+    "Parking?",
+    "What time is check-in?",
+    "cheeckout",
+    "Can I bring my dog?",
+    "Is breakfast included in the price?",
+    "Do you have a sauna?",
+]
+
+Request = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+
+def _scenarios(agent_ids: list[str], bot_id: str) -> dict[str, Request]:
+    async def list_agents(client: httpx.AsyncClient, rnd: random.Random):
+        return await client.get("/agents", params={"limit": 50})
+
+    async def get_agent(client: httpx.AsyncClient, rnd: random.Random):
+        return await client.get(f"/agents/{rnd.choice(agent_ids)}")
+
+    async def create_agent(client: httpx.AsyncClient, rnd: random.Random):
+        agent = {"name": f"Load {rnd.random()}", "type": "Sales", "description": _TAG}
+        return await client.post("/agents", json=agent)
+
+    async def ask(client: httpx.AsyncClient, rnd: random.Random):
+        question = {"question": rnd.choice(_QUESTIONS)}
+        return await client.post(f"/agents/{bot_id}/ask", json=question)
+
+    return {
+        "GET /agents": list_agents,
+        "GET /agents/{id}": get_agent,
+        "POST /agents": create_agent,
+        "POST /agents/{id}/ask": ask,
+    }
+
+
+async def _run(
+    client: httpx.AsyncClient, request: Request, total: int, concurrency: int
+) -> dict[str, float]:
+    latencies: list[float] = []
+    remaining = iter(range(total))
+
+    async def worker(seed: int) -> None:
+        rnd = random.Random(seed)
+        for _ in remaining:
+            start = time.perf_counter()
+            (await request(client, rnd)).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    p50, p95, p99 = (percentiles[p - 1] for p in (50, 95, 99))
+    return {
+        "rps": total / elapsed,
+        "p50_ms": p50 * 1000,
+        "p95_ms": p95 * 1000,
+        "p99_ms": p99 * 1000,
+    }
+
+
+def _regressions(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    found = []
+    for name, now in results.items():
+        then = baseline.get(name)
+        if then is None:
+            continue
+        if now["p95_ms"] > then["p95_ms"] * (1 + tolerance):
+            found.append(f"{name}: p95 {then['p95_ms']:.2f} -> {now['p95_ms']:.2f} ms")
+        if now["rps"] < then["rps"] * (1 - tolerance):
+            found.append(f"{name}: {then['rps']:,.0f} -> {now['rps']:,.0f} req/s")
+    return found
+
+
+@asynccontextmanager
+async def _database(postgres: bool) -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    path = None
+    if postgres:
+        engine = create_async_engine(get_settings().database_url)
+    else:
+        path = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(delete(Agent).where(Agent.description == _TAG))
+        await engine.dispose()
+        if path is not None:
+            os.unlink(path)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--agents", type=int, default=1000, help="rows seeded first")
+    parser.add_argument("--postgres", action="store_true")
+    parser.add_argument("--baseline", type=Path, help="compare against this JSON")
+    parser.add_argument("--save-baseline", type=Path, help="write results as JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    async with _database(args.postgres) as sessions:
+        names = [f"Load {i:05d}" for i in range(args.agents)] + ["Hotel Q&A Bot"]
+        seed = [
+            {"id": uuid.uuid4(), "name": name, "type": AgentType.SUPPORT}
+            for name in names
+        ]
+        async with sessions() as db:
+            await db.execute(insert(Agent), [{**r, "description": _TAG} for r in seed])
+            await db.commit()
+        *agent_ids, bot_id = [str(row["id"]) for row in seed]
+
+        async def _get_db():
+            async with sessions() as session:
+                yield session
+
+        @asynccontextmanager
+        async def _session() -> AsyncIterator[AsyncSession]:
+            async with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = _get_db
+        app.dependency_overrides[get_read_db] = _get_db
+        app.dependency_overrides[get_read_session_factory] = lambda: _session
+        admission.enabled = False  # one client well past its rate limits
+
+        results: dict[str, dict[str, float]] = {}
+        transport = httpx.ASGITransport(app)
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://load"
+            ) as client:
+                print(
+                    f"{'scenario':>22} | {'req/s':>8} | "
+                    f"{'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7}"
+                )
+                for name, request in _scenarios(agent_ids, bot_id).items():
+                    r = results[name] = await _run(
+                        client, request, args.requests, args.concurrency
+                    )
+                    print(
+                        f"{name:>22} | {r['rps']:8,.0f} | {r['p50_ms']:7.2f} | "
+                        f"{r['p95_ms']:7.2f} | {r['p99_ms']:7.2f}"
+                    )
+        finally:
+            app.dependency_overrides.clear()
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nbaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = _regressions(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"\nno regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
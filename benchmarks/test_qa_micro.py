@@ -0,0 +1,66 @@
+"""
+pytest-benchmark microbenchmarks for the Q&A hot path.
+
+`_norm`, `_ratio` and `QAIndex.answer` across question lengths and
+knowledge-base sizes. Not part of the default test run (see pytest.ini):
+
+    pytest benchmarks --benchmark-autosave           # record a run
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=median:20%
+"""
+
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.agent.services.qa import DEFAULT_INDEX, QAIndex, _norm, _ratio  # noqa: E402
+from benchmarks.bench_retrieval import _knowledge_base, _questions  # noqa: E402
+
+QUESTIONS = {
+    "short": "Parking?",
+    "medium": "Hi, what time does check-in start on Saturday?",
+    "long": (
+        "Hello! We are arriving late in the evening with two kids and a dog, "
+        "is there somewhere close to the hotel where we can park the car overnight, "
+        "and can we still get breakfast if we wake up late the next day?"
+    ),
+}
+KB_SIZES = [10, 1_000, 10_000]
+
+
+@pytest.fixture(scope="module", params=KB_SIZES, ids=lambda size: f"kb{size}")
+def kb(request: pytest.FixtureRequest) -> tuple[QAIndex, list[str]]:
+    rnd = random.Random(42)
+    pairs = _knowledge_base(request.param, rnd)
+    return QAIndex(pairs), _questions(pairs, 50, rnd)
+
+
+@pytest.mark.parametrize("length", QUESTIONS)
+def test_norm(benchmark, length: str) -> None:
+    benchmark(_norm, QUESTIONS[length])
+
+
+@pytest.mark.parametrize("length", QUESTIONS)
+def test_ratio(benchmark, length: str) -> None:
+    benchmark(_ratio, _norm(QUESTIONS[length]), "checkin")
+
+
+@pytest.mark.parametrize("length", QUESTIONS)
+def test_answer_builtin(benchmark, length: str) -> None:
+    benchmark(DEFAULT_INDEX.answer, QUESTIONS[length])
+
+
+def test_answer_by_kb_size(benchmark, kb: tuple[QAIndex, list[str]]) -> None:
+    index, questions = kb
+
+    def answer_all() -> None:
+        for question in questions:
+            index.answer(question)
+
+    benchmark(answer_all)
+
+
+def test_index_build(benchmark) -> None:
+    pairs = _knowledge_base(1_000, random.Random(42))
+    benchmark(QAIndex, pairs)
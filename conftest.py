@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 
 import httpx
 import pytest_asyncio
@@ -10,8 +11,8 @@ from sqlalchemy.orm import close_all_sessions
 from sqlalchemy.pool import StaticPool
 
 from app.db.base import Base
-from app.db.database import get_db
-from app.main import app
+from app.db.database import get_db, get_read_db, get_read_session_factory
+from app.main import admission, app
 
 # Test database: in‑memory SQLite
 TEST_DB_URL = "sqlite+aiosqlite:///:memory:"
@@ -62,8 +63,15 @@ async def client(db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     async def _get_test_db() -> AsyncGenerator[AsyncSession, None]:
         yield db
 
+    @asynccontextmanager
+    async def _test_session() -> AsyncIterator[AsyncSession]:
+        yield db
+
     # dependency override
     app.dependency_overrides[get_db] = _get_test_db
+    app.dependency_overrides[get_read_db] = _get_test_db
+    app.dependency_overrides[get_read_session_factory] = lambda: _test_session
+    admission.reset()  # every test starts with fresh limits and client buckets
 
     async with AsyncClient(
         base_url="http://test",
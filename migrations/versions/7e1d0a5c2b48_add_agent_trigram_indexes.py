@@ -0,0 +1,43 @@
+"""add_agent_trigram_indexes
+
+Revision ID: 7e1d0a5c2b48
+Revises: 4b2f7c1a9e3d
+Create Date: 2026-10-17 11:03:27.904511
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e1d0a5c2b48"
+down_revision: Union[str, None] = "4b2f7c1a9e3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_agents_name_trgm",
+        "agents",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_agents_description_trgm",
+        "agents",
+        ["description"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"description": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_agents_description_trgm", table_name="agents")
+    op.drop_index("ix_agents_name_trgm", table_name="agents")
+    # pg_trgm is left installed: other objects in the database may rely on it
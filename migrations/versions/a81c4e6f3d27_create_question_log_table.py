@@ -0,0 +1,49 @@
+"""create_question_log_table
+
+Revision ID: a81c4e6f3d27
+Revises: 5f8e2d4c1b90
+Create Date: 2026-10-17 17:41:08.263517
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a81c4e6f3d27"
+down_revision: Union[str, None] = "5f8e2d4c1b90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "question_log",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("agent_id", sa.UUID(), nullable=False),
+        sa.Column("question", sa.String(length=300), nullable=False),
+        sa.Column("q_norm", sa.String(length=300), nullable=False),
+        sa.Column(
+            "match",
+            sa.Enum("EXACT", "SUBSTRING", "FUZZY", "FALLBACK", name="match_type"),
+            nullable=False,
+        ),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("asked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_question_log_unanswered",
+        "question_log",
+        ["agent_id", "q_norm"],
+        unique=False,
+        postgresql_where=sa.text("match = 'FALLBACK'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_question_log_unanswered", table_name="question_log")
+    op.drop_table("question_log")
+    sa.Enum(name="match_type").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,35 @@
+"""add_agent_list_indexes
+
+Revision ID: c3a9f26e8d17
+Revises: 7e1d0a5c2b48
+Create Date: 2026-10-17 12:21:09.337145
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a9f26e8d17"
+down_revision: Union[str, None] = "7e1d0a5c2b48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name -> columns; each matches a GET /agents filter + ORDER BY (name, id) shape
+_INDEXES: dict[str, list[str]] = {
+    "ix_agents_type_status_name": ["type", "status", "name", "id"],
+    "ix_agents_type_name": ["type", "name", "id"],
+    "ix_agents_status_name": ["status", "name", "id"],
+    "ix_agents_name": ["name", "id"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in _INDEXES.items():
+        op.create_index(name, "agents", columns, unique=False)
+
+
+def downgrade() -> None:
+    for name in reversed(_INDEXES):
+        op.drop_index(name, table_name="agents")
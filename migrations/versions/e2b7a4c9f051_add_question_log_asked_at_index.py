@@ -0,0 +1,27 @@
+"""add_question_log_asked_at_index
+
+Revision ID: e2b7a4c9f051
+Revises: a81c4e6f3d27
+Create Date: 2026-10-17 18:20:31.402716
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b7a4c9f051"
+down_revision: Union[str, None] = "a81c4e6f3d27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_question_log_asked_at", "question_log", ["asked_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_question_log_asked_at", table_name="question_log")